@@ -145,3 +145,17 @@ MESSAGE_TAGS = {
 
 #tutorials.User
 AUTH_USER_MODEL = 'tutorials.User'
+
+# Cache used for rendered calendar data and tutors' free time, and how long (in seconds) entries live
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+CALENDAR_CACHE_ALIAS = 'default'
+CALENDAR_CACHE_TIMEOUT = 60 * 60
+FREE_SLOTS_CACHE_TIMEOUT = 60 * 60
+CAPACITY_REPORT_CACHE_TIMEOUT = 60 * 60
+
+# How long (in seconds) a process may use its tutor capability index before reloading it
+CAPABILITY_INDEX_MAX_AGE = 5 * 60
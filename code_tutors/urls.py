@@ -22,10 +22,15 @@ urlpatterns = [
 
     # Admin-specific Booking Management URLs
     path('bookings/admin/pending/', views.pending_bookings, name='admin_pending_bookings'),
+    path('bookings/admin/pending/decide/', views.decide_pending_bookings, name='decide_pending_bookings'),
     path('bookings/admin/pending/approve/<int:booking_id>/', views.approve_booking, name='approve_booking'),
     path('bookings/admin/pending/decline/<int:booking_id>/', views.decline_booking, name='decline_booking'),
     path('bookings/admin/create/', views.admin_create_booking, name='admin_create_booking'),
     path('bookings/admin/create/', views.admin_create_booking, name='admin_create_booking'),
+    path('api/admin/occupancy/', views.occupancy_heatmap, name='occupancy_heatmap'),
+    path('api/admin/capacity/', views.capacity_report, name='capacity_report'),
+    path('api/admin/users/autocomplete/', views.user_autocomplete, name='user_autocomplete'),
+    path('api/admin/bookings/<int:booking_id>/tutors/', views.booking_tutor_matches, name='booking_tutor_matches'),
 
     # Tutor Profile
     path('tutor/profile/', views.tutor_profile, name='tutor_profile'),
@@ -36,9 +41,12 @@ urlpatterns = [
     
     path('api/calendar/', views.booking_calendar_data, name='booking_calendar_data'),
     path('api/calendar-bookings/', views.calendar_bookings_api, name='calendar_bookings_api'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('api/free-slots/', views.free_slots_api, name='free_slots_api'),
 
     #tutor availability
     path('tutor/profile/availability/', views.tutor_availability, name='tutor_availability'),
+    path('tutor/profile/availability/grid/', views.tutor_availability_grid, name='tutor_availability_grid'),
 
 
 ]
@@ -1,24 +1,46 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.urls import reverse
 from django.utils.html import format_html
-from .models import User, Booking, Tutor, Language, Term, Lesson, Specialization, TutorAvalibility
+from .models import User, Booking, Tutor, Language, Term, Lesson, Specialization, TutorAvalibility, BlackoutDate
 from .forms import AdminBookingForm  
+from .lessons import sync_lessons
+from .scheduler import apply_assignments, plan_assignments
+from .search import starts_with
+
+
+class PrefixSearchMixin:
+    """Match each search word against the start of the search_fields, through their lowercase indexes."""
+
+    def get_search_results(self, request, queryset, search_term):
+        for term in search_term.split():
+            queryset = starts_with(queryset, self.search_fields, term)
+        return queryset, False
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(PrefixSearchMixin, admin.ModelAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'account_type', 'is_staff')
-    search_fields = ('username', 'email', 'first_name', 'last_name')
+    search_fields = ('username', 'last_name', 'first_name', 'email')
     list_filter = ('account_type', 'is_staff', 'is_active')
 
+    def formfield_for_manytomany(self, db_field, request=None, **kwargs):
+        """Join the content types that permissions display, as Django's own UserAdmin does."""
+        if db_field.name == 'user_permissions':
+            kwargs['queryset'] = db_field.remote_field.model.objects.select_related('content_type')
+        return super().formfield_for_manytomany(db_field, request=request, **kwargs)
+
 
 #admin booking
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    form = AdminBookingForm  
+    # The form renders student and tutor as autocomplete inputs, not selects of every user.
+    form = AdminBookingForm
     list_display = ('student', 'get_tutor', 'language', 'term', 'start_time', 'frequency', 'status')
     list_filter = ('status', 'term', 'frequency', 'language')
     search_fields = ('student__username', 'tutor__user__username', 'language__name', 'term__name')
+    list_select_related = ('student', 'tutor__user', 'language', 'term')
+    actions = ('assign_tutors',)
     
     def get_tutor(self, obj):
         """Return the tutor's full name for display."""
@@ -29,24 +51,14 @@ class BookingAdmin(admin.ModelAdmin):
     
     def generate_lessons(self, booking):
         """Generates lessons based on the booking's frequency and term dates."""
-        from datetime import timedelta
+        sync_lessons(booking)
 
-        start_date = booking.term.start_date
-        end_date = booking.term.end_date
-        frequency_days = 7 if booking.frequency == 'Weekly' else 14
-        current_date = start_date
-
-        while current_date.weekday() != start_date.weekday():
-            current_date += timedelta(days=1)
-
-        while current_date <= end_date:
-            Lesson.objects.create(
-                booking=booking,
-                date=current_date,
-                start_time=booking.start_time,
-                duration=booking.duration
-            )
-            current_date += timedelta(days=frequency_days)
+    @admin.action(description="Assign tutors to selected pending bookings")
+    def assign_tutors(self, request, queryset):
+        """Assign tutors to the selected tutorless pending bookings in one pass."""
+        plan = plan_assignments(queryset)
+        saved = apply_assignments(plan)
+        self.message_user(request, f"Assigned tutors to {saved} booking(s); {len(plan.unassigned)} could not be assigned.")
 
 @admin.register(Language)
 class LanguageAdmin(admin.ModelAdmin):
@@ -54,18 +66,29 @@ class LanguageAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 
-class TutorAdmin(admin.ModelAdmin):
+@admin.register(Tutor)
+class TutorAdmin(PrefixSearchMixin, admin.ModelAdmin):
     list_display = ('user', 'display_languages')
-    search_fields = ('user__username', 'user__first_name', 'user__last_name')
-    filter_horizontal = ('languages',)
+    search_fields = ('user__username', 'user__last_name', 'user__first_name')
+    autocomplete_fields = ('user',)
+    filter_horizontal = ('languages', 'specializations')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user').prefetch_related('languages')
 
     def display_languages(self, obj):
         return ", ".join([language.name for language in obj.languages.all()])
     display_languages.short_description = 'Languages'
 
 
+class BlackoutDateInline(admin.TabularInline):
+    model = BlackoutDate
+    extra = 0
+
+
 @admin.register(Term)
 class TermAdmin(admin.ModelAdmin):
+    inlines = (BlackoutDateInline,)
     list_display = ('name', 'start_date', 'end_date')
     list_filter = ('start_date', 'end_date')
     search_fields = ('name',)
@@ -76,14 +99,51 @@ class LessonAdmin(admin.ModelAdmin):
     list_display = ('booking', 'date', 'start_time', 'duration')
     list_filter = ('date',)
     search_fields = ('booking__student__username', 'booking__tutor__user__username', 'booking__language__name')
+    list_select_related = ('booking__student', 'booking__tutor__user', 'booking__language')
+    raw_id_fields = ('booking',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        User.bump_schedule_versions(obj.booking.schedule_users())
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        User.bump_schedule_versions(obj.booking.schedule_users())
+
+    def delete_queryset(self, request, queryset):
+        users = list(User.objects.filter(
+            Q(bookings_as_student__lesson__in=queryset) | Q(tutor__tutor_bookings__lesson__in=queryset)
+        ).values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        User.bump_schedule_versions(users)
 
 @admin.register(Specialization)
 class SpecializationAdmin(admin.ModelAdmin):
     list_display = ('name',)
     search_fields = ('name',)
 
+class WeekdayListFilter(admin.SimpleListFilter):
+    """Filter availabilities that include a given weekday."""
+    title = 'day of week'
+    parameter_name = 'day_of_week'
+
+    def lookups(self, request, model_admin):
+        return TutorAvalibility.DAY_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(day_of_week__includes=self.value())
+        return queryset
+
+
 @admin.register(TutorAvalibility)
 class TutorAvalibilityAdmin(admin.ModelAdmin):
-    list_display = ('tutor', 'term', 'day_of_week', 'start_time', 'end_time')
-    list_filter = ('term', 'day_of_week')
-    search_fields = ('tutor__user__username', 'tutor__user__first_name', 'tutor__user__last_name')
\ No newline at end of file
+    list_display = ('tutor', 'term', 'display_days', 'start_time', 'end_time')
+    list_filter = ('term', WeekdayListFilter)
+    search_fields = ('tutor__user__username', 'tutor__user__first_name', 'tutor__user__last_name')
+    list_select_related = ('tutor__user', 'term')
+    autocomplete_fields = ('tutor',)
+
+    @admin.display(description='Days')
+    def display_days(self, obj):
+        return ", ".join(day.capitalize() for day in obj.day_of_week)
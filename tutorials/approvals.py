@@ -0,0 +1,87 @@
+"""Approve or decline many pending bookings in one transaction."""
+
+from typing import NamedTuple
+from django.db import transaction
+from .availability import forget_free_slots
+from .capacity import forget_capacity
+from .lessons import booking_users, sync_many_lessons
+from .models import Booking, Lesson, User
+from .validation import validate_bookings
+
+
+class Decisions(NamedTuple):
+    """The ids of the bookings a decision was applied to, and why the others were skipped."""
+    applied: list
+    skipped: dict
+
+
+def locked_pending(booking_ids):
+    """Return the pending bookings among the ids, locked until the end of the transaction."""
+    return list(
+        Booking.objects.select_for_update().select_related('term')
+        .filter(id__in=booking_ids, status=Booking.PENDING)
+        .order_by('id')
+    )
+
+
+def not_pending(booking_ids, bookings):
+    found = {booking.id for booking in bookings}
+    return {booking_id: "It is no longer pending." for booking_id in booking_ids if booking_id not in found}
+
+
+@transaction.atomic
+def approve_bookings(booking_ids):
+    """
+    Accept the pending bookings that have a tutor and fit the tutor's schedule.
+
+    The bookings are validated together, as if all were accepted, so two
+    selected bookings clashing with each other are not both approved. The
+    valid ones are accepted in one UPDATE and their lessons are generated in
+    one pass, which bumps their users' schedule versions. Bulk writes skip
+    signals, so the cached free time and capacity are evicted here.
+    """
+    bookings = locked_pending(booking_ids)
+    skipped = not_pending(booking_ids, bookings)
+    approved = []
+    for booking, error in zip(bookings, validate_bookings(bookings, as_accepted=True)):
+        if not booking.tutor_id:
+            skipped[booking.id] = "No tutor is assigned."
+        elif error is not None:
+            skipped[booking.id] = " ".join(error.messages)
+        else:
+            approved.append(booking)
+    if not approved:
+        return Decisions([], skipped)
+
+    Booking.objects.filter(id__in=[booking.id for booking in approved]).update(
+        status=Booking.ACCEPTED,
+        student_approval=Booking.STUDENT_APPROVED,
+        tutor_approval=Booking.TUTOR_APPROVED,
+    )
+    for booking in approved:
+        booking.status = Booking.ACCEPTED
+        booking.student_approval = Booking.STUDENT_APPROVED
+        booking.tutor_approval = Booking.TUTOR_APPROVED
+    sync_many_lessons(approved)
+    forget_free_slots({(booking.tutor_id, booking.term_id) for booking in approved})
+    forget_capacity({booking.term_id for booking in approved})
+    return Decisions([booking.id for booking in approved], skipped)
+
+
+@transaction.atomic
+def decline_bookings(booking_ids):
+    """Decline the pending bookings in one UPDATE, as if their students had rejected them."""
+    bookings = locked_pending(booking_ids)
+    skipped = not_pending(booking_ids, bookings)
+    if not bookings:
+        return Decisions([], skipped)
+
+    declined_ids = [booking.id for booking in bookings]
+    Booking.objects.filter(id__in=declined_ids).update(
+        status=Booking.DECLINED, student_approval=Booking.STUDENT_REJECTED
+    )
+    deleted, _ = Lesson.objects.filter(booking_id__in=declined_ids).delete()
+    if deleted:
+        User.bump_schedule_versions(booking_users(bookings))
+    forget_capacity({booking.term_id for booking in bookings})
+    return Decisions(declined_ids, skipped)
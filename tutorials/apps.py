@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class TutorialsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tutorials'
-  
\ No newline at end of file
+
+    def ready(self):
+        """Connect the app's signal receivers."""
+        from . import signals  # noqa: F401
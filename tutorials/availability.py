@@ -0,0 +1,221 @@
+"""Free time of tutors: availability windows minus accepted bookings."""
+
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from .calendar_cache import calendar_cache
+from .capacity import forget_capacity
+from .fields import mask_to_weekdays, weekdays_to_mask
+from .intervals import Slot, from_minutes, merge, subtract, to_minutes
+from .models import Booking, TutorAvalibility
+from .recurrence import WEEKDAYS
+
+
+def free_slots_cache_key(tutor_id, term_id):
+    """Return the cache key of a tutor's free time in a term."""
+    return f"free-slots:{tutor_id}:{term_id}"
+
+
+def forget_free_slots(pairs):
+    """Evict the cached free time of the given (tutor id, term id) pairs."""
+    keys = [free_slots_cache_key(tutor_id, term_id) for tutor_id, term_id in pairs if tutor_id and term_id]
+    if keys:
+        calendar_cache().delete_many(keys)
+
+
+def build_free_slots(pairs):
+    """
+    Compute the free time of each (tutor id, term id) pair in two queries.
+
+    Returns, per pair, a mapping of weekday to the free (start, end) minute
+    intervals: 'weekly' holds the time free every week, 'first_week' and
+    'second_week' the time free for a fortnightly booking in that week.
+    """
+    pairs = set(pairs)
+    tutor_ids = {tutor_id for tutor_id, _ in pairs}
+    term_ids = {term_id for _, term_id in pairs}
+
+    windows = defaultdict(list)
+    for tutor_id, term_id, days, start_time, end_time in TutorAvalibility.objects.filter(
+        tutor_id__in=tutor_ids, term_id__in=term_ids
+    ).values_list('tutor_id', 'term_id', 'day_of_week', 'start_time', 'end_time'):
+        for day in days:
+            windows[tutor_id, term_id, day.capitalize()].append((to_minutes(start_time), to_minutes(end_time)))
+
+    busy = defaultdict(lambda: ([], []))
+    for tutor_id, term_id, day, start_time, duration, frequency, week_parity in Booking.objects.filter(
+        status=Booking.ACCEPTED, tutor_id__in=tutor_ids, term_id__in=term_ids
+    ).order_by().values_list('tutor_id', 'term_id', 'day_of_week', 'start_time', 'duration', 'frequency', 'week_parity'):
+        slot = Slot.build(start_time, duration, frequency, week_parity)
+        for week in (0, 1) if slot.parity is None else (slot.parity,):
+            busy[tutor_id, term_id, day][week].append((slot.start, slot.end))
+
+    free = {pair: {} for pair in pairs}
+    for (tutor_id, term_id, day), intervals in windows.items():
+        if (tutor_id, term_id) not in free:
+            continue
+        first_week, second_week = busy.get((tutor_id, term_id, day), ([], []))
+        free[tutor_id, term_id][day] = {
+            'weekly': subtract(intervals, first_week + second_week),
+            'first_week': subtract(intervals, first_week),
+            'second_week': subtract(intervals, second_week),
+        }
+    return free
+
+
+def get_free_slots(pairs):
+    """Return the free time of each (tutor id, term id) pair, from the cache where possible."""
+    cache = calendar_cache()
+    pairs = list(pairs)
+    keys = {pair: free_slots_cache_key(*pair) for pair in pairs}
+    cached = cache.get_many(keys.values())
+    free = {pair: cached[key] for pair, key in keys.items() if key in cached}
+    missing = [pair for pair in pairs if pair not in free]
+    if missing:
+        built = build_free_slots(missing)
+        cache.set_many({keys[pair]: value for pair, value in built.items()}, settings.FREE_SLOTS_CACHE_TIMEOUT)
+        free.update(built)
+    return free
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def serialize_free_slots(free, min_minutes=0):
+    """Return free time ready for JSON, in weekday order, dropping intervals shorter than min_minutes."""
+    return {
+        day: {
+            kind: [
+                [format_minutes(start), format_minutes(end)]
+                for start, end in intervals
+                if end - start >= min_minutes
+            ]
+            for kind, intervals in free[day].items()
+        }
+        for day in WEEKDAYS
+        if day in free
+    }
+
+
+def availability_grid(tutor, terms):
+    """Return the tutor's windows as {term id: {weekday: [[start, end], ...]}}, times as HH:MM."""
+    grid = {term.pk: {} for term in terms}
+    for term_id, days, start_time, end_time in TutorAvalibility.objects.filter(
+        tutor=tutor, term_id__in=grid
+    ).order_by('start_time', 'end_time').values_list('term_id', 'day_of_week', 'start_time', 'end_time'):
+        for day in days:
+            grid[term_id].setdefault(day.capitalize(), []).append(
+                [start_time.strftime('%H:%M'), end_time.strftime('%H:%M')]
+            )
+    return grid
+
+
+def coalesce_windows(windows):
+    """
+    Turn per-day windows into the minimal set of rows.
+
+    `windows` maps (tutor id, term id, weekday) to (start, end) minute
+    intervals. Overlapping or touching windows of a day are merged, and
+    days with the same merged window share one row, so the result maps
+    (tutor id, term id, start_time, end_time) to a weekday bitmask.
+    """
+    target = defaultdict(int)
+    for (tutor_id, term_id, day), intervals in windows.items():
+        for start, end in merge(intervals):
+            target[tutor_id, term_id, from_minutes(start), from_minutes(end)] |= weekdays_to_mask(day)
+    return target
+
+
+def apply_availability(rows, target):
+    """
+    Make the stored availability rows match the target rows, in bulk.
+
+    Rows with the same tutor, term and times as a target keep their id and
+    only have their days updated; the remaining rows are reused for the
+    remaining targets of their tutor and term, and whatever is left over is
+    deleted or inserted. That is one bulk delete, one bulk update and one
+    bulk insert at most. Bulk writes skip signals, so the cached free time
+    and capacity of every changed tutor and term are evicted here.
+    Returns (created, updated, deleted).
+    """
+    matched = {}
+    spare = defaultdict(list)
+    for row in rows:
+        key = (row.tutor_id, row.term_id, row.start_time, row.end_time)
+        if key in target and key not in matched:
+            matched[key] = row
+        else:
+            spare[row.tutor_id, row.term_id].append(row)
+
+    changed = []
+    new_rows = []
+    for (tutor_id, term_id, start_time, end_time), mask in target.items():
+        row = matched.get((tutor_id, term_id, start_time, end_time))
+        if row is None and spare[tutor_id, term_id]:
+            row = spare[tutor_id, term_id].pop(0)
+            row.start_time, row.end_time = start_time, end_time
+        elif row is None:
+            new_rows.append(TutorAvalibility(
+                tutor_id=tutor_id, term_id=term_id, day_of_week=mask, start_time=start_time, end_time=end_time
+            ))
+            continue
+        elif row.day_of_week == mask_to_weekdays(mask):
+            continue
+        row.day_of_week = mask
+        changed.append(row)
+    stale = [row for rows in spare.values() for row in rows]
+
+    if stale:
+        TutorAvalibility.objects.filter(id__in=[row.id for row in stale]).delete()
+    if changed:
+        TutorAvalibility.objects.bulk_update(changed, ['day_of_week', 'start_time', 'end_time'])
+    if new_rows:
+        TutorAvalibility.objects.bulk_create(new_rows)
+    pairs = {(row.tutor_id, row.term_id) for row in stale + changed + new_rows}
+    forget_free_slots(pairs)
+    forget_capacity({term_id for _, term_id in pairs})
+    return len(new_rows), len(changed), len(stale)
+
+
+@transaction.atomic
+def save_availability_grid(tutor, grid):
+    """
+    Replace the tutor's weekly availability in every term of the grid.
+
+    `grid` maps a term id to {weekday: [(start_time, end_time), ...]};
+    terms left out are untouched. The windows are coalesced into the
+    minimal set of rows and applied as one bulk diff (see apply_availability).
+    Returns (created, updated, deleted).
+    """
+    windows = defaultdict(list)
+    for term_id, days in grid.items():
+        for day, day_windows in days.items():
+            for start_time, end_time in day_windows:
+                windows[tutor.id, term_id, day].append((to_minutes(start_time), to_minutes(end_time)))
+    rows = TutorAvalibility.objects.filter(tutor=tutor, term_id__in=grid).only(
+        'id', 'tutor_id', 'term_id', 'day_of_week', 'start_time', 'end_time'
+    ).order_by('id')
+    return apply_availability(rows, coalesce_windows(windows))
+
+
+@transaction.atomic
+def compact_availability(tutor_ids=None, term_ids=None):
+    """
+    Merge overlapping or touching availability windows into the minimal set of rows.
+
+    Covers every tutor and term unless restricted to the given ids.
+    Returns (created, updated, deleted).
+    """
+    rows = TutorAvalibility.objects.only('id', 'tutor_id', 'term_id', 'day_of_week', 'start_time', 'end_time')
+    if tutor_ids is not None:
+        rows = rows.filter(tutor_id__in=tutor_ids)
+    if term_ids is not None:
+        rows = rows.filter(term_id__in=term_ids)
+    rows = list(rows.order_by('id'))
+
+    windows = defaultdict(list)
+    for row in rows:
+        for day in row.day_of_week:
+            windows[row.tutor_id, row.term_id, day].append((to_minutes(row.start_time), to_minutes(row.end_time)))
+    return apply_availability(rows, coalesce_windows(windows))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import caches
+
+
+def calendar_cache():
+    """Return the cache backend configured for calendar data."""
+    return caches[settings.CALENDAR_CACHE_ALIAS]
+
+
+def calendar_cache_key(user, feed, start=None, end=None):
+    """
+    Return the cache key of a user's calendar feed for the window [start, end).
+
+    The key embeds the user's schedule version, so bumping the version (see
+    tutorials.signals) evicts every cached window of exactly that user.
+    """
+    stamp = user.schedule_updated_at.timestamp()
+    return f"calendar:{feed}:{user.pk}:{user.schedule_version}:{stamp}:{start}:{end}"
+
+
+def get_or_build(user, feed, start, end, build):
+    """Return the cached calendar data of the user, building and storing it on a miss."""
+    cache = calendar_cache()
+    key = calendar_cache_key(user, feed, start, end)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.CALENDAR_CACHE_TIMEOUT)
+    return data
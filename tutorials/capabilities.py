@@ -0,0 +1,81 @@
+"""Process-local index of the languages and specializations each tutor teaches."""
+
+import threading
+import time
+from django.conf import settings
+
+EMPTY = frozenset()
+
+
+class CapabilityIndex:
+    """
+    Tutor ids by language and specialization, loaded lazily in two queries.
+
+    Each process keeps its own copy. Signals (see tutorials.signals) drop it
+    whenever a tutor's languages or specializations change, and it is
+    reloaded after settings.CAPABILITY_INDEX_MAX_AGE seconds so that writes
+    made by other processes are picked up.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+
+    def invalidate(self):
+        self.state = None
+
+    def load(self):
+        state = self.state
+        if state is not None and time.monotonic() - state['loaded_at'] < settings.CAPABILITY_INDEX_MAX_AGE:
+            return state
+        from .models import Tutor
+
+        with self.lock:
+            if self.state is state:
+                state = {
+                    'loaded_at': time.monotonic(),
+                    'by_language': {},
+                    'by_specialization': {},
+                    'languages': {},
+                    'specializations': {},
+                    'combined': {},
+                }
+                for tutor_id, language_id in Tutor.languages.through.objects.values_list('tutor_id', 'language_id'):
+                    state['by_language'].setdefault(language_id, set()).add(tutor_id)
+                    state['languages'].setdefault(tutor_id, set()).add(language_id)
+                for tutor_id, specialization_id in Tutor.specializations.through.objects.values_list(
+                    'tutor_id', 'specialization_id'
+                ):
+                    state['by_specialization'].setdefault(specialization_id, set()).add(tutor_id)
+                    state['specializations'].setdefault(tutor_id, set()).add(specialization_id)
+                self.state = state
+            return self.state
+
+    def tutors_for(self, language_id, specialization_id=None):
+        """Return the ids of the tutors teaching the language (and specialization, if given)."""
+        state = self.load()
+        key = (language_id, specialization_id)
+        tutors = state['combined'].get(key)
+        if tutors is None:
+            tutors = frozenset(state['by_language'].get(language_id, EMPTY))
+            if specialization_id is not None:
+                tutors &= state['by_specialization'].get(specialization_id, EMPTY)
+            state['combined'][key] = tutors
+        return tutors
+
+    def teaches(self, tutor_id, language_id):
+        """Return whether the tutor teaches the language."""
+        return language_id in self.load()['languages'].get(tutor_id, EMPTY)
+
+    def offers(self, tutor_id, specialization_id):
+        """Return whether the tutor offers the specialization."""
+        return specialization_id in self.load()['specializations'].get(tutor_id, EMPTY)
+
+    def languages_of(self, tutor_id):
+        return self.load()['languages'].get(tutor_id, EMPTY)
+
+    def specializations_of(self, tutor_id):
+        return self.load()['specializations'].get(tutor_id, EMPTY)
+
+
+capabilities = CapabilityIndex()
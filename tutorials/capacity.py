@@ -0,0 +1,180 @@
+"""Tutor hours on offer against lesson hours asked for, per term, language and specialization."""
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Sum
+from .calendar_cache import calendar_cache
+from .capabilities import capabilities
+from .fields import weekdays_to_mask
+from .intervals import to_minutes
+from .models import BlackoutDate, Booking, Term, TutorAvalibility
+from .recurrence import WEEKDAYS, WEEKDAY_INDEX, expand
+
+# Recurrences counted for every term and weekday: weekly, then fortnightly
+# in the first and in the second week of the term.
+PATTERNS = [(7, 0), (14, 0), (14, 1)]
+
+
+def capacity_cache_key(term_id):
+    """Return the cache key of a term's capacity report."""
+    return f"capacity:{term_id}"
+
+
+def forget_capacity(term_ids=None):
+    """Evict the cached capacity report of the given terms, or of every term."""
+    if term_ids is None:
+        term_ids = Term.objects.values_list('pk', flat=True)
+    keys = [capacity_cache_key(term_id) for term_id in term_ids if term_id]
+    if keys:
+        calendar_cache().delete_many(keys)
+
+
+def occurrence_counts(terms, blackout_dates):
+    """Return a (term, weekday, pattern) array with the number of lessons of each recurrence in the term."""
+    shape = (len(terms), len(WEEKDAYS), len(PATTERNS))
+    term_positions, weekdays, patterns = np.indices(shape).reshape(3, -1)
+    intervals, offsets = np.array(PATTERNS).T
+    occurrences = expand(
+        np.array([term.start_date for term in terms], dtype='datetime64[D]')[term_positions],
+        np.array([term.end_date for term in terms], dtype='datetime64[D]')[term_positions],
+        weekdays,
+        intervals[patterns],
+        term_ids=np.array([term.pk for term in terms], dtype=np.int64)[term_positions],
+        blackout_dates=blackout_dates,
+        week_offsets=offsets[patterns],
+    )
+    return occurrences.counts().reshape(shape)
+
+
+def tutor_hours(term_ids, occurrences):
+    """
+    Return the tutor ids and a (term, tutor) array of the hours each tutor is available in each term.
+
+    Every availability row counts its window once per occurrence of each of
+    its weekdays in the term.
+    """
+    rows = list(TutorAvalibility.objects.filter(term_id__in=term_ids).order_by().values_list(
+        'term_id', 'tutor_id', 'day_of_week', 'start_time', 'end_time'
+    ))
+    tutor_ids = sorted({row[1] for row in rows})
+    hours = np.zeros((len(term_ids), len(tutor_ids)))
+    if not rows:
+        return tutor_ids, hours
+    row_terms, row_tutors, days, start_times, end_times = zip(*rows)
+
+    term_positions = np.searchsorted(term_ids, row_terms)
+    masks = np.array([weekdays_to_mask(value) for value in days], dtype=np.int64)
+    weekday_bits = (masks[:, None] >> np.arange(len(WEEKDAYS))) & 1
+    lessons = (weekday_bits * occurrences[term_positions, :, 0]).sum(axis=1)
+    minutes = np.array([to_minutes(end) - to_minutes(start) for start, end in zip(start_times, end_times)])
+    np.add.at(hours, (term_positions, np.searchsorted(tutor_ids, row_tutors)), minutes * lessons / 60)
+    return tutor_ids, hours
+
+
+def demand_rows(term_ids):
+    """Return the pending and accepted bookings grouped by term, subject and recurrence, with their total duration."""
+    return list(
+        Booking.objects
+        .filter(status__in=[Booking.PENDING, Booking.ACCEPTED], term_id__in=term_ids)
+        .values('term_id', 'language_id', 'specialization_id', 'day_of_week', 'frequency', 'week_parity')
+        .annotate(total=Sum('duration'), bookings=Count('id'))
+        .order_by()
+    )
+
+
+def build_capacity(terms):
+    """
+    Compute the capacity report of each term.
+
+    Supply is the hours tutors are available in the term, counted for every
+    language and specialization they teach; the row without a
+    specialization counts every tutor of the language. Demand is the
+    duration of the pending and accepted bookings times their number of
+    lessons in the term, blackout dates excluded. Runs in three queries,
+    once the capability index is loaded.
+    """
+    terms = sorted(terms, key=lambda term: term.pk)
+    term_ids = [term.pk for term in terms]
+    if not terms:
+        return {}
+    occurrences = occurrence_counts(terms, BlackoutDate.dates_by_term(term_ids))
+    tutor_ids, hours = tutor_hours(term_ids, occurrences)
+    demand = demand_rows(term_ids)
+
+    language_ids = sorted(
+        {language_id for tutor_id in tutor_ids for language_id in capabilities.languages_of(tutor_id)}
+        | {row['language_id'] for row in demand}
+    )
+    # Position 0 stands for "any specialization".
+    specialization_ids = [None] + sorted(
+        {specialization_id for tutor_id in tutor_ids for specialization_id in capabilities.specializations_of(tutor_id)}
+        | {row['specialization_id'] for row in demand if row['specialization_id'] is not None}
+    )
+    language_positions = {language_id: position for position, language_id in enumerate(language_ids)}
+    specialization_positions = {
+        specialization_id: position for position, specialization_id in enumerate(specialization_ids)
+    }
+
+    teaches = np.zeros((len(tutor_ids), len(language_ids)))
+    offers = np.zeros((len(tutor_ids), len(specialization_ids)))
+    offers[:, 0] = 1
+    for position, tutor_id in enumerate(tutor_ids):
+        teaches[position, [language_positions[language_id] for language_id in capabilities.languages_of(tutor_id)]] = 1
+        offers[position, [
+            specialization_positions[specialization_id]
+            for specialization_id in capabilities.specializations_of(tutor_id)
+        ]] = 1
+    supply = np.einsum('tu,ul,us->tls', hours, teaches, offers)
+    tutors = np.einsum('tu,ul,us->tls', (hours > 0).astype(float), teaches, offers)
+
+    demanded = np.zeros_like(supply)
+    bookings = np.zeros_like(supply)
+    if demand:
+        positions = (
+            np.searchsorted(term_ids, [row['term_id'] for row in demand]),
+            np.array([language_positions[row['language_id']] for row in demand], dtype=np.int64),
+            np.array([specialization_positions[row['specialization_id']] for row in demand], dtype=np.int64),
+        )
+        patterns = np.array([
+            1 + row['week_parity'] if row['frequency'] == Booking.FORTNIGHTLY else 0 for row in demand
+        ])
+        lessons = occurrences[positions[0], [WEEKDAY_INDEX[row['day_of_week']] for row in demand], patterns]
+        total_hours = np.array([row['total'].total_seconds() / 3600 for row in demand])
+        np.add.at(demanded, positions, total_hours * lessons)
+        np.add.at(bookings, positions, [row['bookings'] for row in demand])
+
+    report = {}
+    for term_position, term_id in enumerate(term_ids):
+        rows = []
+        for language_position, specialization_position in zip(*np.nonzero(
+            (supply[term_position] > 0) | (bookings[term_position] > 0)
+        )):
+            offered = supply[term_position, language_position, specialization_position]
+            asked = demanded[term_position, language_position, specialization_position]
+            rows.append({
+                'language': language_ids[language_position],
+                'specialization': specialization_ids[specialization_position],
+                'tutors': int(tutors[term_position, language_position, specialization_position]),
+                'bookings': int(bookings[term_position, language_position, specialization_position]),
+                'supply_hours': round(float(offered), 2),
+                'demand_hours': round(float(asked), 2),
+                'shortfall_hours': round(float(max(asked - offered, 0)), 2),
+            })
+        rows.sort(key=lambda row: (row['supply_hours'] - row['demand_hours'], row['language'], row['specialization'] or 0))
+        report[term_id] = rows
+    return report
+
+
+def get_capacity(terms):
+    """Return the capacity report of each term, from the cache where possible."""
+    cache = calendar_cache()
+    terms = list(terms)
+    keys = {term.pk: capacity_cache_key(term.pk) for term in terms}
+    cached = cache.get_many(keys.values())
+    report = {term_id: cached[key] for term_id, key in keys.items() if key in cached}
+    missing = [term for term in terms if term.pk not in report]
+    if missing:
+        built = build_capacity(missing)
+        cache.set_many({keys[term_id]: rows for term_id, rows in built.items()}, settings.CAPACITY_REPORT_CACHE_TIMEOUT)
+        report.update(built)
+    return report
@@ -0,0 +1,110 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.lookups import In
+from django.db.models.query_utils import DeferredAttribute
+from .recurrence import WEEKDAYS
+
+WEEKDAY_CHOICES = [(day.lower(), day) for day in WEEKDAYS]
+WEEKDAY_BITS = {day.lower(): 1 << index for index, day in enumerate(WEEKDAYS)}
+ALL_WEEKDAYS_MASK = (1 << len(WEEKDAYS)) - 1
+
+
+def weekdays_to_mask(value):
+    """
+    Convert weekdays to a bitmask (Monday=1, Tuesday=2, ..., Sunday=64).
+
+    Accepts a mask, a day name in any case, a comma-separated string of names
+    or an iterable of names.
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        if not 0 <= value <= ALL_WEEKDAYS_MASK:
+            raise ValidationError(f"{value} is not a valid weekday mask.")
+        return value
+    if isinstance(value, str):
+        value = value.split(',')
+    mask = 0
+    for day in value:
+        day = str(day).strip().lower()
+        if day not in WEEKDAY_BITS:
+            raise ValidationError(f"{day} is not a valid weekday.")
+        mask |= WEEKDAY_BITS[day]
+    return mask
+
+
+def mask_to_weekdays(mask):
+    """Convert a bitmask to a list of lowercase day names, Monday first."""
+    return [day for day, bit in WEEKDAY_BITS.items() if mask & bit]
+
+
+def masks_including(day):
+    """Return every mask that contains the given weekday."""
+    bit = weekdays_to_mask(day)
+    return [mask for mask in range(1, ALL_WEEKDAYS_MASK + 1) if mask & bit == bit]
+
+
+class WeekdaysAttribute(DeferredAttribute):
+    """Normalize any assigned value to a list of lowercase day names."""
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = self.field.to_python(value)
+
+
+class WeekdaysField(models.PositiveSmallIntegerField):
+    """
+    A set of weekdays stored as an integer bitmask.
+
+    In Python the value is a list of lowercase day names. Filter with
+    `<field>__includes='Tuesday'`, which becomes an IN over the 64 masks
+    containing that day, so a composite index on the column can serve it.
+    """
+
+    descriptor_class = WeekdaysAttribute
+    description = "Set of weekdays stored as a bitmask"
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else mask_to_weekdays(value)
+
+    def to_python(self, value):
+        if value is None:
+            return None
+        return mask_to_weekdays(weekdays_to_mask(value))
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return weekdays_to_mask(value)
+
+    def value_to_string(self, obj):
+        return ','.join(self.value_from_object(obj) or [])
+
+    def validate(self, value, model_instance):
+        if not value and not self.blank:
+            raise ValidationError(self.error_messages['blank'], code='blank')
+
+    def run_validators(self, value):
+        super().run_validators(weekdays_to_mask(value))
+
+    def formfield(self, **kwargs):
+        defaults = {
+            'form_class': forms.MultipleChoiceField,
+            'choices': WEEKDAY_CHOICES,
+            'required': not self.blank,
+            'label': self.verbose_name.capitalize(),
+            'help_text': self.help_text,
+        }
+        defaults.update(kwargs)
+        form_class = defaults.pop('form_class')
+        defaults.pop('choices_form_class', None)
+        return form_class(**defaults)
+
+
+@WeekdaysField.register_lookup
+class IncludesWeekday(In):
+    lookup_name = 'includes'
+
+    def get_prep_lookup(self):
+        self.rhs = masks_including(self.rhs)
+        return super().get_prep_lookup()
@@ -1,8 +1,10 @@
 from django import forms
 from django.contrib.auth import authenticate
 from django.core.validators import RegexValidator
+from django.urls import reverse
 from .models import User, Booking, Tutor, Language, Term, Lesson, Specialization, TutorAvalibility
 from datetime import datetime, timedelta
+from .recurrence import WEEKDAYS
 from django.core.exceptions import ValidationError
 
 class LogInForm(forms.Form):
@@ -176,19 +178,74 @@ class TutorProfileForm(forms.ModelForm):
         model = Tutor
         fields = ['languages', 'specializations']
 
+def autocomplete_label(choice):
+    """Return how a user or tutor is shown by the autocomplete."""
+    user = choice.user if isinstance(choice, Tutor) else choice
+    return f"{user.full_name()} ({user.username})"
+
+
+class AutocompleteInput(forms.Widget):
+    """
+    Choose a student or tutor by typing the start of their username or last name.
+
+    Matches come from the user autocomplete endpoint, and only the selected
+    option is loaded to render the field, so its size does not grow with the
+    number of users.
+    """
+
+    template_name = 'widgets/autocomplete.html'
+
+    def __init__(self, role, attrs=None):
+        super().__init__(attrs)
+        self.role = role
+        self.choices = []
+
+    def selected_label(self, value):
+        if value in (None, ''):
+            return ''
+        queryset = getattr(self.choices, 'queryset', None)
+        if queryset is None:
+            return ''
+        if queryset.model is Tutor:
+            queryset = queryset.select_related('user')
+        selected = queryset.filter(pk=value).first()
+        return autocomplete_label(selected) if selected else ''
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget'].update({
+            'url': f"{reverse('user_autocomplete')}?role={self.role}",
+            'label': self.selected_label(value),
+        })
+        return context
+
+
 class AdminBookingForm(forms.ModelForm):
     """Form for admins to create a booking."""
 
     tutor = forms.ModelChoiceField(
         queryset=Tutor.objects.all(),
         required=True,
-        label="Select Tutor"
+        label="Select Tutor",
+        widget=AutocompleteInput('tutor')
+    )
+    week_parity = forms.TypedChoiceField(
+        choices=Booking.WEEK_PARITY_CHOICES,
+        coerce=int,
+        required=False,
+        empty_value=Booking.FIRST_WEEK,
+        label="Week (fortnightly only)",
+        widget=forms.Select(attrs={'class': 'form-control'})
     )
 
     class Meta:
         model = Booking
-        fields = ['student', 'tutor', 'language', 'specialization', 'term', 'day_of_week', 'start_time', 'duration', 'frequency']
+        fields = [
+            'student', 'tutor', 'language', 'specialization', 'term', 'day_of_week', 'start_time', 'duration',
+            'frequency', 'week_parity'
+        ]
         widgets = {
+            'student': AutocompleteInput('student'),
             'day_of_week': forms.Select(attrs={'class': 'form-control'}),
             'term': forms.Select(attrs={'class': 'form-control'}),
             'start_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
@@ -197,48 +254,15 @@ class AdminBookingForm(forms.ModelForm):
         }
 
     def clean(self):
-        cleaned_data = super().clean()
-        tutor = cleaned_data.get('tutor')
-        term = cleaned_data.get('term')
-        day_of_week = cleaned_data.get('day_of_week')
-        start_time = cleaned_data.get('start_time')
-        duration = cleaned_data.get('duration')
-
-        if tutor and term and day_of_week and start_time and duration:
-            end_time = (datetime.combine(datetime.today(), start_time) + duration).time()
-
-            availability = TutorAvalibility.objects.filter(
-                tutor=tutor,
-                term=term,
-                day_of_week__icontains=day_of_week
-            )
+        """
+        Normalize the week of weekly bookings.
 
-            if not availability.exists():
-                self.add_error(
-                    None,
-                    f"Tutor is not available on {day_of_week} for the selected term."
-                )
-            else:
-                for slot in availability:
-                    if slot.start_time <= start_time < slot.end_time and slot.start_time < end_time <= slot.end_time:
-                        break
-                else:
-                    available_slots = ", ".join(
-                        f"{slot.start_time.strftime('%H:%M')} to {slot.end_time.strftime('%H:%M')}"
-                        for slot in availability
-                    )
-                    
-            overlapping_bookings = Booking.objects.filter(
-                tutor=tutor,
-                term=term,
-                day_of_week=day_of_week,
-                start_time__lt=end_time,
-                start_time__gte=start_time,
-                status=Booking.ACCEPTED,
-            ).exclude(pk=self.instance.pk)
-
-            if overlapping_bookings.exists():
-                self.add_error(None, "This tutor is already booked for the selected time.")
+        Availability and conflicts are checked once, by Booking.clean, when
+        the model instance is validated.
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get('frequency') != Booking.FORTNIGHTLY or cleaned_data.get('week_parity') is None:
+            cleaned_data['week_parity'] = Booking.FIRST_WEEK
         return cleaned_data
 
 class TutorAvailablityForm(forms.ModelForm):
@@ -276,3 +300,50 @@ class TutorAvailablityForm(forms.ModelForm):
             if start_time >= end_time:
                 self.add_error('end_time', "End time must be later than start time.")
         return cleaned_data
+
+
+class AvailabilityGridForm(forms.Form):
+    """Form carrying a tutor's whole weekly availability for several terms as JSON."""
+
+    grid = forms.JSONField(widget=forms.HiddenInput)
+
+    def clean_grid(self):
+        """
+        Return {term id: {weekday: [(start_time, end_time), ...]}}.
+
+        The submitted grid maps term ids to weekdays to lists of
+        ["HH:MM", "HH:MM"] windows; each window must satisfy the same rules
+        as a single TutorAvalibility.
+        """
+        grid = self.cleaned_data['grid']
+        if not isinstance(grid, dict):
+            raise ValidationError("Invalid availability grid.")
+        term_keys = [key for key in grid if str(key).isdigit()]
+        term_ids = set(Term.objects.filter(pk__in=term_keys).values_list('pk', flat=True))
+
+        cleaned = {}
+        errors = []
+        for term_key, days in grid.items():
+            if not str(term_key).isdigit() or int(term_key) not in term_ids:
+                raise ValidationError(f"Unknown term {term_key}.")
+            if not isinstance(days, dict):
+                raise ValidationError("Invalid availability grid.")
+            cleaned_days = cleaned.setdefault(int(term_key), {})
+            for day, windows in days.items():
+                if day not in WEEKDAYS or not isinstance(windows, list):
+                    raise ValidationError(f"{day} is not a valid weekday.")
+                cleaned_windows = cleaned_days.setdefault(day, [])
+                for window in windows:
+                    try:
+                        start_time, end_time = (datetime.strptime(value, '%H:%M').time() for value in window)
+                    except (TypeError, ValueError):
+                        raise ValidationError(f"{day}: times must be given as HH:MM.")
+                    try:
+                        TutorAvalibility(start_time=start_time, end_time=end_time).clean()
+                    except ValidationError as error:
+                        errors.extend(f"{day} {window[0]}-{window[1]}: {message}" for message in error.messages)
+                        continue
+                    cleaned_windows.append((start_time, end_time))
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
@@ -0,0 +1,104 @@
+"""iCalendar (RFC 5545) rendering of a user's accepted bookings."""
+
+from datetime import datetime, timezone as dt_timezone
+from .models import Booking, Lesson, BlackoutDate
+from .recurrence import expand_bookings
+
+PRODUCT_ID = '-//Code Tutors//Lessons//EN'
+MAX_LINE_OCTETS = 75
+
+
+def escape_text(value):
+    """Escape a TEXT property value."""
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line into chunks of at most 75 octets, terminated by CRLF."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line + '\r\n'
+    chunks = []
+    limit = MAX_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = MAX_LINE_OCTETS - 1
+    return '\r\n '.join(chunks) + '\r\n'
+
+
+def format_local(date, time):
+    """Format a floating local date-time."""
+    return datetime.combine(date, time).strftime('%Y%m%dT%H%M%S')
+
+
+def cancelled_dates(bookings, occurrences):
+    """
+    Return, per booking, the scheduled dates on which no lesson takes place.
+
+    For bookings with materialized lessons these are the dates without a
+    lesson row; otherwise they are the term's blackout dates.
+    """
+    booking_ids = [booking.id for booking in bookings]
+    lesson_dates = {}
+    for booking_id, date in Lesson.objects.filter(booking_id__in=booking_ids).values_list('booking_id', 'date'):
+        lesson_dates.setdefault(booking_id, set()).add(date)
+    blackout_dates = {
+        term_id: set(dates)
+        for term_id, dates in BlackoutDate.dates_by_term({booking.term_id for booking in bookings}).items()
+    }
+
+    cancelled = []
+    for booking, dates in zip(bookings, occurrences.split()):
+        dates = dates.tolist()
+        if booking.id in lesson_dates:
+            cancelled.append([date for date in dates if date not in lesson_dates[booking.id]])
+        else:
+            term_blackouts = blackout_dates.get(booking.term_id, set())
+            cancelled.append([date for date in dates if date in term_blackouts])
+    return cancelled
+
+
+def iter_calendar(user):
+    """Yield the user's calendar as iCalendar text, one VEVENT with an RRULE per booking."""
+    stamp = user.schedule_updated_at.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold(f'PRODID:{PRODUCT_ID}')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold(f'X-WR-CALNAME:{escape_text(user.full_name())} lessons')
+
+    bookings = list(
+        Booking.objects.accepted_for(user)
+        .select_related('term', 'language', 'specialization', 'tutor__user')
+        .order_by('id')
+    )
+    occurrences = expand_bookings(bookings)
+    dates_per_booking = occurrences.split()
+    cancelled = cancelled_dates(bookings, occurrences)
+
+    for booking, dates, exdates in zip(bookings, dates_per_booking, cancelled):
+        if not dates.size:
+            continue
+        first_date = dates[0].item()
+        end_time = datetime.combine(first_date, booking.start_time) + booking.duration
+        interval = ';INTERVAL=2' if booking.frequency == Booking.FORTNIGHTLY else ''
+
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:booking-{booking.id}@code-tutors')
+        yield fold(f'DTSTAMP:{stamp}')
+        yield fold(f'DTSTART:{format_local(first_date, booking.start_time)}')
+        yield fold(f"DTEND:{end_time.strftime('%Y%m%dT%H%M%S')}")
+        yield fold(f"RRULE:FREQ=WEEKLY{interval};UNTIL={booking.term.end_date.strftime('%Y%m%d')}T235959")
+        if exdates:
+            yield fold('EXDATE:' + ','.join(format_local(date, booking.start_time) for date in exdates))
+        yield fold('SUMMARY:' + escape_text(booking.calendar_title()))
+        yield fold('DESCRIPTION:' + escape_text(booking.calendar_description()))
+        yield fold('END:VEVENT')
+
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,119 @@
+"""Weekly lesson intervals and conflict detection between them."""
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import time
+from typing import NamedTuple
+
+FORTNIGHTLY = 'Fortnightly'
+
+
+def to_minutes(value):
+    """Convert a time object to minutes after midnight."""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Convert minutes after midnight to a time object."""
+    return time(minutes // 60, minutes % 60)
+
+
+def duration_minutes(duration):
+    """Convert a timedelta to whole minutes."""
+    return int(duration.total_seconds() // 60)
+
+
+def overlaps(first, second):
+    """Return whether two (start, end) intervals overlap."""
+    return first[0] < second[1] and second[0] < first[1]
+
+
+def merge(intervals):
+    """Return the union of (start, end) intervals as sorted, disjoint intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(intervals, removed):
+    """Return the parts of the intervals not covered by any removed interval."""
+    removed = merge(removed)
+    remaining = []
+    for start, end in merge(intervals):
+        for removed_start, removed_end in removed:
+            if removed_end <= start or removed_start >= end:
+                continue
+            if removed_start > start:
+                remaining.append((start, removed_start))
+            start = max(start, removed_end)
+            if start >= end:
+                break
+        if start < end:
+            remaining.append((start, end))
+    return remaining
+
+
+class Slot(NamedTuple):
+    """
+    The weekly time a booking occupies, in minutes after midnight.
+
+    `parity` is the week (0 or 1) in which a fortnightly booking takes place
+    and None for weekly bookings, which take place every week.
+    """
+    start: int
+    end: int
+    parity: object = None
+    booking_id: object = None
+
+    @classmethod
+    def build(cls, start_time, duration, frequency, week_parity=0, booking_id=None):
+        start = to_minutes(start_time)
+        parity = week_parity if frequency == FORTNIGHTLY else None
+        return cls(start, start + duration_minutes(duration), parity, booking_id)
+
+    @classmethod
+    def of(cls, booking):
+        return cls.build(booking.start_time, booking.duration, booking.frequency, booking.week_parity, booking.pk)
+
+    def clashes(self, other):
+        """Return whether both slots are taught in the same week at overlapping times."""
+        if self.parity is not None and other.parity is not None and self.parity != other.parity:
+            return False
+        return overlaps(self, other)
+
+
+def slot_start(slot):
+    return slot.start
+
+
+class IntervalIndex:
+    """
+    Slots grouped by (tutor, term, weekday) and sorted by start time.
+
+    Finding the slots clashing with a new one only scans entries starting
+    within the longest stored slot's length before it.
+    """
+
+    def __init__(self, rows=()):
+        self.slots = defaultdict(list)
+        self.longest = defaultdict(int)
+        for key, slot in rows:
+            self.add(key, slot)
+
+    def add(self, key, slot):
+        insort(self.slots[key], slot, key=slot_start)
+        self.longest[key] = max(self.longest[key], slot.end - slot.start)
+
+    def conflicts(self, key, slot):
+        """Return the stored slots under the key that clash with the slot."""
+        slots = self.slots.get(key, [])
+        first = bisect_left(slots, slot.start - self.longest[key], key=slot_start)
+        last = bisect_left(slots, slot.end, key=slot_start)
+        return [
+            other for other in slots[first:last]
+            if other.clashes(slot) and (slot.booking_id is None or other.booking_id != slot.booking_id)
+        ]
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models import Q
+from .models import BlackoutDate, Lesson, User
+from .recurrence import expand_bookings
+
+
+def sync_lessons(booking):
+    """
+    Bring the booking's materialized lessons in line with its schedule.
+
+    The target occurrence set is compared with the stored lessons and only
+    the difference is written: one bulk delete for dates that no longer
+    occur (or duplicates), one bulk update for changed times or durations
+    and one bulk insert for new dates. Lessons are never written through
+    per-row signals, so the affected users' schedule version is bumped here.
+    Returns (created, updated, deleted).
+    """
+    return sync_many_lessons([booking])
+
+
+@transaction.atomic
+def sync_many_lessons(bookings):
+    """
+    Bring the materialized lessons of many bookings in line with their schedules.
+
+    Works like sync_lessons, with every booking expanded in one vectorized
+    pass, so the number of queries does not grow with the number of
+    bookings (their terms should be loaded with select_related).
+    Returns the total (created, updated, deleted).
+    """
+    bookings = [booking for booking in bookings if booking.term_id]
+    if not bookings:
+        return 0, 0, 0
+    blackout_dates = BlackoutDate.dates_by_term({booking.term_id for booking in bookings})
+    targets = {
+        booking.pk: (booking, set(dates.tolist()))
+        for booking, dates in zip(bookings, expand_bookings(bookings, blackout_dates=blackout_dates).split())
+    }
+
+    stale_ids = []
+    changed = []
+    touched = set()
+    kept_dates = {booking_id: set() for booking_id in targets}
+    for lesson in Lesson.objects.filter(booking_id__in=targets).only('id', 'booking_id', 'date', 'start_time', 'duration'):
+        booking, target_dates = targets[lesson.booking_id]
+        if lesson.date not in target_dates or lesson.date in kept_dates[booking.pk]:
+            stale_ids.append(lesson.id)
+            touched.add(booking)
+            continue
+        kept_dates[booking.pk].add(lesson.date)
+        if lesson.start_time != booking.start_time or lesson.duration != booking.duration:
+            lesson.start_time = booking.start_time
+            lesson.duration = booking.duration
+            changed.append(lesson)
+            touched.add(booking)
+
+    new_lessons = [
+        Lesson(booking=booking, date=date, start_time=booking.start_time, duration=booking.duration)
+        for booking, target_dates in targets.values()
+        for date in sorted(target_dates - kept_dates[booking.pk])
+    ]
+
+    if stale_ids:
+        Lesson.objects.filter(id__in=stale_ids).delete()
+    if changed:
+        Lesson.objects.bulk_update(changed, ['start_time', 'duration'])
+    if new_lessons:
+        Lesson.objects.bulk_create(new_lessons)
+    touched.update(lesson.booking for lesson in new_lessons)
+    if touched:
+        User.bump_schedule_versions(booking_users(touched))
+
+    return len(new_lessons), len(changed), len(stale_ids)
+
+
+def booking_users(bookings):
+    """Return the students and tutors of the bookings."""
+    return User.objects.filter(
+        Q(pk__in={booking.student_id for booking in bookings})
+        | Q(tutor__id__in={booking.tutor_id for booking in bookings if booking.tutor_id})
+    )
+
+
+def delete_lessons(booking):
+    """Remove every materialized lesson of the booking."""
+    deleted, _ = Lesson.objects.filter(booking=booking).delete()
+    if deleted:
+        User.bump_schedule_versions(booking.schedule_users())
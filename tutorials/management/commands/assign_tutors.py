@@ -0,0 +1,43 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.models import Booking
+from tutorials.scheduler import apply_assignments, plan_assignments
+
+
+class Command(BaseCommand):
+    """Assign tutors to every tutorless pending booking in one pass."""
+
+    help = 'Assigns tutors to all pending bookings without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the assignments without saving them.')
+        parser.add_argument('--term', type=int, help='Only assign bookings of this term.')
+        parser.add_argument('--capacity', type=int, help='Maximum number of bookings per tutor per term.')
+
+    def handle(self, *args, **options):
+        if options['capacity'] is not None and options['capacity'] < 1:
+            raise CommandError("Capacity must be at least 1.")
+        bookings = Booking.objects.all()
+        if options['term'] is not None:
+            bookings = bookings.filter(term_id=options['term'])
+
+        started = perf_counter()
+        plan = plan_assignments(bookings, capacity=options['capacity'])
+        elapsed = perf_counter() - started
+
+        if options['dry_run']:
+            for booking_id, tutor_id in sorted(plan.assignments.items()):
+                self.stdout.write(f"Booking {booking_id}: {plan.tutors[tutor_id]}")
+            for booking_id in plan.unassigned:
+                self.stdout.write(f"Booking {booking_id}: no tutor available")
+            saved = 0
+        else:
+            saved = apply_assignments(plan)
+
+        total = len(plan.assignments) + len(plan.unassigned)
+        summary = f"Assigned {len(plan.assignments)} of {total} pending bookings in {elapsed:.2f}s"
+        if options['dry_run']:
+            summary += " (dry run, nothing saved)"
+        elif saved != len(plan.assignments):
+            summary += f"; {len(plan.assignments) - saved} changed meanwhile and were skipped"
+        self.stdout.write(self.style.SUCCESS(summary))
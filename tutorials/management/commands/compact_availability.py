@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from tutorials.availability import compact_availability
+
+
+class Command(BaseCommand):
+    """Merge overlapping or touching availability windows into the minimal set of rows."""
+
+    help = 'Merges overlapping or adjacent tutor availability windows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tutor', type=int, action='append', help='Only compact this tutor (repeatable).')
+        parser.add_argument('--term', type=int, action='append', help='Only compact this term (repeatable).')
+
+    def handle(self, *args, **options):
+        created, updated, deleted = compact_availability(options['tutor'], options['term'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted availability: {created} added, {updated} changed, {deleted} removed"
+        ))
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand, CommandError
+from tutorials.capabilities import capabilities
 from tutorials.models import User, Term, Tutor, Language, Specialization, Booking, TutorAvalibility
 from django.core.exceptions import ValidationError
 import pytz
@@ -243,10 +244,9 @@ class Command(BaseCommand):
             language = languages.order_by('?').first()
             specialization = specializations.order_by('?').first() if random() > 0.5 else None
 
-            if specialization:
-                eligible_tutors = tutors.filter(specializations=specialization)
-            else:
-                eligible_tutors = tutors
+            eligible_tutors = tutors.filter(
+                pk__in=capabilities.tutors_for(language.id, specialization.id if specialization else None)
+            )
 
             
             days_of_week = [choice[0] for choice in Booking.DAYS_OF_WEEK]
@@ -255,7 +255,7 @@ class Command(BaseCommand):
 
             available_tutors = eligible_tutors.filter(
                 availabilities__term=term,
-                availabilities__day_of_week__icontains=day_of_week
+                availabilities__day_of_week__includes=day_of_week
             ).distinct()
 
             
@@ -264,7 +264,7 @@ class Command(BaseCommand):
                     if retry_day != day_of_week:
                         available_tutors = eligible_tutors.filter(
                             availabilities__term=term,
-                            availabilities__day_of_week__icontains=retry_day
+                            availabilities__day_of_week__includes=retry_day
                         ).distinct()
                         if available_tutors.exists():
                             day_of_week = retry_day
@@ -274,7 +274,7 @@ class Command(BaseCommand):
                     for retry_term in terms:
                         available_tutors = eligible_tutors.filter(
                             availabilities__term=retry_term,
-                            availabilities__day_of_week__icontains=day_of_week
+                            availabilities__day_of_week__includes=day_of_week
                         ).distinct()
                         if available_tutors.exists():
                             term = retry_term
@@ -320,14 +320,13 @@ class Command(BaseCommand):
         for tutor in tutors:
             for term in terms:
                
-                for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']:
-                    TutorAvalibility.objects.get_or_create(
-                        tutor=tutor,
-                        term=term,
-                        day_of_week=day,
-                        start_time=time(9, 0), 
-                        end_time=time(17, 0)   
-                    )
+                TutorAvalibility.objects.get_or_create(
+                    tutor=tutor,
+                    term=term,
+                    day_of_week=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
+                    start_time=time(9, 0),
+                    end_time=time(17, 0)
+                )
 
 
 def create_username(first_name, last_name):
@@ -0,0 +1,76 @@
+"""Rank the tutors able to take a booking."""
+
+from typing import NamedTuple
+from .capabilities import capabilities
+from .intervals import Slot, to_minutes
+from .models import Booking, Tutor, TutorAvalibility
+
+
+class Match(NamedTuple):
+    """A tutor able to take a booking, with the figures used to rank it."""
+    tutor: Tutor
+    load: int
+    window: TutorAvalibility
+    slack: int
+
+
+def rank_tutors(booking):
+    """
+    Return the tutors able to take the booking, best fit first.
+
+    A tutor fits if they teach the language, offer the specialization (when
+    one is requested), have an availability window in the term covering the
+    slot and have no accepted booking clashing with it (fortnightly bookings
+    on alternate weeks do not clash). Fits are ordered by the number of
+    accepted bookings they already hold in the term, then by the tightest
+    covering window, so wide windows stay free for others.
+    Runs in two queries regardless of the number of tutors, once the
+    capability index is loaded.
+    """
+    slot = Slot.of(booking)
+    start, end = slot.start, slot.end
+    if end > 24 * 60:
+        return []
+
+    tutor_ids = capabilities.tutors_for(booking.language_id, booking.specialization_id)
+    windows = (
+        TutorAvalibility.objects
+        .filter(
+            term_id=booking.term_id,
+            day_of_week__includes=booking.day_of_week,
+            start_time__lte=booking.start_time,
+            tutor_id__in=tutor_ids,
+        )
+        .select_related('tutor__user')
+    )
+    best_windows = {}
+    for window in windows:
+        if to_minutes(window.end_time) < end:
+            continue
+        slack = to_minutes(window.end_time) - to_minutes(window.start_time) - (end - start)
+        if window.tutor_id not in best_windows or slack < best_windows[window.tutor_id][1]:
+            best_windows[window.tutor_id] = (window, slack)
+    if not best_windows:
+        return []
+
+    loads = dict.fromkeys(best_windows, 0)
+    accepted = (
+        Booking.objects
+        .filter(status=Booking.ACCEPTED, term_id=booking.term_id, tutor_id__in=best_windows)
+        .exclude(pk=booking.pk)
+        .order_by()
+        .values_list('tutor_id', 'day_of_week', 'start_time', 'duration', 'frequency', 'week_parity')
+    )
+    for tutor_id, day_of_week, start_time, duration, frequency, week_parity in accepted:
+        loads[tutor_id] += 1
+        if day_of_week != booking.day_of_week or tutor_id not in best_windows:
+            continue
+        if slot.clashes(Slot.build(start_time, duration, frequency, week_parity)):
+            del best_windows[tutor_id]
+
+    matches = [
+        Match(window.tutor, loads[tutor_id], window, slack)
+        for tutor_id, (window, slack) in best_windows.items()
+    ]
+    matches.sort(key=lambda match: (match.load, match.slack, match.tutor.user.last_name, match.tutor.pk))
+    return matches
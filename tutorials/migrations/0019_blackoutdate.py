@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0018_lesson_booking_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlackoutDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=100)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blackout_dates', to='tutorials.term')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('term', 'date'), name='unique_blackout_date_per_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0019_blackoutdate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='schedule_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='schedule_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+import tutorials.models
+
+
+def populate_calendar_tokens(apps, schema_editor):
+    User = apps.get_model('tutorials', 'User')
+    users = list(User.objects.only('id'))
+    for user in users:
+        user.calendar_token = tutorials.models.generate_calendar_token()
+    User.objects.bulk_update(users, ['calendar_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0020_user_schedule_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='calendar_token',
+            field=models.CharField(editable=False, max_length=43, null=True),
+        ),
+        migrations.RunPython(populate_calendar_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='calendar_token',
+            field=models.CharField(default=tutorials.models.generate_calendar_token, editable=False, max_length=43, unique=True),
+        ),
+    ]
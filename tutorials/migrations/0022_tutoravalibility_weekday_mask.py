@@ -0,0 +1,55 @@
+from django.db import migrations, models
+import tutorials.fields
+
+
+def days_to_masks(apps, schema_editor):
+    TutorAvalibility = apps.get_model('tutorials', 'TutorAvalibility')
+    availabilities = list(TutorAvalibility.objects.only('id', 'day_of_week'))
+    for availability in availabilities:
+        days = availability.day_of_week
+        if isinstance(days, str):
+            days = [day for day in days.split(',') if day]
+        availability.day_mask = tutorials.fields.weekdays_to_mask(list(days))
+    TutorAvalibility.objects.bulk_update(availabilities, ['day_mask'], batch_size=500)
+
+
+def masks_to_days(apps, schema_editor):
+    TutorAvalibility = apps.get_model('tutorials', 'TutorAvalibility')
+    availabilities = list(TutorAvalibility.objects.only('id', 'day_mask'))
+    for availability in availabilities:
+        availability.day_of_week = tutorials.fields.mask_to_weekdays(availability.day_mask)
+    TutorAvalibility.objects.bulk_update(availabilities, ['day_of_week'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0021_user_calendar_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutoravalibility',
+            name='day_mask',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(days_to_masks, masks_to_days),
+        migrations.RemoveField(
+            model_name='tutoravalibility',
+            name='day_of_week',
+        ),
+        migrations.RenameField(
+            model_name='tutoravalibility',
+            old_name='day_mask',
+            new_name='day_of_week',
+        ),
+        migrations.AlterField(
+            model_name='tutoravalibility',
+            name='day_of_week',
+            field=tutorials.fields.WeekdaysField(),
+        ),
+        migrations.AddIndex(
+            model_name='tutoravalibility',
+            index=models.Index(fields=['term', 'day_of_week', 'tutor'], name='availability_term_day_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0022_tutoravalibility_weekday_mask'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='booking',
+            name='unique_tutor_booking_per_time',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='week_parity',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'First week'), (1, 'Second week')], default=0, help_text="For fortnightly bookings, whether lessons start in the term's first or second week.", verbose_name='Week'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Accepted')), fields=('tutor', 'term', 'day_of_week', 'start_time', 'week_parity'), name='unique_tutor_booking_per_time'),
+        ),
+    ]
@@ -1,14 +1,25 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 from libgravatar import Gravatar
 from django.core.exceptions import ValidationError
-from datetime import timedelta, time, datetime
+from datetime import timedelta, time
 import logging
-from multiselectfield import MultiSelectField
+import secrets
+from .calendar_cache import get_or_build
+from .fields import WEEKDAY_CHOICES, WeekdaysField
+from .validation import BookingValidator
+from .recurrence import WEEKDAY_INDEX, expand_bookings
 
 
 
+def generate_calendar_token():
+    """Return a random, URL-safe token identifying a user's calendar feed."""
+    return secrets.token_urlsafe(32)
+
+
 class User(AbstractUser):
     """Model used for user authentication, and team member-related information."""
 
@@ -34,10 +45,20 @@ class User(AbstractUser):
         default='student',
         blank=False
     )
+    schedule_version = models.PositiveIntegerField(default=0, editable=False)
+    schedule_updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    calendar_token = models.CharField(max_length=43, unique=True, default=generate_calendar_token, editable=False)
 
     class Meta:
         """Model options."""
         ordering = ['last_name', 'first_name']
+        # Serve the case-insensitive prefix searches of tutorials.search.
+        indexes = [
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
 
     def full_name(self):
         """Return a string containing the user's full name."""
@@ -58,6 +79,13 @@ class User(AbstractUser):
         """Check if the user is a tutor."""
         return self.account_type == 'tutor'
 
+    @classmethod
+    def bump_schedule_versions(cls, users):
+        """Mark the schedules of the given users (a queryset or ids) as changed."""
+        if not isinstance(users, models.QuerySet):
+            users = cls.objects.filter(pk__in=users)
+        users.update(schedule_version=models.F('schedule_version') + 1, schedule_updated_at=timezone.now())
+
 
 class Language(models.Model):
     """Represents a programming language that tutors can teach."""
@@ -124,27 +152,51 @@ class Term(models.Model):
         return f"{self.name} ({self.start_date} - {self.end_date})"
 
 
+class BlackoutDate(models.Model):
+    """Represents a date within a term on which no lessons take place."""
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='blackout_dates')
+    date = models.DateField()
+    reason = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'date'], name='unique_blackout_date_per_term')
+        ]
+
+    def clean(self):
+        """Validate that the blackout date falls within its term."""
+        if self.term_id and self.date and not (self.term.start_date <= self.date <= self.term.end_date):
+            raise ValidationError({'date': "Blackout date must fall within the term."})
+
+    @classmethod
+    def dates_by_term(cls, term_ids):
+        """Return a mapping of term id to the blackout dates of that term."""
+        blackout_dates = {}
+        for term_id, date in cls.objects.filter(term_id__in=term_ids).order_by().values_list('term_id', 'date'):
+            blackout_dates.setdefault(term_id, []).append(date)
+        return blackout_dates
+
+    def __str__(self):
+        return f"{self.date} ({self.reason or 'No lessons'})"
+
+
 class TutorAvalibility(models.Model):
     """Represents a tutor's availability."""
-    DAY_CHOICES = [
-        ('monday', 'Monday'),
-        ('tuesday', 'Tuesday'),
-        ('wednesday', 'Wednesday'),
-        ('thursday', 'Thursday'),
-        ('friday', 'Friday'),
-        ('saturday', 'Saturday'),
-        ('sunday', 'Sunday'),
-    ]
+    DAY_CHOICES = WEEKDAY_CHOICES
 
     tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE, related_name='availabilities')
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='availabilities')
-    day_of_week = MultiSelectField(choices=DAY_CHOICES)
+    day_of_week = WeekdaysField()
     start_time = models.TimeField()
     end_time = models.TimeField()
 
     class Meta:
         verbose_name = "Tutor Availability"
         verbose_name_plural = "Tutor Availabilities"
+        indexes = [
+            models.Index(fields=['term', 'day_of_week', 'tutor'], name='availability_term_day_idx'),
+        ]
 
     def clean(self):
         """Validate availability times."""
@@ -180,6 +232,14 @@ class BookingManager(models.Manager):
     def rejected(self):
         return self.filter(student_approval=Booking.STUDENT_REJECTED)
 
+    def accepted_for(self, user):
+        """Return the accepted bookings that appear in the user's calendar."""
+        if user.account_type == 'student':
+            return self.filter(student=user, status=Booking.ACCEPTED)
+        if user.account_type == 'tutor':
+            return self.filter(tutor__user=user, status=Booking.ACCEPTED)
+        return self.none()
+
 
 
 class Booking(models.Model):
@@ -239,6 +299,13 @@ class Booking(models.Model):
         ('Fortnightly', 'Fortnightly'),
     ]
 
+    FIRST_WEEK = 0
+    SECOND_WEEK = 1
+    WEEK_PARITY_CHOICES = [
+        (FIRST_WEEK, 'First week'),
+        (SECOND_WEEK, 'Second week'),
+    ]
+
     tutor = models.ForeignKey(Tutor, related_name='tutor_bookings', on_delete=models.CASCADE, null=True, blank=True)
     specialization = models.ForeignKey(
         'Specialization',
@@ -272,6 +339,12 @@ class Booking(models.Model):
         default='Weekly',
         verbose_name='Frequency'
     )
+    week_parity = models.PositiveSmallIntegerField(
+        choices=WEEK_PARITY_CHOICES,
+        default=FIRST_WEEK,
+        verbose_name='Week',
+        help_text="For fortnightly bookings, whether lessons start in the term's first or second week."
+    )
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -316,7 +389,7 @@ class Booking(models.Model):
         verbose_name_plural = 'Bookings'
         constraints = [
             models.UniqueConstraint(
-                fields=['tutor', 'term', 'day_of_week', 'start_time'],
+                fields=['tutor', 'term', 'day_of_week', 'start_time', 'week_parity'],
                 condition=models.Q(status='Accepted'),
                 name='unique_tutor_booking_per_time'
             )
@@ -324,65 +397,23 @@ class Booking(models.Model):
 
     def clean(self):
         """Validate that the booking's fields are correct and consistent."""
-        if not self.term_id:
-            raise ValidationError({'term': 'Please select a term.'})
-
-        if self.specialization and self.tutor:
-            if not self.tutor.specializations.filter(id=self.specialization.id).exists():
-                raise ValidationError({'specialization': f"The selected tutor does not offer specialization in {self.specialization}."})
-
-        if self.tutor:
-            availability = TutorAvalibility.objects.filter(
-                tutor=self.tutor,
-                term=self.term,
-                day_of_week__icontains=self.day_of_week  
-            )
+        BookingValidator([self]).validate(self)
 
-            if not availability.exists():
-                raise ValidationError(
-                    f"Tutor is not available on {self.day_of_week} for the selected term."
-                )
-
-            end_time = (datetime.combine(datetime.today(), self.start_time) + self.duration).time()
-            for slot in availability:
-                if slot.start_time <= self.start_time < slot.end_time and slot.start_time < end_time <= slot.end_time:
-                    break
-            else:
-                available_slots = ", ".join(
-                    f"{slot.start_time.strftime('%H:%M')} to {slot.end_time.strftime('%H:%M')}"
-                    for slot in availability
-                )
-                raise ValidationError(
-                    f"Tutor is not available at the selected time. Available times for {self.day_of_week}: {available_slots}."
-                )
-
-        overlapping_bookings = Booking.objects.filter(
-            tutor=self.tutor,
-            term=self.term,
-            day_of_week=self.day_of_week,
-            start_time=self.start_time,
-            status=Booking.ACCEPTED
-        ).exclude(pk=self.pk)
-
-        if overlapping_bookings.exists():
-            raise ValidationError(f"Tutor is already booked at this time: {self.day_of_week} at {self.start_time}.")
-        
     def calculate_booking_date(self, term_start):
         """Calculate the first occurrence of the booking's day of the week within the term."""
         term_start_weekday = term_start.weekday()
         booking_weekday = self.get_weekday_index(self.day_of_week)
 
         days_difference = (booking_weekday - term_start_weekday) % 7
+        if self.frequency == Booking.FORTNIGHTLY:
+            days_difference += 7 * self.week_parity
         booking_date = term_start + timedelta(days=days_difference)
         return booking_date
 
     @staticmethod
     def get_weekday_index(day_name):
         """Convert weekday name to a numerical index (Monday=0, Sunday=6)."""
-        days = {day: index for index, day in enumerate([
-            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
-        ])}
-        return days[day_name]
+        return WEEKDAY_INDEX[day_name]
 
     def __str__(self):
         tutor_name = self.tutor.user.full_name() if self.tutor else "No Tutor Assigned"
@@ -399,64 +430,74 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
     
     
-    def get_recurring_dates(self):
-        """Calculate all recurring dates for the booking based on frequency."""
+    def schedule_users(self):
+        """Return the users whose schedule includes this booking."""
+        users = models.Q(pk=self.student_id)
+        if self.tutor_id:
+            users |= models.Q(tutor__id=self.tutor_id)
+        return User.objects.filter(users)
+
+    def get_recurring_dates(self, start=None, end=None, blackout_dates=None):
+        """
+        Calculate the recurring dates for the booking based on frequency.
+
+        Only dates in the window [start, end) are returned and the term's
+        blackout dates are skipped; pass blackout_dates to avoid loading them.
+        """
         if not self.term:
             return []
 
-        recurring_dates = []
-
-        day_of_week_mapping = {
-            'Monday': 0,
-            'Tuesday': 1,
-            'Wednesday': 2,
-            'Thursday': 3,
-            'Friday': 4,
-            'Saturday': 5,
-            'Sunday': 6,
-        }
-        booking_weekday = day_of_week_mapping.get(self.day_of_week, 0)
-
-        current_date = self.term.start_date
-        while current_date.weekday() != booking_weekday:
-            current_date += timedelta(days=1)
-
-        if self.frequency == 'Weekly':
-            interval_days = 7
-        elif self.frequency == 'Fortnightly':
-            interval_days = 14
-        else:
-            interval_days = 7
+        if blackout_dates is None:
+            blackout_dates = BlackoutDate.dates_by_term([self.term_id])
+        occurrences = expand_bookings([self], start, end, blackout_dates)
+        return occurrences.dates.tolist()
 
-        while current_date <= self.term.end_date:
-            recurring_dates.append(current_date)
-            current_date += timedelta(days=interval_days)
+    @classmethod
+    def calendar_occurrences(cls, user, start=None, end=None):
+        """
+        Return (booking, dates) pairs for the user's accepted bookings.
+
+        Only occurrences in [start, end) are expanded, in one vectorized pass
+        over all bookings, using a fixed number of queries.
+        """
+        bookings = cls.objects.accepted_for(user)
+        if start is not None:
+            bookings = bookings.filter(term__end_date__gte=start)
+        if end is not None:
+            bookings = bookings.filter(term__start_date__lt=end)
+        bookings = list(bookings.select_related('term', 'language', 'specialization', 'tutor__user'))
+        blackout_dates = BlackoutDate.dates_by_term({booking.term_id for booking in bookings})
+        occurrences = expand_bookings(bookings, start, end, blackout_dates)
+        return [(booking, dates.tolist()) for booking, dates in zip(bookings, occurrences.split())]
 
-        return recurring_dates
     @classmethod
-    def fetch_calendar_data(cls, user):
+    def fetch_calendar_data(cls, user, start=None, end=None):
         """
         Fetch approved bookings for the given user and return data for the calendar.
+
+        When start and/or end are given, only occurrences in [start, end) are
+        returned. Results are cached per user and window.
         """
-        if user.account_type == 'student':
-            bookings = cls.objects.filter(student=user, status=Booking.ACCEPTED)
-        elif user.account_type == 'tutor':
-            bookings = cls.objects.filter(tutor=user.tutor, status=Booking.ACCEPTED)
-        else:
-            bookings = cls.objects.none()
-    
-        calendar_data = []
-    
-        for booking in bookings:
-            recurring_dates = booking.get_recurring_dates()
-            for date in recurring_dates:
-                calendar_data.append({
-                    'title': f"{booking.language.name} with {booking.tutor.user.full_name() if booking.tutor else 'No Tutor'}",
-                    'date': date.isoformat(),  
-                    'description': f"Subject: {booking.specialization.name if booking.specialization else 'General'}",
-                })
-    
-        return calendar_data
+        def build():
+            calendar_data = []
+            for booking, dates in cls.calendar_occurrences(user, start, end):
+                for date in dates:
+                    calendar_data.append({
+                        'title': booking.calendar_title(),
+                        'date': date.isoformat(),
+                        'description': booking.calendar_description(),
+                    })
+            return calendar_data
+
+        return get_or_build(user, 'bookings', start, end, build)
+
+    def calendar_title(self):
+        """Return the title shown for the booking's lessons in calendars."""
+        return f"{self.language.name} with {self.tutor.user.full_name() if self.tutor else 'No Tutor'}"
+
+    def calendar_description(self):
+        """Return the description shown for the booking's lessons in calendars."""
+        return f"Subject: {self.specialization.name if self.specialization else 'General'}"
     
     def __str__(self):
         tutor_name = self.tutor.user.full_name() if self.tutor else "No Tutor Assigned"
@@ -472,6 +513,29 @@ class Booking(models.Model):
             self.status = Booking.PENDING
         super().save(*args, **kwargs)
 
+class LessonQuerySet(models.QuerySet):
+    """Custom queryset for reading materialized lessons by user and date."""
+
+    def for_user(self, user):
+        """Return the lessons of the user's accepted bookings."""
+        if user.account_type == 'student':
+            lessons = self.filter(booking__student=user)
+        elif user.account_type == 'tutor':
+            lessons = self.filter(booking__tutor__user=user)
+        else:
+            return self.none()
+        return lessons.filter(booking__status=Booking.ACCEPTED)
+
+    def between(self, start=None, end=None):
+        """Return the lessons dated within [start, end)."""
+        lessons = self
+        if start is not None:
+            lessons = lessons.filter(date__gte=start)
+        if end is not None:
+            lessons = lessons.filter(date__lt=end)
+        return lessons
+
+
 class Lesson(models.Model):
     """Represents a lesson generated from a booking."""
     booking = models.ForeignKey('Booking', on_delete=models.CASCADE)
@@ -479,5 +543,36 @@ class Lesson(models.Model):
     start_time = models.TimeField()
     duration = models.DurationField()
 
+    objects = LessonQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['booking', 'date'], name='lesson_booking_date_idx'),
+        ]
+
+    @classmethod
+    def fetch_calendar_data(cls, user, start=None, end=None):
+        """
+        Return calendar data for the user read from the materialized lessons.
+
+        Only lessons dated within [start, end) are loaded, so the cost scales
+        with the number of visible lessons rather than with the term length.
+        Results are cached per user and window.
+        """
+        def build():
+            lessons = cls.objects.for_user(user).between(start, end).select_related(
+                'booking__language', 'booking__specialization', 'booking__tutor__user'
+            ).order_by('date', 'start_time')
+            return [
+                {
+                    'title': lesson.booking.calendar_title(),
+                    'date': lesson.date.isoformat(),
+                    'description': lesson.booking.calendar_description(),
+                }
+                for lesson in lessons
+            ]
+
+        return get_or_build(user, 'lessons', start, end, build)
+
     def __str__(self):
-        return f'Lesson on {self.date} at {self.start_time}'
\ No newline at end of file
+        return f'Lesson on {self.date} at {self.start_time}'
@@ -0,0 +1,99 @@
+"""Organisation-wide occupancy per term, weekday and 15-minute slot."""
+
+import numpy as np
+from .intervals import to_minutes
+from .models import Booking, TutorAvalibility
+from .recurrence import WEEKDAYS, WEEKDAY_INDEX
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+def slot_bitmaps(start_slots, end_slots):
+    """Return one row per interval with True for every slot in [start, end)."""
+    slots = np.arange(SLOTS_PER_DAY)
+    return (slots >= np.asarray(start_slots)[:, None]) & (slots < np.asarray(end_slots)[:, None])
+
+
+def sum_bitmaps(term_count, term_positions, weekdays, bitmaps, weights=None):
+    """Sum weighted slot bitmaps into a (term, weekday, slot) occupancy grid."""
+    grid = np.zeros((term_count, len(WEEKDAYS), SLOTS_PER_DAY))
+    if len(bitmaps):
+        values = bitmaps if weights is None else bitmaps * np.asarray(weights)[:, None]
+        np.add.at(grid, (np.asarray(term_positions), np.asarray(weekdays)), values)
+    return grid
+
+
+def booked_grid(term_ids):
+    """
+    Return the number of accepted lessons running in every slot.
+
+    Fortnightly bookings take place every other week and count as half a lesson.
+    """
+    rows = list(Booking.objects.filter(status=Booking.ACCEPTED, tutor__isnull=False, term_id__in=term_ids).values_list(
+        'term_id', 'day_of_week', 'start_time', 'duration', 'frequency'
+    ))
+    term_ids = np.asarray(term_ids)
+    if not rows:
+        return sum_bitmaps(term_ids.size, [], [], [])
+    booking_terms, days, start_times, durations, frequencies = zip(*rows)
+
+    start_minutes = np.array([to_minutes(value) for value in start_times], dtype=np.int64)
+    duration_minutes = np.array(durations, dtype='timedelta64[us]').astype('timedelta64[m]').astype(np.int64)
+    start_slots = start_minutes // SLOT_MINUTES
+    end_slots = np.minimum(-(-(start_minutes + duration_minutes) // SLOT_MINUTES), SLOTS_PER_DAY)
+    weights = np.where(np.array(frequencies) == Booking.FORTNIGHTLY, 0.5, 1.0)
+
+    return sum_bitmaps(
+        term_ids.size,
+        np.searchsorted(term_ids, booking_terms),
+        [WEEKDAY_INDEX[day] for day in days],
+        slot_bitmaps(start_slots, end_slots),
+        weights,
+    )
+
+
+def available_grid(term_ids):
+    """Return the number of tutors available in every slot."""
+    rows = TutorAvalibility.objects.filter(term_id__in=term_ids).values_list(
+        'term_id', 'day_of_week', 'start_time', 'end_time'
+    )
+    term_ids = np.asarray(term_ids)
+    expanded = [
+        (term_id, WEEKDAY_INDEX[day.capitalize()], to_minutes(start_time), to_minutes(end_time))
+        for term_id, days, start_time, end_time in rows
+        for day in days
+    ]
+    if not expanded:
+        return sum_bitmaps(term_ids.size, [], [], [])
+    availability_terms, weekdays, start_minutes, end_minutes = zip(*expanded)
+
+    start_slots = np.array(start_minutes, dtype=np.int64) // SLOT_MINUTES
+    end_slots = -(-np.array(end_minutes, dtype=np.int64) // SLOT_MINUTES)
+    return sum_bitmaps(
+        term_ids.size,
+        np.searchsorted(term_ids, availability_terms),
+        weekdays,
+        slot_bitmaps(start_slots, end_slots),
+    )
+
+
+def occupancy(terms):
+    """Return the booked and available slot grids of each term, ready for JSON."""
+    terms = sorted(terms, key=lambda term: term.pk)
+    term_ids = [term.pk for term in terms]
+    booked = booked_grid(term_ids)
+    available = available_grid(term_ids)
+    return {
+        'slot_minutes': SLOT_MINUTES,
+        'weekdays': WEEKDAYS,
+        'terms': [
+            {
+                'id': term.pk,
+                'name': str(term),
+                'booked': booked[position].tolist(),
+                'available': available[position].tolist(),
+            }
+            for position, term in enumerate(terms)
+        ],
+    }
@@ -0,0 +1,137 @@
+"""Keyset (seek) pagination over a fixed ordering."""
+
+import base64
+import json
+from functools import reduce
+from operator import or_
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+PAGE_SIZE = 25
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(values):
+    """Return an opaque, URL-safe cursor for the ordering values of a row."""
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+
+def decode_cursor(cursor, fields):
+    """Return the ordering values stored in a cursor, converted to the types of the ordering fields."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, UnicodeError) as error:
+        raise InvalidCursor(cursor) from error
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+    try:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, ValueError, TypeError) as error:
+        raise InvalidCursor(cursor) from error
+    if None in values:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def ordering_fields(queryset, ordering):
+    """Return the model field, or annotation output field, behind each name of the ordering."""
+    fields = []
+    for field in ordering:
+        name = field.lstrip('-')
+        if name in queryset.query.annotations:
+            fields.append(queryset.query.annotations[name].output_field)
+            continue
+        model = queryset.model
+        for part in name.split('__'):
+            target = model._meta.get_field(part)
+            model = target.related_model
+        fields.append(target)
+    return fields
+
+
+def row_values(row, ordering):
+    """Return the values of the ordering fields of a row, following relations."""
+    values = []
+    for field in ordering:
+        value = row
+        for name in field.lstrip('-').split('__'):
+            value = getattr(value, name)
+        values.append(value)
+    return values
+
+
+def after(ordering, values):
+    """Return the filter selecting the rows that come after the given values in the ordering."""
+    conditions = []
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        equal = {other.lstrip('-'): value for other, value in zip(ordering[:position], values)}
+        conditions.append(Q(**equal, **{f'{name}__{lookup}': values[position]}))
+    return reduce(or_, conditions)
+
+
+def reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+class KeysetPage:
+    """
+    One page of rows, with cursors to the pages before and after it.
+
+    `ordering` must end with a unique field (usually the id) so that every
+    row has a distinct position. Each page is one query of size + 1 rows,
+    however far it is from the start.
+    """
+
+    def __init__(self, queryset, ordering, after_cursor=None, before_cursor=None, size=PAGE_SIZE):
+        self.ordering = list(ordering)
+        self.size = size
+        fields = ordering_fields(queryset, self.ordering)
+        backwards = before_cursor is not None and after_cursor is None
+        if backwards:
+            ordering = reverse_ordering(self.ordering)
+            queryset = queryset.filter(after(ordering, decode_cursor(before_cursor, fields)))
+        else:
+            ordering = self.ordering
+            if after_cursor is not None:
+                queryset = queryset.filter(after(ordering, decode_cursor(after_cursor, fields)))
+
+        rows = list(queryset.order_by(*ordering)[:size + 1])
+        more = len(rows) > size
+        rows = rows[:size]
+        if backwards:
+            rows.reverse()
+            self.has_previous, self.has_next = more, True
+        else:
+            self.has_previous, self.has_next = after_cursor is not None, more
+        self.object_list = rows
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return encode_cursor(row_values(self.object_list[-1], self.ordering))
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return encode_cursor(row_values(self.object_list[0], self.ordering))
+        return None
+
+
+def keyset_page(request, queryset, ordering, size=PAGE_SIZE):
+    """Return the page of the queryset selected by the request's `after`/`before` parameters."""
+    return KeysetPage(
+        queryset, ordering, request.GET.get('after'), request.GET.get('before'), size
+    )
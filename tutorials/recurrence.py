@@ -0,0 +1,100 @@
+"""Vectorized expansion of recurring bookings into lesson dates."""
+
+from typing import NamedTuple
+import numpy as np
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+WEEKDAY_INDEX = {day: index for index, day in enumerate(WEEKDAYS)}
+FREQUENCY_DAYS = {'Weekly': 7, 'Fortnightly': 14}
+
+# Day zero of datetime64[D] (1970-01-01) was a Thursday.
+EPOCH_WEEKDAY = 3
+# Multiplier used to pack (term id, day number) pairs into a single integer key.
+TERM_KEY_STRIDE = 1 << 32
+
+
+class Occurrences(NamedTuple):
+    """Flat arrays pairing every occurrence date with the position of its booking."""
+
+    index: np.ndarray
+    dates: np.ndarray
+    size: int
+
+    def counts(self):
+        """Return the number of occurrences of each booking."""
+        return np.bincount(self.index, minlength=self.size)
+
+    def split(self):
+        """Return one array of dates per booking, in booking order."""
+        if not self.size:
+            return []
+        return np.split(self.dates, np.cumsum(self.counts())[:-1])
+
+
+def to_days(values):
+    """Convert dates (or datetime64 values) to integer day numbers."""
+    return np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+
+
+def expand(
+    term_starts, term_ends, weekdays, intervals, start=None, end=None, term_ids=None, blackout_dates=None,
+    week_offsets=None,
+):
+    """
+    Expand recurrences described by parallel arrays into occurrence dates.
+
+    Each recurrence starts on the first `weekdays` (Monday=0) on or after its
+    term start, pushed back by `week_offsets` weeks, and repeats every
+    `intervals` days until the term end. Only
+    dates in [start, end) are produced. `blackout_dates` maps a term id to the
+    dates on which no lesson of that term takes place and needs `term_ids`.
+    """
+    term_start_days = to_days(term_starts)
+    last_days = to_days(term_ends)
+    weekdays = np.asarray(weekdays, dtype=np.int64)
+    intervals = np.asarray(intervals, dtype=np.int64)
+
+    first_days = term_start_days + (weekdays - (term_start_days + EPOCH_WEEKDAY) % 7) % 7
+    if week_offsets is not None:
+        first_days = first_days + 7 * np.asarray(week_offsets, dtype=np.int64)
+    lower_days = first_days if start is None else np.maximum(first_days, to_days(start))
+    if end is not None:
+        last_days = np.minimum(last_days, to_days(end) - 1)
+
+    first_steps = -((first_days - lower_days) // intervals)
+    last_steps = (last_days - first_days) // intervals
+    counts = np.maximum(last_steps - first_steps + 1, 0)
+
+    index = np.repeat(np.arange(first_days.size), counts)
+    offsets = np.arange(index.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    days = first_days[index] + (first_steps[index] + offsets) * intervals[index]
+
+    if blackout_dates:
+        blackout_keys = np.array([
+            term_id * TERM_KEY_STRIDE + day
+            for term_id, dates in blackout_dates.items()
+            for day in to_days(list(dates)).tolist()
+        ], dtype=np.int64)
+        keys = np.asarray(term_ids, dtype=np.int64)[index] * TERM_KEY_STRIDE + days
+        keep = ~np.isin(keys, blackout_keys)
+        index, days = index[keep], days[keep]
+
+    return Occurrences(index, days.astype('datetime64[D]'), first_days.size)
+
+
+def expand_bookings(bookings, start=None, end=None, blackout_dates=None):
+    """Expand many bookings (with their terms loaded) in a single vectorized pass."""
+    bookings = list(bookings)
+    return expand(
+        [booking.term.start_date for booking in bookings],
+        [booking.term.end_date for booking in bookings],
+        [WEEKDAY_INDEX[booking.day_of_week] for booking in bookings],
+        [FREQUENCY_DAYS.get(booking.frequency, 7) for booking in bookings],
+        start=start,
+        end=end,
+        term_ids=[booking.term_id for booking in bookings],
+        blackout_dates=blackout_dates,
+        week_offsets=[
+            booking.week_parity if booking.frequency == 'Fortnightly' else 0 for booking in bookings
+        ],
+    )
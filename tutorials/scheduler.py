@@ -0,0 +1,234 @@
+"""Assign tutors to all tutorless pending bookings at once."""
+
+from collections import defaultdict
+from typing import NamedTuple
+from django.db import transaction
+from .capabilities import capabilities
+from .intervals import IntervalIndex, Slot, to_minutes
+from .models import Booking, Tutor, TutorAvalibility
+
+
+class AssignmentPlan(NamedTuple):
+    """The tutor chosen for each booking, and the bookings left without one."""
+    assignments: dict
+    unassigned: list
+    tutors: dict
+
+
+class Scheduler:
+    """
+    In-memory assignment of bookings to tutors.
+
+    Bookings are placed most constrained first. When every eligible tutor
+    is blocked, a tutor is freed by moving one of their planned bookings
+    to another tutor, along an augmenting path as in Kuhn's matching
+    algorithm. A tutor never holds two clashing lessons on the same term
+    and weekday (see Slot.clashes), nor more than `capacity` bookings in a
+    term.
+
+    A search tries to free each full (tutor, term) at most once. When a
+    search fails, the full pairs it tried cannot be freed later either,
+    since moves only swap bookings, so later searches skip them. Searches
+    therefore stay short when capacity binds.
+    """
+
+    def __init__(self, bookings, tutor_languages, tutor_specializations, windows, accepted, capacity=None):
+        self.bookings = {booking.id: booking for booking in bookings}
+        self.capacity = capacity
+        self.planned = {}
+        self.planned_by = defaultdict(list)
+        self.busy = defaultdict(list)
+        self.load = defaultdict(int)
+        self.exhausted = set()
+        self.searched = set()
+        self.slots = {booking.id: Slot.of(booking) for booking in bookings}
+        self.keys = {booking.id: (booking.term_id, booking.day_of_week.lower()) for booking in bookings}
+
+        windows_by_language = defaultdict(list)
+        for tutor_id, term_id, days, start_time, end_time in windows:
+            start, end = to_minutes(start_time), to_minutes(end_time)
+            for day in days:
+                for language_id in tutor_languages.get(tutor_id, ()):
+                    windows_by_language[term_id, day, language_id].append((tutor_id, start, end))
+
+        fixed = IntervalIndex()
+        for tutor_id, term_id, day, start_time, duration, frequency, week_parity in accepted:
+            fixed.add((tutor_id, term_id, day.lower()), Slot.build(start_time, duration, frequency, week_parity))
+            self.load[tutor_id, term_id] += 1
+
+        self.candidates = {}
+        for booking in bookings:
+            slot = self.slots[booking.id]
+            term_id, day = self.keys[booking.id]
+            specialization_id = booking.specialization_id
+            slack = {}
+            for tutor_id, start, end in windows_by_language[term_id, day, booking.language_id]:
+                if start > slot.start or slot.end > end:
+                    continue
+                if specialization_id and specialization_id not in tutor_specializations.get(tutor_id, ()):
+                    continue
+                if (tutor_id, term_id, day) in fixed.slots and fixed.conflicts((tutor_id, term_id, day), slot):
+                    continue
+                if tutor_id not in slack or end - start < slack[tutor_id][0]:
+                    slack[tutor_id] = (end - start, tutor_id)
+            self.candidates[booking.id] = [tutor_id for _, tutor_id in sorted(slack.values())]
+
+    def place(self, booking_id, tutor_id):
+        term_id, day = self.keys[booking_id]
+        self.planned[booking_id] = tutor_id
+        self.planned_by[tutor_id, term_id].append(booking_id)
+        self.busy[tutor_id, term_id, day].append(booking_id)
+        self.load[tutor_id, term_id] += 1
+
+    def unplace(self, booking_id):
+        term_id, day = self.keys[booking_id]
+        tutor_id = self.planned.pop(booking_id)
+        self.planned_by[tutor_id, term_id].remove(booking_id)
+        self.busy[tutor_id, term_id, day].remove(booking_id)
+        self.load[tutor_id, term_id] -= 1
+        return tutor_id
+
+    def full(self, tutor_id, term_id):
+        return self.capacity is not None and self.load[tutor_id, term_id] >= self.capacity
+
+    def overlapping(self, booking_id, tutor_id):
+        term_id, day = self.keys[booking_id]
+        slot = self.slots[booking_id]
+        return [other for other in self.busy[tutor_id, term_id, day] if slot.clashes(self.slots[other])]
+
+    def moves(self, booking_id):
+        """
+        Place the booking with a free candidate tutor and return None.
+
+        Otherwise return an iterator over the (tutor, planned booking) pairs
+        where moving the planned booking elsewhere would let the tutor take
+        this one. Full tutors are marked searched as the iterator reaches them.
+        """
+        term_id, day = self.keys[booking_id]
+        slot, slots, busy = self.slots[booking_id], self.slots, self.busy
+        for tutor_id in self.candidates[booking_id]:
+            if self.full(tutor_id, term_id):
+                continue
+            if any(slot.clashes(slots[other]) for other in busy[tutor_id, term_id, day]):
+                continue
+            self.place(booking_id, tutor_id)
+            return None
+        return self.blocked_moves(booking_id)
+
+    def blocked_moves(self, booking_id):
+        term_id = self.keys[booking_id][0]
+        for tutor_id in self.candidates[booking_id]:
+            if (tutor_id, term_id) in self.exhausted or (tutor_id, term_id) in self.searched:
+                continue
+            overlapping = self.overlapping(booking_id, tutor_id)
+            if len(overlapping) == 1:
+                yield tutor_id, overlapping[0]
+            elif not overlapping and self.full(tutor_id, term_id):
+                self.searched.add((tutor_id, term_id))
+                for other in list(self.planned_by[tutor_id, term_id]):
+                    yield tutor_id, other
+
+    def assign(self, booking_id):
+        """
+        Place the booking, moving other planned bookings if needed.
+
+        The augmenting path is searched depth first with an explicit stack,
+        as it can be longer than Python's recursion limit. Each frame holds
+        the booking to place, its remaining moves, and the swap to undo if
+        none of them leads to a free tutor.
+        """
+        self.searched.clear()
+        moves = self.moves(booking_id)
+        if moves is None:
+            return True
+        visited = {booking_id}
+        stack = [(booking_id, moves, None)]
+        while stack:
+            current, moves, undo = stack[-1]
+            for tutor_id, victim in moves:
+                if victim in visited:
+                    continue
+                visited.add(victim)
+                self.unplace(victim)
+                self.place(current, tutor_id)
+                victim_moves = self.moves(victim)
+                if victim_moves is None:
+                    return True
+                stack.append((victim, victim_moves, (current, tutor_id)))
+                break
+            else:
+                stack.pop()
+                if undo is not None:
+                    displaced_by, tutor_id = undo
+                    self.unplace(displaced_by)
+                    self.place(current, tutor_id)
+        self.exhausted |= self.searched
+        return False
+
+    def solve(self):
+        """Return a mapping of booking id to tutor id for every booking that could be placed."""
+        for booking_id in sorted(self.bookings, key=lambda booking_id: (len(self.candidates[booking_id]), booking_id)):
+            self.assign(booking_id)
+        return dict(self.planned)
+
+
+def plan_assignments(bookings=None, capacity=None):
+    """
+    Work out a tutor for every tutorless pending booking.
+
+    Loads the bookings, tutors, availabilities and accepted bookings in a
+    fixed number of queries, taking languages and specializations from the
+    capability index, and solves the assignment in memory. Nothing is
+    written; pass the plan to apply_assignments().
+    """
+    if bookings is None:
+        bookings = Booking.objects.all()
+    bookings = list(
+        bookings.filter(status=Booking.PENDING, tutor__isnull=True)
+        .select_related(None)
+        .order_by('id')
+        .only(
+            'id', 'language_id', 'specialization_id', 'term_id', 'day_of_week', 'start_time', 'duration',
+            'frequency', 'week_parity',
+        )
+    )
+    if not bookings:
+        return AssignmentPlan({}, [], {})
+    term_ids = {booking.term_id for booking in bookings}
+
+    tutors = {tutor.id: tutor for tutor in Tutor.objects.select_related('user')}
+    tutor_languages = {tutor_id: capabilities.languages_of(tutor_id) for tutor_id in tutors}
+    tutor_specializations = {tutor_id: capabilities.specializations_of(tutor_id) for tutor_id in tutors}
+    windows = TutorAvalibility.objects.filter(term_id__in=term_ids).values_list(
+        'tutor_id', 'term_id', 'day_of_week', 'start_time', 'end_time'
+    )
+    accepted = Booking.objects.filter(
+        status=Booking.ACCEPTED, tutor__isnull=False, term_id__in=term_ids
+    ).order_by().values_list(
+        'tutor_id', 'term_id', 'day_of_week', 'start_time', 'duration', 'frequency', 'week_parity'
+    )
+
+    scheduler = Scheduler(bookings, tutor_languages, tutor_specializations, windows, accepted, capacity)
+    assignments = scheduler.solve()
+    unassigned = [booking.id for booking in bookings if booking.id not in assignments]
+    return AssignmentPlan(assignments, unassigned, tutors)
+
+
+@transaction.atomic
+def apply_assignments(plan):
+    """
+    Write the planned tutors in one transaction.
+
+    Bookings that were assigned or left the pending state since the plan
+    was made are skipped. Returns the number of bookings updated.
+    """
+    bookings = list(
+        Booking.objects.select_for_update()
+        .filter(id__in=plan.assignments, status=Booking.PENDING, tutor__isnull=True)
+        .order_by()
+        .only('id', 'tutor_id')
+    )
+    for booking in bookings:
+        booking.tutor_id = plan.assignments[booking.id]
+    Booking.objects.bulk_update(bookings, ['tutor'], batch_size=500)
+    return len(bookings)
@@ -0,0 +1,26 @@
+"""Case-insensitive prefix search that the Lower() indexes on users can serve."""
+
+from functools import reduce
+from operator import or_
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+def prefix_range(prefix):
+    """Return the bounds [low, high) of the strings that start with the prefix."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def starts_with(queryset, fields, term):
+    """
+    Filter the queryset to the rows where any of the fields starts with the term, ignoring case.
+
+    An istartswith is a LIKE over UPPER(field), which no index serves. Each
+    field is instead compared as LOWER(field) within the range of the
+    lowercased term, which a Lower() index on the field turns into a seek.
+    """
+    low, high = prefix_range(term.lower())
+    aliases = {f'prefix_{index}': Lower(field) for index, field in enumerate(fields)}
+    return queryset.alias(**aliases).filter(reduce(or_, [
+        Q(**{f'{alias}__gte': low, f'{alias}__lt': high, f'{alias}__startswith': low}) for alias in aliases
+    ]))
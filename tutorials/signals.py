@@ -0,0 +1,137 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_init, post_save, post_delete
+from django.dispatch import receiver
+from .availability import compact_availability, forget_free_slots
+from .capabilities import capabilities
+from .capacity import forget_capacity
+from .lessons import sync_many_lessons
+from .models import User, Booking, BlackoutDate, Term, Tutor, Language, Specialization, TutorAvalibility
+
+# Every receiver below bumps the schedule version of the users whose calendar
+# is affected. The version is part of the calendar ETags and cache keys, so a
+# bump invalidates exactly those users' cached calendars. Booking and
+# availability writes also evict the cached free time of the tutor's term and
+# the term's capacity report. Saved availability is coalesced with the
+# tutor's other windows. Changes to what tutors teach drop the process'
+# capability index. Blackout and term date changes resync the term's lessons.
+
+
+def term_users(term_id):
+    """Return the users with a booking in the given term."""
+    return User.objects.filter(Q(bookings_as_student__term_id=term_id) | Q(tutor__tutor_bookings__term_id=term_id))
+
+
+def sync_term_lessons(term_id):
+    """Bring the materialized lessons of the term's accepted bookings in line with its dates and blackouts."""
+    sync_many_lessons(Booking.objects.filter(term_id=term_id, status=Booking.ACCEPTED).select_related('term'))
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_tutor(sender, instance, **kwargs):
+    """Keep the tutor and term the booking was loaded with, so a reassignment updates both tutors."""
+    instance._original_tutor_id = instance.__dict__.get('tutor_id')
+    instance._original_term_id = instance.__dict__.get('term_id')
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    """Bump the schedule version of the booking's student and tutor(s) and evict their free time and term capacity."""
+    tutor_ids = {instance.tutor_id, getattr(instance, '_original_tutor_id', None)} - {None}
+    User.bump_schedule_versions(User.objects.filter(Q(pk=instance.student_id) | Q(tutor__id__in=tutor_ids)))
+    forget_free_slots({
+        (instance.tutor_id, instance.term_id),
+        (getattr(instance, '_original_tutor_id', None), getattr(instance, '_original_term_id', None)),
+    })
+    forget_capacity({instance.term_id, getattr(instance, '_original_term_id', None)})
+    instance._original_tutor_id = instance.tutor_id
+    instance._original_term_id = instance.term_id
+
+
+@receiver(post_init, sender=TutorAvalibility)
+def remember_availability_term(sender, instance, **kwargs):
+    """Keep the term the availability was loaded with, so moving it evicts both terms."""
+    instance._original_term_id = instance.__dict__.get('term_id')
+
+
+@receiver(post_save, sender=TutorAvalibility)
+@receiver(post_delete, sender=TutorAvalibility)
+def availability_changed(sender, instance, **kwargs):
+    """Evict the cached free time of the tutor, and the capacity, of the availability's term(s)."""
+    forget_free_slots({
+        (instance.tutor_id, instance.term_id),
+        (instance.tutor_id, getattr(instance, '_original_term_id', None)),
+    })
+    forget_capacity({instance.term_id, getattr(instance, '_original_term_id', None)})
+    instance._original_term_id = instance.term_id
+
+
+@receiver(post_save, sender=TutorAvalibility)
+def coalesce_availability(sender, instance, raw=False, **kwargs):
+    """
+    Merge the saved window with the tutor's overlapping or touching windows in its term.
+
+    The merge is written in bulk, so the saved row may be widened, moved to
+    other days or deleted without the instance being updated.
+    """
+    if not raw:
+        compact_availability([instance.tutor_id], [instance.term_id])
+
+
+@receiver(post_save, sender=BlackoutDate)
+@receiver(post_delete, sender=BlackoutDate)
+def blackout_date_changed(sender, instance, **kwargs):
+    """Resync the lessons of the blackout's term, bump its users' schedule versions and evict its capacity."""
+    sync_term_lessons(instance.term_id)
+    User.bump_schedule_versions(term_users(instance.term_id))
+    forget_capacity([instance.term_id])
+
+
+@receiver(post_save, sender=Term)
+def term_changed(sender, instance, created, **kwargs):
+    """Resync the lessons of a term whose dates changed and bump the schedule version of its users."""
+    if not created:
+        sync_term_lessons(instance.pk)
+        User.bump_schedule_versions(term_users(instance.pk))
+        forget_capacity([instance.pk])
+
+
+@receiver(post_init, sender=User)
+def remember_user_name(sender, instance, **kwargs):
+    """Keep the name the user was loaded with (without loading deferred fields), to detect renames."""
+    instance._original_name = (instance.__dict__.get('first_name'), instance.__dict__.get('last_name'))
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, **kwargs):
+    """Bump the schedules showing a tutor's name when the tutor is renamed."""
+    name = (instance.__dict__.get('first_name'), instance.__dict__.get('last_name'))
+    if not created and name != getattr(instance, '_original_name', name):
+        User.bump_schedule_versions(User.objects.filter(
+            Q(pk=instance.pk) | Q(bookings_as_student__tutor__user=instance)
+        ))
+    instance._original_name = name
+
+
+@receiver(m2m_changed, sender=Tutor.languages.through)
+@receiver(m2m_changed, sender=Tutor.specializations.through)
+def tutor_capabilities_changed(sender, action, **kwargs):
+    """Drop the capability index and every capacity report when a tutor's languages or specializations change."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        capabilities.invalidate()
+        forget_capacity()
+
+
+@receiver(post_save, sender=Tutor)
+def tutor_created(sender, instance, created, **kwargs):
+    """Drop the capability index when a tutor is created, as the id may have been used before."""
+    if created:
+        capabilities.invalidate()
+
+
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Language)
+@receiver(post_delete, sender=Specialization)
+def capability_deleted(sender, instance, **kwargs):
+    """Drop the capability index when a tutor, language or specialization is deleted."""
+    capabilities.invalidate()
@@ -61,3 +61,54 @@ class AdminBookingFormTests(TestCase):
         })
         self.assertFalse(form.is_valid())  
         self.assertIn(None, form.errors)  
+
+    def test_booking_running_into_later_booking(self):
+        """Test that a booking starting earlier but overlapping an accepted one is rejected."""
+        student = User.objects.create_user(
+            username='@student', password='Password123', email='student@example.com', account_type='student'
+        )
+        Booking.objects.create(
+            tutor=self.tutor,
+            student=student,
+            language=self.language,
+            term=self.term,
+            day_of_week="Monday",
+            start_time=time(11, 0),
+            duration=timedelta(hours=1),
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+        data = {
+            'student': student.id,
+            'tutor': self.tutor.id,
+            'language': self.language.id,
+            'term': self.term.id,
+            'day_of_week': 'Monday',
+            'start_time': '10:30',
+            'duration': '01:00:00',
+            'frequency': 'Fortnightly',
+            'week_parity': Booking.FIRST_WEEK,
+        }
+        form = AdminBookingForm(data=data)
+        self.assertFalse(form.is_valid())
+        self.assertIn("Tutor is already booked at this time: Monday at 10:30:00.", form.non_field_errors())
+
+        data['start_time'] = '10:00'
+        self.assertTrue(AdminBookingForm(data=data).is_valid())
+
+    def test_people_rendered_as_autocomplete_inputs(self):
+        """Test that student and tutor fields render only the selected person, not every user."""
+        User.objects.bulk_create([
+            User(username=f'@bulk{index}', email=f'bulk{index}@example.com', first_name='Bulk', last_name=str(index))
+            for index in range(200)
+        ])
+        student = User.objects.create_user(
+            username='@studentuser', password='Password123', email='student@example.com',
+            first_name='Sam', last_name='Student'
+        )
+        form = AdminBookingForm(initial={'student': student.id, 'tutor': self.tutor.id})
+        with self.assertNumQueries(2):
+            student_html, tutor_html = str(form['student']), str(form['tutor'])
+        self.assertIn('value="Sam Student (@studentuser)"', student_html)
+        self.assertIn('role=tutor', tutor_html)
+        self.assertNotIn('@bulk', student_html + tutor_html)
@@ -1,6 +1,8 @@
 from django.test import TestCase
 from datetime import date, time, timedelta
-from tutorials.models import Booking, Tutor, User, Term, Language, TutorAvalibility
+from django.core.exceptions import ValidationError
+from tutorials.models import Booking, Tutor, User, Term, Language, TutorAvalibility, BlackoutDate
+from tutorials.validation import validate_bookings
 
 class BookingModelTests(TestCase):
     def setUp(self):
@@ -108,3 +110,120 @@ class BookingModelTests(TestCase):
         )
         recurring_dates = booking.get_recurring_dates()
         self.assertEqual(len(recurring_dates), 13)  
+
+    def test_recurring_dates_in_window(self):
+        """
+        Test that recurring dates can be restricted to a date window.
+        """
+        booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.user_student,
+            language=self.language,
+            term=self.term,
+            start_time=time(10, 0),
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+            frequency="Fortnightly"
+        )
+        self.assertEqual(len(booking.get_recurring_dates()), 7)
+        recurring_dates = booking.get_recurring_dates(date(2024, 5, 10), date(2024, 6, 4))
+        self.assertEqual(recurring_dates, [date(2024, 5, 20), date(2024, 6, 3)])
+
+    def test_recurring_dates_skip_blackout_dates(self):
+        """
+        Test that recurring dates skip the term's blackout dates.
+        """
+        BlackoutDate.objects.create(term=self.term, date=date(2024, 5, 27), reason="Bank holiday")
+        booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.user_student,
+            language=self.language,
+            term=self.term,
+            start_time=time(10, 0),
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+            frequency="Weekly"
+        )
+        recurring_dates = booking.get_recurring_dates()
+        self.assertEqual(len(recurring_dates), 12)
+        self.assertNotIn(date(2024, 5, 27), recurring_dates)
+
+    def create_accepted_booking(self, start_time, frequency="Weekly", week_parity=Booking.FIRST_WEEK):
+        return Booking.objects.create(
+            tutor=self.tutor,
+            student=self.user_student,
+            language=self.language,
+            term=self.term,
+            start_time=start_time,
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+            frequency=frequency,
+            week_parity=week_parity,
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+
+    def clashes(self, booking):
+        """Return whether validation rejects the booking for clashing with an accepted one."""
+        error = validate_bookings([booking])[0]
+        return error is not None and "already booked" in " ".join(error.messages)
+
+    def test_booking_overlapping_earlier_start(self):
+        """
+        Test that a booking running into a later one is rejected, whatever its start time.
+        """
+        self.create_accepted_booking(time(11, 0))
+        booking = Booking(
+            tutor=self.tutor,
+            student=self.user_student,
+            language=self.language,
+            term=self.term,
+            start_time=time(10, 30),
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+        )
+        self.assertTrue(self.clashes(booking))
+        with self.assertRaises(ValidationError):
+            booking.clean()
+        booking.duration = timedelta(minutes=30)
+        self.assertFalse(self.clashes(booking))
+
+    def test_fortnightly_bookings_on_alternate_weeks(self):
+        """
+        Test that fortnightly bookings only clash when they share a week.
+        """
+        self.create_accepted_booking(time(10, 0), frequency="Fortnightly")
+        booking = Booking(
+            tutor=self.tutor,
+            student=self.user_student,
+            language=self.language,
+            term=self.term,
+            start_time=time(10, 0),
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+            frequency="Fortnightly",
+            week_parity=Booking.SECOND_WEEK,
+        )
+        with self.assertNumQueries(2):
+            self.assertFalse(self.clashes(booking))
+        booking.week_parity = Booking.FIRST_WEEK
+        self.assertTrue(self.clashes(booking))
+        booking.frequency = "Weekly"
+        booking.week_parity = Booking.SECOND_WEEK
+        self.assertTrue(self.clashes(booking))
+
+    def test_second_week_recurring_dates(self):
+        """
+        Test that second-week fortnightly bookings start a week later.
+        """
+        booking = self.create_accepted_booking(time(10, 0), frequency="Fortnightly", week_parity=Booking.SECOND_WEEK)
+        recurring_dates = booking.get_recurring_dates()
+        self.assertEqual(recurring_dates[:2], [date(2024, 5, 13), date(2024, 5, 27)])
+        self.assertEqual(booking.calculate_booking_date(self.term.start_date), date(2024, 5, 13))
+
+    def test_schedule_users_of_a_tutorless_booking(self):
+        """Test that a booking without a tutor only concerns its student."""
+        booking = Booking(student=self.user_student, tutor=None, term=self.term, language=self.language)
+        self.assertEqual(list(booking.schedule_users()), [self.user_student])
+        booking.tutor = self.tutor
+        self.assertEqual(set(booking.schedule_users()), {self.user_student, self.user_tutor})
@@ -1,5 +1,6 @@
 from django.test import TestCase
 from datetime import time, date
+from django.core.exceptions import ValidationError
 from tutorials.models import Tutor, User, Term, TutorAvalibility
 
 class TutorAvailabilityModelTests(TestCase):
@@ -62,3 +63,50 @@ class TutorAvailabilityModelTests(TestCase):
         )
         with self.assertRaises(Exception):
             availability.clean()
+
+    def test_days_are_normalized_and_stored_as_mask(self):
+        """
+        Test that days in any case round-trip as lowercase names in week order.
+        """
+        availability = TutorAvalibility.objects.create(
+            tutor=self.tutor,
+            term=self.term,
+            day_of_week=['Friday', 'tuesday'],
+            start_time=time(10, 0),
+            end_time=time(14, 0),
+        )
+        self.assertEqual(availability.day_of_week, ['tuesday', 'friday'])
+        availability.refresh_from_db()
+        self.assertEqual(availability.day_of_week, ['tuesday', 'friday'])
+
+    def test_includes_lookup(self):
+        """
+        Test that filtering by a single day matches every availability containing it.
+        """
+        both = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday', 'tuesday'],
+            start_time=time(10, 0), end_time=time(14, 0),
+        )
+        tuesday = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week='Tuesday',
+            start_time=time(15, 0), end_time=time(17, 0),
+        )
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['sunday'],
+            start_time=time(10, 0), end_time=time(14, 0),
+        )
+        self.assertCountEqual(
+            TutorAvalibility.objects.filter(term=self.term, day_of_week__includes='Tuesday'),
+            [both, tuesday],
+        )
+        self.assertCountEqual(
+            Tutor.objects.filter(availabilities__day_of_week__includes='monday').distinct(),
+            [self.tutor],
+        )
+
+    def test_invalid_day_raises(self):
+        """
+        Test that an unknown day name is rejected.
+        """
+        with self.assertRaises(ValidationError):
+            TutorAvalibility(tutor=self.tutor, term=self.term, day_of_week=['funday'])
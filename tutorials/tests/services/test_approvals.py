@@ -0,0 +1,63 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.approvals import approve_bookings, decline_bookings
+from tutorials.capabilities import capabilities
+from tutorials.models import User, Tutor, Booking, Language, Lesson, Term, TutorAvalibility
+
+
+class BulkDecisionTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May", start_date=date(2024, 5, 1), end_date=date(2024, 5, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.tutor.languages.add(self.language)
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+
+    def book(self, start_time, tutor=True, **kwargs):
+        return Booking.objects.create(
+            tutor=self.tutor if tutor else None, student=self.student, language=self.language, term=self.term,
+            day_of_week="Monday", start_time=start_time, duration=timedelta(hours=1), **kwargs
+        )
+
+    def test_approve_valid_bookings_in_bulk(self):
+        """Test that valid bookings are accepted together, and clashing or tutorless ones are skipped."""
+        bookings = [self.book(time(9, 0)), self.book(time(11, 0)), self.book(time(9, 30)), self.book(time(10, 0), tutor=False)]
+        accepted = self.book(time(10, 0), student_approval=Booking.STUDENT_APPROVED, tutor_approval=Booking.TUTOR_APPROVED)
+        ids = [booking.id for booking in bookings] + [accepted.id]
+        version = self.student.schedule_version
+        capabilities.load()
+
+        with self.assertNumQueries(12):
+            applied, skipped = approve_bookings(ids)
+
+        self.assertEqual(applied, [bookings[0].id, bookings[1].id])
+        self.assertEqual(skipped, {
+            accepted.id: "It is no longer pending.",
+            bookings[2].id: "Tutor is already booked at this time: Monday at 09:30:00.",
+            bookings[3].id: "No tutor is assigned.",
+        })
+        self.assertEqual(
+            list(Booking.objects.filter(id__in=ids).order_by('id').values_list('status', flat=True)),
+            [Booking.ACCEPTED, Booking.ACCEPTED, Booking.PENDING, Booking.PENDING, Booking.ACCEPTED],
+        )
+        self.assertEqual(Lesson.objects.filter(booking__in=bookings[:2]).count(), 8)
+        self.student.refresh_from_db()
+        self.assertGreater(self.student.schedule_version, version)
+
+    def test_decline_in_bulk(self):
+        """Test that pending bookings are declined in one update."""
+        bookings = [self.book(time(9, 0)), self.book(time(10, 0), tutor=False)]
+        applied, skipped = decline_bookings([booking.id for booking in bookings])
+        self.assertEqual(applied, [booking.id for booking in bookings])
+        self.assertEqual(skipped, {})
+        for booking in bookings:
+            booking.refresh_from_db()
+            self.assertEqual((booking.status, booking.student_approval), (Booking.DECLINED, Booking.STUDENT_REJECTED))
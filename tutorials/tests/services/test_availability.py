@@ -0,0 +1,180 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.availability import availability_grid, compact_availability, get_free_slots, save_availability_grid
+from tutorials.calendar_cache import calendar_cache
+from tutorials.models import User, Tutor, Booking, Language, Term, TutorAvalibility
+
+
+class FreeSlotsTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.availability = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday', 'tuesday'],
+            start_time=time(9, 0), end_time=time(13, 0)
+        )
+        self.pair = (self.tutor.id, self.term.id)
+
+    def accept(self, start_time, frequency=Booking.WEEKLY, week_parity=Booking.FIRST_WEEK):
+        return Booking.objects.create(
+            tutor=self.tutor, student=self.student, language=self.language, term=self.term,
+            day_of_week="Monday", start_time=start_time, duration=timedelta(hours=1),
+            frequency=frequency, week_parity=week_parity,
+            student_approval=Booking.STUDENT_APPROVED, tutor_approval=Booking.TUTOR_APPROVED,
+        )
+
+    def test_windows_minus_bookings(self):
+        """Test that weekly bookings remove time from both weeks and fortnightly ones from their week."""
+        self.accept(time(10, 0))
+        self.accept(time(12, 0), frequency=Booking.FORTNIGHTLY, week_parity=Booking.SECOND_WEEK)
+        with self.assertNumQueries(2):
+            free = get_free_slots([self.pair])[self.pair]
+        self.assertEqual(free['Monday'], {
+            'weekly': [(540, 600), (660, 720)],
+            'first_week': [(540, 600), (660, 780)],
+            'second_week': [(540, 600), (660, 720)],
+        })
+        self.assertEqual(free['Tuesday']['weekly'], [(540, 780)])
+
+    def test_cached_until_bookings_or_availability_change(self):
+        """Test that free time is cached and evicted by booking and availability writes."""
+        get_free_slots([self.pair])
+        with self.assertNumQueries(0):
+            get_free_slots([self.pair])
+
+        self.accept(time(9, 0))
+        self.assertEqual(get_free_slots([self.pair])[self.pair]['Monday']['weekly'], [(600, 780)])
+
+        self.availability.day_of_week = ['tuesday']
+        self.availability.save()
+        self.assertNotIn('Monday', get_free_slots([self.pair])[self.pair])
+
+
+class SaveAvailabilityGridTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.terms = [
+            Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31)),
+            Term.objects.create(name="September-Christmas", start_date=date(2024, 9, 1), end_date=date(2024, 12, 20)),
+        ]
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.morning = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.terms[0], day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        self.evening = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.terms[0], day_of_week=['friday'], start_time=time(16, 0), end_time=time(18, 0)
+        )
+        self.other_term = TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.terms[1], day_of_week=['monday'], start_time=time(9, 0), end_time=time(10, 0)
+        )
+
+    def rows(self):
+        return sorted(
+            (row.term_id, tuple(row.day_of_week), row.start_time, row.end_time)
+            for row in TutorAvalibility.objects.filter(tutor=self.tutor)
+        )
+
+    def test_diff_applied_in_bulk(self):
+        """Test that only changed rows are written, reusing stale rows, and untouched terms are kept."""
+        grid = {self.terms[0].id: {
+            'Monday': [(time(9, 0), time(12, 0)), (time(13, 0), time(15, 0))],
+            'Tuesday': [(time(9, 0), time(12, 0))],
+        }}
+        with self.assertNumQueries(4):
+            self.assertEqual(save_availability_grid(self.tutor, grid), (0, 2, 0))
+        self.assertEqual(self.rows(), [
+            (self.terms[0].id, ('monday',), time(13, 0), time(15, 0)),
+            (self.terms[0].id, ('monday', 'tuesday'), time(9, 0), time(12, 0)),
+            (self.terms[1].id, ('monday',), time(9, 0), time(10, 0)),
+        ])
+        self.assertEqual(TutorAvalibility.objects.get(pk=self.morning.pk).day_of_week, ['monday', 'tuesday'])
+        self.assertEqual(TutorAvalibility.objects.get(pk=self.evening.pk).start_time, time(13, 0))
+
+    def test_overlapping_windows_coalesced(self):
+        """Test that overlapping or touching windows of a day are stored as one row."""
+        grid = {self.terms[0].id: {
+            'Monday': [(time(9, 0), time(11, 0)), (time(10, 0), time(12, 0))],
+            'Friday': [(time(9, 0), time(10, 0)), (time(10, 0), time(12, 0))],
+        }}
+        save_availability_grid(self.tutor, grid)
+        self.assertEqual(
+            [row for row in self.rows() if row[0] == self.terms[0].id],
+            [(self.terms[0].id, ('monday', 'friday'), time(9, 0), time(12, 0))],
+        )
+
+    def test_unchanged_grid_writes_nothing(self):
+        """Test that submitting the stored availability again only reads it (plus the savepoint)."""
+        grid = {
+            self.terms[0].id: {'Monday': [(time(9, 0), time(12, 0))], 'Friday': [(time(16, 0), time(18, 0))]},
+        }
+        with self.assertNumQueries(3):
+            self.assertEqual(save_availability_grid(self.tutor, grid), (0, 0, 0))
+
+    def test_grid_round_trip(self):
+        """Test that the stored availability is rendered as a grid."""
+        self.assertEqual(availability_grid(self.tutor, self.terms), {
+            self.terms[0].id: {'Monday': [['09:00', '12:00']], 'Friday': [['16:00', '18:00']]},
+            self.terms[1].id: {'Monday': [['09:00', '10:00']]},
+        })
+
+
+class CompactAvailabilityTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+
+    def windows(self):
+        return sorted(
+            (tuple(row.day_of_week), row.start_time, row.end_time)
+            for row in TutorAvalibility.objects.filter(tutor=self.tutor)
+        )
+
+    def test_saved_window_merged_with_overlapping_ones(self):
+        """Test that saving a window coalesces it with the tutor's windows in the term."""
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(11, 0)
+        )
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday', 'tuesday'], start_time=time(11, 0), end_time=time(13, 0)
+        )
+        self.assertEqual(self.windows(), [
+            (('monday',), time(9, 0), time(13, 0)),
+            (('tuesday',), time(11, 0), time(13, 0)),
+        ])
+
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['tuesday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        self.assertEqual(self.windows(), [(('monday', 'tuesday'), time(9, 0), time(13, 0))])
+
+    def test_command_compacts_existing_rows(self):
+        """Test that the command merges rows written without the signal."""
+        TutorAvalibility.objects.bulk_create([
+            TutorAvalibility(tutor=self.tutor, term=self.term, day_of_week=['friday'], start_time=start, end_time=end)
+            for start, end in [(time(9, 0), time(10, 0)), (time(9, 30), time(11, 0)), (time(14, 0), time(15, 0))]
+        ])
+        out = StringIO()
+        call_command('compact_availability', stdout=out)
+        self.assertIn("0 added, 1 changed, 1 removed", out.getvalue())
+        self.assertEqual(self.windows(), [
+            (('friday',), time(9, 0), time(11, 0)),
+            (('friday',), time(14, 0), time(15, 0)),
+        ])
+        self.assertEqual(compact_availability(), (0, 0, 0))
@@ -0,0 +1,80 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Term
+
+class CalendarCacheTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com",
+            first_name="Alice", last_name="Wonder", account_type="student"
+        )
+        self.tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="John", last_name="Doe", account_type="tutor"
+        )
+        self.other_student = User.objects.create_user(
+            username="@other", password="Password123", email="other@example.com",
+            first_name="Bob", last_name="Other", account_type="student"
+        )
+        self.tutor = Tutor.objects.create(user=self.tutor_user)
+        self.booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            language=self.language,
+            term=self.term,
+            day_of_week="Monday",
+            start_time=time(10, 0),
+            duration=timedelta(hours=1),
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+
+    def fetch(self, user):
+        user.refresh_from_db()
+        return Booking.fetch_calendar_data(user, date(2024, 6, 1), date(2024, 7, 1))
+
+    def test_repeated_fetch_is_served_from_cache(self):
+        """Test that a second fetch of the same window runs no queries."""
+        first = self.fetch(self.student)
+        with self.assertNumQueries(0):
+            second = Booking.fetch_calendar_data(self.student, date(2024, 6, 1), date(2024, 7, 1))
+        self.assertEqual(first, second)
+
+    def test_booking_change_evicts_its_users(self):
+        """Test that saving a booking invalidates its student's calendar."""
+        self.fetch(self.student)
+        self.booking.day_of_week = "Tuesday"
+        self.booking.save()
+        self.assertEqual(self.fetch(self.student)[0]['date'], '2024-06-04')
+
+    def test_unrelated_users_are_not_evicted(self):
+        """Test that a booking change leaves other users' cached calendars alone."""
+        self.other_student.refresh_from_db()
+        version = self.other_student.schedule_version
+        self.booking.save()
+        self.other_student.refresh_from_db()
+        self.assertEqual(self.other_student.schedule_version, version)
+
+    def test_term_change_evicts_its_users(self):
+        """Test that changing a term's dates invalidates the calendars of its bookings."""
+        self.fetch(self.student)
+        self.term.end_date = date(2024, 6, 15)
+        self.term.save()
+        self.assertEqual(len(self.fetch(self.student)), 2)
+
+    def test_tutor_rename_evicts_students(self):
+        """Test that renaming a tutor invalidates the calendars showing the tutor's name."""
+        self.fetch(self.student)
+        self.tutor_user.first_name = "Jack"
+        self.tutor_user.save()
+        self.assertEqual(self.fetch(self.student)[0]['title'], "Python with Jack Doe")
+
+    def test_login_does_not_evict(self):
+        """Test that saving a user without renaming them keeps their cached calendar."""
+        self.student.refresh_from_db()
+        version = self.student.schedule_version
+        self.client.login(username="@student", password="Password123")
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.schedule_version, version)
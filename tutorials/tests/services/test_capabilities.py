@@ -0,0 +1,40 @@
+from django.test import TestCase
+from tutorials.capabilities import capabilities
+from tutorials.models import User, Tutor, Language, Specialization
+
+
+class CapabilityIndexTests(TestCase):
+    def setUp(self):
+        self.python = Language.objects.create(name="Python")
+        self.java = Language.objects.create(name="Java")
+        self.web = Specialization.objects.create(name="Web Development")
+        self.tutors = []
+        for name in ("ada", "bob"):
+            user = User.objects.create_user(
+                username=f"@{name}", password="Password123", email=f"{name}@example.com", account_type="tutor"
+            )
+            tutor = Tutor.objects.create(user=user)
+            tutor.languages.add(self.python)
+            self.tutors.append(tutor)
+        self.tutors[0].specializations.add(self.web)
+
+    def test_lookups_after_single_load(self):
+        """Test that capability checks are answered from memory after one load."""
+        with self.assertNumQueries(2):
+            capabilities.load()
+        with self.assertNumQueries(0):
+            self.assertEqual(capabilities.tutors_for(self.python.id), {tutor.id for tutor in self.tutors})
+            self.assertEqual(capabilities.tutors_for(self.python.id, self.web.id), {self.tutors[0].id})
+            self.assertEqual(capabilities.tutors_for(self.java.id), set())
+            self.assertTrue(capabilities.offers(self.tutors[0].id, self.web.id))
+            self.assertFalse(capabilities.teaches(self.tutors[1].id, self.java.id))
+
+    def test_invalidated_by_m2m_changes(self):
+        """Test that adding, removing or clearing languages and specializations refreshes the index."""
+        capabilities.load()
+        self.tutors[1].languages.add(self.java)
+        self.assertEqual(capabilities.tutors_for(self.java.id), {self.tutors[1].id})
+        self.tutors[0].specializations.clear()
+        self.assertEqual(capabilities.tutors_for(self.python.id, self.web.id), set())
+        self.java.delete()
+        self.assertEqual(capabilities.languages_of(self.tutors[1].id), {self.python.id})
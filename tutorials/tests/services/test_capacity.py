@@ -0,0 +1,87 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.calendar_cache import calendar_cache
+from tutorials.capacity import get_capacity
+from tutorials.models import User, Tutor, Booking, BlackoutDate, Language, Specialization, Term, TutorAvalibility
+
+
+class CapacityReportTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.python = Language.objects.create(name="Python")
+        self.java = Language.objects.create(name="Java")
+        self.django = Specialization.objects.create(name="Django")
+        # Four Mondays and four Tuesdays, one Monday lost to a blackout.
+        self.term = Term.objects.create(name="May", start_date=date(2024, 5, 1), end_date=date(2024, 5, 28))
+        BlackoutDate.objects.create(term=self.term, date=date(2024, 5, 20))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        self.web_tutor = self.create_tutor("@web", [self.python], [self.django])
+        self.general_tutor = self.create_tutor("@general", [self.python, self.java], [])
+        TutorAvalibility.objects.create(
+            tutor=self.web_tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        TutorAvalibility.objects.create(
+            tutor=self.general_tutor, term=self.term, day_of_week=['monday', 'tuesday'],
+            start_time=time(10, 0), end_time=time(11, 0)
+        )
+        self.book(self.python, "Monday", timedelta(hours=1), specialization=self.django)
+        self.book(
+            self.python, "Tuesday", timedelta(minutes=90), frequency=Booking.FORTNIGHTLY,
+            week_parity=Booking.SECOND_WEEK, tutor=self.general_tutor,
+        )
+        self.book(self.java, "Monday", timedelta(hours=2))
+        self.book(self.java, "Friday", timedelta(hours=5), student_approval=Booking.STUDENT_REJECTED)
+
+    def create_tutor(self, username, languages, specializations):
+        user = User.objects.create_user(
+            username=username, password="Password123", email=f"{username[1:]}@example.com", account_type="tutor"
+        )
+        tutor = Tutor.objects.create(user=user)
+        tutor.languages.set(languages)
+        tutor.specializations.set(specializations)
+        return tutor
+
+    def book(self, language, day_of_week, duration, tutor=None, specialization=None, **kwargs):
+        approvals = {'student_approval': Booking.STUDENT_APPROVED, 'tutor_approval': Booking.TUTOR_APPROVED} if tutor else {}
+        return Booking.objects.create(
+            student=self.student, tutor=tutor, language=language, specialization=specialization, term=self.term,
+            day_of_week=day_of_week, start_time=time(10, 0), duration=duration, **{**approvals, **kwargs}
+        )
+
+    def test_supply_and_demand_per_language_and_specialization(self):
+        """Test that hours are counted per lesson in the term, skipping blackouts and declined bookings."""
+        get_capacity([self.term])
+        with self.assertNumQueries(3):
+            calendar_cache().clear()
+            rows = get_capacity([self.term])[self.term.id]
+        self.assertEqual(
+            [(row['language'], row['specialization'], row['tutors'], row['bookings'], row['supply_hours'], row['demand_hours'])
+             for row in rows],
+            [
+                (self.java.id, None, 1, 1, 7.0, 6.0),
+                (self.python.id, self.django.id, 1, 1, 9.0, 3.0),
+                (self.python.id, None, 2, 1, 16.0, 3.0),
+            ],
+        )
+
+    def test_under_supplied_language_reported(self):
+        """Test that demand for a language nobody teaches shows as a shortfall."""
+        rust = Language.objects.create(name="Rust")
+        self.book(rust, "Tuesday", timedelta(hours=1))
+        row = get_capacity([self.term])[self.term.id][0]
+        self.assertEqual((row['language'], row['supply_hours'], row['shortfall_hours']), (rust.id, 0.0, 4.0))
+
+    def test_cached_until_the_term_changes(self):
+        """Test that the report is cached per term and evicted by booking writes in the term."""
+        other_term = Term.objects.create(name="June", start_date=date(2024, 6, 1), end_date=date(2024, 6, 30))
+        get_capacity([self.term, other_term])
+        with self.assertNumQueries(0):
+            get_capacity([self.term, other_term])
+
+        self.book(self.java, "Tuesday", timedelta(hours=1))
+        with self.assertNumQueries(3):
+            report = get_capacity([self.term, other_term])
+        self.assertEqual(report[other_term.id], [])
+        self.assertEqual(report[self.term.id][0]['demand_hours'], 10.0)
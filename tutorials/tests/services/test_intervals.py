@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+from datetime import time, timedelta
+from tutorials.intervals import IntervalIndex, Slot, merge, subtract
+
+
+class SlotTests(SimpleTestCase):
+    def test_overlap_uses_duration(self):
+        """Test that slots clash when their times overlap, not only when they start together."""
+        first = Slot.build(time(10, 0), timedelta(hours=1), 'Weekly')
+        self.assertTrue(first.clashes(Slot.build(time(9, 30), timedelta(hours=1), 'Weekly')))
+        self.assertFalse(first.clashes(Slot.build(time(11, 0), timedelta(hours=1), 'Weekly')))
+
+    def test_week_parity(self):
+        """Test that fortnightly slots on alternate weeks never clash, but weekly slots always do."""
+        first_week = Slot.build(time(10, 0), timedelta(hours=1), 'Fortnightly', 0)
+        second_week = Slot.build(time(10, 0), timedelta(hours=1), 'Fortnightly', 1)
+        weekly = Slot.build(time(10, 0), timedelta(hours=1), 'Weekly', 1)
+        self.assertIsNone(weekly.parity)
+        self.assertFalse(first_week.clashes(second_week))
+        self.assertTrue(first_week.clashes(weekly))
+        self.assertTrue(second_week.clashes(weekly))
+
+
+class IntervalIndexTests(SimpleTestCase):
+    def test_conflicts(self):
+        """Test that the index finds long earlier slots and skips the slot's own booking."""
+        index = IntervalIndex([
+            ('monday', Slot(540, 720, None, 1)),
+            ('monday', Slot(780, 840, None, 2)),
+            ('tuesday', Slot(600, 660, None, 3)),
+        ])
+        self.assertEqual([slot.booking_id for slot in index.conflicts('monday', Slot(690, 800))], [1, 2])
+        self.assertEqual(index.conflicts('monday', Slot(720, 780)), [])
+        self.assertEqual(index.conflicts('monday', Slot(600, 660, None, 1)), [])
+        self.assertEqual(index.conflicts('wednesday', Slot(600, 660)), [])
+
+
+class IntervalArithmeticTests(SimpleTestCase):
+    def test_merge(self):
+        """Test that overlapping and touching intervals are joined."""
+        self.assertEqual(merge([(600, 660), (540, 600), (700, 720), (710, 800)]), [(540, 660), (700, 800)])
+
+    def test_subtract(self):
+        """Test that removed intervals cut holes in, trim or erase the intervals."""
+        self.assertEqual(
+            subtract([(540, 720), (780, 840)], [(600, 630), (700, 800)]),
+            [(540, 600), (630, 700), (800, 840)],
+        )
+        self.assertEqual(subtract([(540, 600)], [(500, 700)]), [])
+        self.assertEqual(subtract([(540, 600)], []), [(540, 600)])
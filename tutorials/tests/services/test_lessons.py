@@ -0,0 +1,65 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.lessons import sync_lessons, delete_lessons
+from tutorials.models import Lesson, Booking, Tutor, User, Term, Language
+
+class SyncLessonsTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.student = User.objects.create(
+            username="@studentexample", first_name="Alice", last_name="Wonder",
+            email="alice@example.com", account_type="student"
+        )
+        self.tutor_user = User.objects.create(
+            username="@tutorexample", first_name="John", last_name="Doe",
+            email="john.doe@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=self.tutor_user)
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            language=self.language,
+            term=self.term,
+            start_time=time(10, 0),
+            day_of_week="Monday",
+            duration=timedelta(hours=1),
+            frequency=Booking.FORTNIGHTLY
+        )
+
+    def test_creates_lessons_in_bulk(self):
+        """Test that all lessons are inserted with a constant number of queries."""
+        with self.assertNumQueries(6):
+            created, updated, deleted = sync_lessons(self.booking)
+        self.assertEqual((created, updated, deleted), (7, 0, 0))
+        self.assertEqual(Lesson.objects.filter(booking=self.booking).count(), 7)
+
+    def test_resync_is_a_no_op(self):
+        """Test that an unchanged booking writes nothing."""
+        sync_lessons(self.booking)
+        with self.assertNumQueries(4):
+            self.assertEqual(sync_lessons(self.booking), (0, 0, 0))
+
+    def test_only_the_difference_is_applied(self):
+        """Test that switching frequency and time only touches the changed rows."""
+        sync_lessons(self.booking)
+        kept_ids = set(Lesson.objects.values_list('id', flat=True))
+        self.booking.frequency = Booking.WEEKLY
+        self.booking.start_time = time(11, 0)
+        self.assertEqual(sync_lessons(self.booking), (6, 7, 0))
+        self.assertTrue(kept_ids <= set(Lesson.objects.values_list('id', flat=True)))
+        self.assertFalse(Lesson.objects.exclude(start_time=time(11, 0)).exists())
+
+    def test_removed_dates_and_duplicates_are_deleted(self):
+        """Test that lessons outside the schedule and duplicate dates are removed."""
+        sync_lessons(self.booking)
+        Lesson.objects.create(booking=self.booking, date=date(2024, 5, 6), start_time=time(10, 0), duration=timedelta(hours=1))
+        Lesson.objects.create(booking=self.booking, date=date(2024, 5, 7), start_time=time(10, 0), duration=timedelta(hours=1))
+        self.assertEqual(sync_lessons(self.booking), (0, 0, 2))
+        self.assertEqual(Lesson.objects.count(), 7)
+
+    def test_delete_lessons(self):
+        """Test that all lessons of the booking are removed."""
+        sync_lessons(self.booking)
+        delete_lessons(self.booking)
+        self.assertFalse(Lesson.objects.exists())
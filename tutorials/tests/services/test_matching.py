@@ -0,0 +1,78 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.capabilities import capabilities
+from tutorials.matching import rank_tutors
+from tutorials.models import User, Tutor, Booking, Language, Specialization, Term, TutorAvalibility
+
+
+class RankTutorsTests(TestCase):
+    def setUp(self):
+        self.python = Language.objects.create(name="Python")
+        self.java = Language.objects.create(name="Java")
+        self.web = Specialization.objects.create(name="Web Development")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        self.wide = self.create_tutor("wide", time(9, 0), time(19, 0))
+        self.narrow = self.create_tutor("narrow", time(10, 0), time(12, 0))
+        self.booking = Booking.objects.create(
+            student=self.student, language=self.python, term=self.term,
+            day_of_week="Monday", start_time=time(10, 30), duration=timedelta(hours=1),
+        )
+
+    def create_tutor(self, name, start_time, end_time, languages=None, day_of_week=('monday',)):
+        user = User.objects.create_user(
+            username=f"@{name}", password="Password123", email=f"{name}@example.com",
+            first_name=name.capitalize(), last_name="Tutor", account_type="tutor",
+        )
+        tutor = Tutor.objects.create(user=user)
+        tutor.languages.set(languages or [self.python])
+        TutorAvalibility.objects.create(
+            tutor=tutor, term=self.term, day_of_week=list(day_of_week),
+            start_time=start_time, end_time=end_time,
+        )
+        return tutor
+
+    def accept(self, tutor, start_time, day_of_week="Monday"):
+        return Booking.objects.create(
+            student=self.student, tutor=tutor, language=self.python, term=self.term,
+            day_of_week=day_of_week, start_time=start_time, duration=timedelta(hours=1),
+            student_approval=Booking.STUDENT_APPROVED, tutor_approval=Booking.TUTOR_APPROVED,
+        )
+
+    def test_tightest_window_ranks_first(self):
+        """Test that equally loaded tutors are ordered by the slack of their window."""
+        capabilities.load()
+        with self.assertNumQueries(2):
+            matches = rank_tutors(self.booking)
+        self.assertEqual([match.tutor for match in matches], [self.narrow, self.wide])
+        self.assertEqual(matches[0].slack, 60)
+
+    def test_load_ranks_before_slack(self):
+        """Test that tutors with fewer accepted bookings in the term rank first."""
+        self.accept(self.narrow, time(10, 0), day_of_week="Tuesday")
+        TutorAvalibility.objects.create(
+            tutor=self.narrow, term=self.term, day_of_week=['tuesday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        matches = rank_tutors(self.booking)
+        self.assertEqual([match.tutor for match in matches], [self.wide, self.narrow])
+        self.assertEqual([match.load for match in matches], [0, 1])
+
+    def test_conflicting_booking_excludes_tutor(self):
+        """Test that a tutor with an overlapping accepted booking is not offered."""
+        self.accept(self.wide, time(11, 0))
+        self.assertEqual([match.tutor for match in rank_tutors(self.booking)], [self.narrow])
+
+    def test_window_must_cover_slot(self):
+        """Test that the availability window must contain the whole lesson."""
+        self.booking.start_time = time(11, 30)
+        self.assertEqual([match.tutor for match in rank_tutors(self.booking)], [self.wide])
+
+    def test_language_specialization_and_day_must_match(self):
+        """Test that language, specialization and weekday filter the candidates."""
+        self.create_tutor("java", time(9, 0), time(19, 0), languages=[self.java])
+        self.create_tutor("tuesday", time(9, 0), time(19, 0), day_of_week=('tuesday',))
+        self.wide.specializations.add(self.web)
+        self.booking.specialization = self.web
+        self.assertEqual([match.tutor for match in rank_tutors(self.booking)], [self.wide])
@@ -0,0 +1,56 @@
+from django.test import SimpleTestCase
+from datetime import date
+import numpy as np
+from tutorials.recurrence import expand, WEEKDAY_INDEX
+
+class ExpandTests(SimpleTestCase):
+    def test_weekly_and_fortnightly_expansion(self):
+        """Test that each recurrence starts on its weekday and repeats by its stride."""
+        occurrences = expand(
+            [date(2024, 5, 1), date(2024, 5, 1)],
+            [date(2024, 5, 31), date(2024, 5, 31)],
+            [WEEKDAY_INDEX['Monday'], WEEKDAY_INDEX['Wednesday']],
+            [7, 14],
+        )
+        first, second = occurrences.split()
+        self.assertEqual(first.tolist(), [date(2024, 5, 6), date(2024, 5, 13), date(2024, 5, 20), date(2024, 5, 27)])
+        self.assertEqual(second.tolist(), [date(2024, 5, 1), date(2024, 5, 15), date(2024, 5, 29)])
+        self.assertEqual(occurrences.counts().tolist(), [4, 3])
+
+    def test_window_keeps_the_stride(self):
+        """Test that a window does not shift the fortnightly cycle."""
+        occurrences = expand([date(2024, 5, 1)], [date(2024, 7, 31)], [0], [14], start=date(2024, 5, 7), end=date(2024, 6, 3))
+        self.assertEqual(occurrences.dates.tolist(), [date(2024, 5, 20)])
+
+    def test_empty_window(self):
+        """Test that recurrences outside the window produce no dates."""
+        occurrences = expand([date(2024, 5, 1)], [date(2024, 7, 31)], [0], [7], start=date(2024, 9, 1))
+        self.assertEqual(occurrences.dates.size, 0)
+        self.assertEqual(len(occurrences.split()), 1)
+        self.assertEqual(expand([], [], [], []).split(), [])
+
+    def test_blackout_dates_only_apply_to_their_term(self):
+        """Test that blackout dates are skipped for bookings of that term only."""
+        occurrences = expand(
+            [date(2024, 5, 1), date(2024, 5, 1)],
+            [date(2024, 5, 20), date(2024, 5, 20)],
+            [0, 0],
+            [7, 7],
+            term_ids=[1, 2],
+            blackout_dates={1: [date(2024, 5, 13)]},
+        )
+        first, second = occurrences.split()
+        self.assertEqual(first.tolist(), [date(2024, 5, 6), date(2024, 5, 20)])
+        self.assertEqual(second.tolist(), [date(2024, 5, 6), date(2024, 5, 13), date(2024, 5, 20)])
+
+    def test_large_batch(self):
+        """Test that thousands of recurrences expand into the expected number of dates."""
+        count = 5000
+        occurrences = expand(
+            np.full(count, np.datetime64('2024-05-01')),
+            np.full(count, np.datetime64('2024-07-31')),
+            np.arange(count) % 7,
+            np.where(np.arange(count) % 2, 14, 7),
+        )
+        self.assertEqual(occurrences.index.size, occurrences.dates.size)
+        self.assertTrue((occurrences.counts() >= 6).all())
@@ -0,0 +1,116 @@
+from collections import Counter
+from io import StringIO
+from time import perf_counter
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Term, TutorAvalibility
+from tutorials.scheduler import Scheduler
+
+PYTHON, JAVA = 1, 2
+TERM = 1
+
+
+def booking(booking_id, start_time, language_id=PYTHON, day_of_week="Monday"):
+    return Booking(
+        id=booking_id, language_id=language_id, term_id=TERM, day_of_week=day_of_week,
+        start_time=start_time, duration=timedelta(hours=1),
+    )
+
+
+class SchedulerTests(SimpleTestCase):
+    def scheduler(self, bookings, windows, languages, accepted=(), capacity=None):
+        return Scheduler(bookings, languages, {tutor_id: set() for tutor_id in languages}, windows, accepted, capacity)
+
+    def test_moves_planned_booking_to_free_a_tutor(self):
+        """Test that a blocked booking takes a tutor whose booking can move elsewhere."""
+        first = booking(1, time(10, 0))
+        second = booking(2, time(10, 30), language_id=JAVA)
+        scheduler = self.scheduler(
+            [first, second],
+            [(1, TERM, ['monday'], time(9, 0), time(12, 0)), (2, TERM, ['monday'], time(9, 0), time(18, 0))],
+            {1: {PYTHON, JAVA}, 2: {PYTHON}},
+        )
+        self.assertTrue(scheduler.assign(first.id))
+        self.assertEqual(scheduler.planned, {1: 1})
+        self.assertTrue(scheduler.assign(second.id))
+        self.assertEqual(scheduler.planned, {1: 2, 2: 1})
+
+    def test_never_double_books_a_tutor(self):
+        """Test that overlapping bookings cannot share a tutor."""
+        scheduler = self.scheduler(
+            [booking(1, time(10, 0)), booking(2, time(10, 30)), booking(3, time(11, 0))],
+            [(1, TERM, ['monday'], time(9, 0), time(12, 0))],
+            {1: {PYTHON}},
+        )
+        self.assertEqual(scheduler.solve(), {1: 1, 3: 1})
+
+    def test_accepted_bookings_block_and_count_towards_capacity(self):
+        """Test that existing accepted bookings are respected."""
+        windows = [(1, TERM, ['monday', 'tuesday'], time(9, 0), time(12, 0))]
+        accepted = [(1, TERM, 'Monday', time(10, 0), timedelta(hours=1), Booking.WEEKLY, Booking.FIRST_WEEK)]
+        bookings = [booking(1, time(10, 30)), booking(2, time(9, 0), day_of_week="Tuesday")]
+        self.assertEqual(self.scheduler(bookings, windows, {1: {PYTHON}}, accepted).solve(), {2: 1})
+        self.assertEqual(self.scheduler(bookings, windows, {1: {PYTHON}}, accepted, capacity=1).solve(), {})
+
+    def test_binding_capacity_at_scale(self):
+        """Test that thousands of bookings are placed quickly when tutor capacity runs out."""
+        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+        bookings = [
+            booking(index + 1, time(9 + index // 5 % 8, 0), language_id=index % 2 + 1, day_of_week=days[index % 5])
+            for index in range(3000)
+        ]
+        windows = [(tutor_id, TERM, [day.lower() for day in days], time(9, 0), time(17, 0)) for tutor_id in range(1, 401)]
+        languages = {tutor_id: {PYTHON, JAVA} if tutor_id % 4 else {PYTHON} for tutor_id in range(1, 401)}
+        scheduler = self.scheduler(bookings, windows, languages, capacity=2)
+
+        started = perf_counter()
+        planned = scheduler.solve()
+        self.assertLess(perf_counter() - started, 2.0)
+
+        self.assertEqual(len(planned), 800)
+        self.assertLessEqual(max(Counter(planned.values()).values()), 2)
+        for tutor_id in set(planned.values()):
+            placed = [scheduler.bookings[booking_id] for booking_id, planned_tutor in planned.items() if planned_tutor == tutor_id]
+            self.assertEqual(len({(booking.day_of_week, booking.start_time) for booking in placed}), len(placed))
+
+
+class AssignTutorsCommandTests(TestCase):
+    def setUp(self):
+        language = Language.objects.create(name="Python")
+        term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="Jane", last_name="Doe", account_type="tutor",
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.tutor.languages.add(language)
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        self.bookings = [
+            Booking.objects.create(
+                student=student, language=language, term=term,
+                day_of_week="Monday", start_time=start_time, duration=timedelta(hours=1),
+            )
+            for start_time in (time(9, 0), time(9, 30), time(11, 0))
+        ]
+
+    def test_dry_run_reports_without_saving(self):
+        """Test that a dry run lists the plan and leaves bookings untouched."""
+        out = StringIO()
+        call_command('assign_tutors', '--dry-run', stdout=out)
+        self.assertIn(f"Booking {self.bookings[0].id}: Jane Doe", out.getvalue())
+        self.assertIn(f"Booking {self.bookings[1].id}: no tutor available", out.getvalue())
+        self.assertIn("Assigned 2 of 3 pending bookings", out.getvalue())
+        self.assertFalse(Booking.objects.filter(tutor__isnull=False).exists())
+
+    def test_assigns_in_one_write(self):
+        """Test that the plan is written back to the bookings."""
+        with self.assertNumQueries(10):
+            call_command('assign_tutors', stdout=StringIO())
+        assigned = Booking.objects.filter(tutor=self.tutor, status=Booking.PENDING)
+        self.assertCountEqual(assigned, [self.bookings[0], self.bookings[2]])
@@ -0,0 +1,42 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from tutorials.models import User, Tutor
+from tutorials.search import prefix_range, starts_with
+
+
+class PrefixSearchTests(TestCase):
+    def setUp(self):
+        for username, last_name in (("@jsmith", "Smith"), ("@blacksmith", "Blacksmith"), ("@smiley", "Jones")):
+            User.objects.create_user(
+                username=username, password="Password123", email=f"{username[1:]}@example.com",
+                first_name="Sam", last_name=last_name,
+            )
+
+    def usernames(self, queryset):
+        return sorted(queryset.values_list('username', flat=True))
+
+    def test_prefix_range(self):
+        self.assertEqual(prefix_range("smi"), ("smi", "smj"))
+
+    def test_matches_any_field_ignoring_case(self):
+        users = starts_with(User.objects.all(), ['username', 'last_name'], "SMI")
+        self.assertEqual(self.usernames(users), ["@jsmith"])
+        users = starts_with(User.objects.all(), ['username', 'last_name'], "@sMi")
+        self.assertEqual(self.usernames(users), ["@smiley"])
+
+    def test_follows_relations(self):
+        Tutor.objects.create(user=User.objects.get(username="@blacksmith"))
+        tutors = starts_with(Tutor.objects.all(), ['user__username', 'user__last_name'], "black")
+        self.assertEqual([tutor.user.username for tutor in tutors], ["@blacksmith"])
+
+    @skipUnless(connection.vendor == 'sqlite', "Query plans are SQLite's.")
+    def test_seeks_the_lowercase_indexes(self):
+        """Test that the search is served by the Lower() indexes rather than a scan of the users."""
+        sql, params = starts_with(User.objects.all(), ['username', 'last_name'], "smi").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("USING INDEX user_username_lower_idx", plan)
+        self.assertIn("USING INDEX user_last_name_lower_idx", plan)
+        self.assertNotIn("SCAN tutorials_user", plan)
@@ -0,0 +1,73 @@
+from django.test import TestCase
+from datetime import date, time, timedelta
+from tutorials.capabilities import capabilities
+from tutorials.models import User, Tutor, Booking, Language, Specialization, Term, TutorAvalibility
+from tutorials.validation import validate_bookings
+
+
+class ValidateBookingsTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.web = Specialization.objects.create(name="Web Development")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        self.tutors = []
+        for name in ("ada", "bob"):
+            user = User.objects.create_user(
+                username=f"@{name}", password="Password123", email=f"{name}@example.com", account_type="tutor"
+            )
+            tutor = Tutor.objects.create(user=user)
+            tutor.languages.add(self.language)
+            TutorAvalibility.objects.create(
+                tutor=tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+            )
+            self.tutors.append(tutor)
+        self.booking(self.tutors[0], time(9, 0), student_approval=Booking.STUDENT_APPROVED,
+                     tutor_approval=Booking.TUTOR_APPROVED).save()
+
+    def booking(self, tutor, start_time, day_of_week="Monday", **kwargs):
+        return Booking(
+            tutor=tutor, student=self.student, language=self.language, term=self.term,
+            day_of_week=day_of_week, start_time=start_time, duration=timedelta(hours=1), **kwargs
+        )
+
+    def test_batch_in_constant_queries(self):
+        """Test that a batch is validated with two queries and per-booking errors."""
+        bookings = [
+            self.booking(self.tutors[0], time(10, 0)),
+            self.booking(self.tutors[0], time(9, 30)),
+            self.booking(self.tutors[1], time(11, 30)),
+            self.booking(self.tutors[1], time(10, 0), day_of_week="Tuesday"),
+            self.booking(self.tutors[1], time(10, 0), specialization=self.web),
+            self.booking(None, time(10, 0)),
+        ]
+        capabilities.load()
+        with self.assertNumQueries(2):
+            errors = validate_bookings(bookings[:4] + bookings[5:])
+        self.assertIsNone(errors[0])
+        self.assertEqual(errors[1].messages, ["Tutor is already booked at this time: Monday at 09:30:00."])
+        self.assertEqual(errors[2].messages, [
+            "Tutor is not available at the selected time. Available times for Monday: 09:00 to 12:00."
+        ])
+        self.assertEqual(errors[3].messages, ["Tutor is not available on Tuesday for the selected term."])
+        self.assertIsNone(errors[4])
+        self.assertEqual(validate_bookings([bookings[4]])[0].message_dict, {
+            'specialization': ["The selected tutor does not offer specialization in Web Development."]
+        })
+
+    def test_as_accepted_checks_batch_against_itself(self):
+        """Test that bookings accepted together may not clash with each other."""
+        bookings = [self.booking(self.tutors[1], time(10, 0)), self.booking(self.tutors[1], time(10, 30))]
+        self.assertEqual(validate_bookings(bookings), [None, None])
+        errors = validate_bookings(bookings, as_accepted=True)
+        self.assertIsNone(errors[0])
+        self.assertIsNotNone(errors[1])
+
+    def test_full_clean_uses_fast_path(self):
+        """Test that validating a single booking takes two queries."""
+        booking = self.booking(self.tutors[1], time(10, 0))
+        capabilities.load()
+        with self.assertNumQueries(2):
+            booking.clean()
@@ -0,0 +1,123 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.capabilities import capabilities
+from tutorials.models import (
+    User, Tutor, Booking, Language, Lesson, Specialization, Term, TutorAvalibility, BlackoutDate
+)
+
+ROWS = 1000
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Every changelist runs a fixed number of queries, whatever the number of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="@admin", password="Password123", email="admin@example.com")
+        users = User.objects.bulk_create([
+            User(
+                username=f"@user{index}", email=f"user{index}@example.com", first_name="User", last_name=str(index),
+                password="!", account_type="tutor" if index % 2 else "student",
+            )
+            for index in range(ROWS)
+        ])
+        languages = Language.objects.bulk_create([Language(name=f"Language {index}") for index in range(ROWS)])
+        Specialization.objects.bulk_create([Specialization(name=f"Specialization {index}") for index in range(ROWS)])
+        terms = Term.objects.bulk_create([
+            Term(name=f"Term {index}", start_date=date(2024, 5, 1), end_date=date(2024, 5, 31)) for index in range(ROWS)
+        ])
+        tutors = Tutor.objects.bulk_create([Tutor(user=user) for user in users])
+        Tutor.languages.through.objects.bulk_create([
+            Tutor.languages.through(tutor=tutor, language=languages[(index + offset) % ROWS])
+            for index, tutor in enumerate(tutors)
+            for offset in range(3)
+        ])
+        TutorAvalibility.objects.bulk_create([
+            TutorAvalibility(tutor=tutor, term=terms[0], day_of_week=['monday'], start_time=time(9, 0), end_time=time(17, 0))
+            for tutor in tutors
+        ])
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                student=users[index], tutor=tutors[index] if index % 3 else None, language=languages[index],
+                term=terms[index % 10], day_of_week="Monday", start_time=time(10, 0), duration=timedelta(hours=1),
+            )
+            for index in range(ROWS)
+        ])
+        Lesson.objects.bulk_create([
+            Lesson(booking=booking, date=date(2024, 5, 6), start_time=time(10, 0), duration=timedelta(hours=1))
+            for booking in bookings
+        ])
+        BlackoutDate.objects.bulk_create([BlackoutDate(term=term, date=date(2024, 5, 20)) for term in terms[:10]])
+
+    def setUp(self):
+        # Counts below include the content type lookups of a cold cache, whatever ran before.
+        ContentType.objects.clear_cache()
+        self.client.force_login(self.admin)
+
+    def assertChangelistQueries(self, model, queries):
+        url = reverse(f'admin:tutorials_{model._meta.model_name}_changelist')
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, model.objects.count())
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+
+    def test_booking_changelist(self):
+        self.assertChangelistQueries(Booking, 7)
+
+    def test_lesson_changelist(self):
+        self.assertChangelistQueries(Lesson, 5)
+
+    def test_tutor_changelist(self):
+        self.assertChangelistQueries(Tutor, 6)
+
+    def test_availability_changelist(self):
+        self.assertChangelistQueries(TutorAvalibility, 6)
+
+    def test_availability_days_are_listed_by_name(self):
+        response = self.client.get(reverse('admin:tutorials_tutoravalibility_changelist'))
+        self.assertContains(response, '<td class="field-display_days">Monday</td>', html=True)
+        self.assertNotContains(response, "[&#x27;monday&#x27;]")
+
+    def test_user_changelist(self):
+        self.assertChangelistQueries(User, 5)
+
+    def test_language_changelist(self):
+        self.assertChangelistQueries(Language, 5)
+
+    def test_specialization_changelist(self):
+        self.assertChangelistQueries(Specialization, 5)
+
+    def test_term_changelist(self):
+        self.assertChangelistQueries(Term, 5)
+
+    def test_user_and_tutor_search_by_prefix(self):
+        """Test that the user and tutor searches match the start of a name, ignoring case."""
+        response = self.client.get(reverse('admin:tutorials_user_changelist'), {'q': '@USER99'})
+        self.assertEqual(
+            sorted(user.username for user in response.context['cl'].result_list),
+            sorted(['@user99', *[f'@user99{digit}' for digit in range(10)]]),
+        )
+        response = self.client.get(reverse('admin:tutorials_tutor_changelist'), {'q': 'user 99'})
+        self.assertEqual(len(response.context['cl'].result_list), 11)
+
+    def test_booking_change_form(self):
+        """Test that the booking form does not list every user and tutor."""
+        booking = Booking.objects.filter(tutor__isnull=False).first()
+        with self.assertNumQueries(13):
+            response = self.client.get(reverse('admin:tutorials_booking_change', args=[booking.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '@user999')
+
+    def test_assign_tutors_action(self):
+        """Test that the assign tutors action runs on the changelist's joined queryset."""
+        capabilities.invalidate()
+        tutorless = list(Booking.objects.filter(tutor__isnull=True, term__name="Term 0").values_list('id', flat=True))
+        response = self.client.post(
+            reverse('admin:tutorials_booking_changelist'),
+            {'action': 'assign_tutors', '_selected_action': tutorless},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Booking.objects.filter(id__in=tutorless, tutor__isnull=True).exists())
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import User, Tutor
+
+
+class UserAutocompleteViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="@admin", password="Password123", email="admin@example.com", is_staff=True
+        )
+        self.smith = User.objects.create_user(
+            username="@jsmith", password="Password123", email="smith@example.com",
+            first_name="Jane", last_name="Smith", account_type="student",
+        )
+        self.blacksmith = User.objects.create_user(
+            username="@blacksmith", password="Password123", email="black@example.com",
+            first_name="Bo", last_name="Blacksmith", account_type="student",
+        )
+        tutor_user = User.objects.create_user(
+            username="@smithers", password="Password123", email="smithers@example.com",
+            first_name="Tim", last_name="Smithers", account_type="tutor",
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.url = reverse('user_autocomplete')
+        self.client.login(username="@admin", password="Password123")
+
+    def test_students_by_last_name_prefix(self):
+        """Test that students whose last name starts with the query are returned, in name order."""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'q': 'smi'})
+        self.assertEqual(response.json(), {'results': [{'id': self.smith.id, 'text': "Jane Smith (@jsmith)"}]})
+
+    def test_students_by_username_prefix(self):
+        response = self.client.get(self.url, {'q': '@black'})
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.blacksmith.id])
+
+    def test_tutors_are_returned_with_tutor_ids(self):
+        response = self.client.get(self.url, {'q': 'Smith', 'role': 'tutor'})
+        self.assertEqual(response.json(), {'results': [{'id': self.tutor.id, 'text': "Tim Smithers (@smithers)"}]})
+
+    def test_results_are_limited(self):
+        User.objects.bulk_create([
+            User(username=f"@many{index}", email=f"many{index}@example.com", last_name="Many") for index in range(30)
+        ])
+        self.assertEqual(len(self.client.get(self.url, {'q': 'many'}).json()['results']), 20)
+
+    def test_empty_query_and_invalid_role(self):
+        self.assertEqual(self.client.get(self.url).json(), {'results': []})
+        self.assertEqual(self.client.get(self.url, {'q': 'a', 'role': 'admin'}).status_code, 400)
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url, {'q': 'smi'}).status_code, 302)
+
+    def test_prefix_ignores_case(self):
+        response = self.client.get(self.url, {'q': 'SMI'})
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.smith.id])
@@ -0,0 +1,55 @@
+import json
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time
+from tutorials.models import User, Tutor, Term, TutorAvalibility
+
+
+class TutorAvailabilityGridViewTests(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.url = reverse('tutor_availability_grid')
+        self.client.login(username="@tutor", password="Password123")
+
+    def test_get_renders_existing_availability(self):
+        """Test that the grid is pre-filled with the stored windows."""
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'tutor_availability_grid.html')
+        self.assertEqual(
+            json.loads(response.context['form']['grid'].value()),
+            {str(self.term.id): {'Monday': [['09:00', '12:00']]}},
+        )
+
+    def test_post_saves_whole_grid(self):
+        """Test that one submission stores every window of the week."""
+        grid = {str(self.term.id): {'Monday': [['09:00', '12:00']], 'Wednesday': [['09:00', '12:00'], ['14:00', '16:00']]}}
+        response = self.client.post(self.url, {'grid': json.dumps(grid)})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(
+            sorted((tuple(row.day_of_week), row.start_time) for row in TutorAvalibility.objects.filter(tutor=self.tutor)),
+            [(('monday', 'wednesday'), time(9, 0)), (('wednesday',), time(14, 0))],
+        )
+
+    def test_post_rejects_invalid_windows(self):
+        """Test that windows breaking the availability rules are reported and nothing is saved."""
+        grid = {str(self.term.id): {'Monday': [['08:00', '10:00']], 'Tuesday': [['12:00', '11:00']]}}
+        response = self.client.post(self.url, {'grid': json.dumps(grid)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['form'].errors['grid']), 2)
+        self.assertFalse(TutorAvalibility.objects.exists())
+
+    def test_students_are_redirected(self):
+        """Test that only tutors can use the editor."""
+        User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        self.client.login(username="@student", password="Password123")
+        self.assertRedirects(self.client.get(self.url), reverse('dashboard'), fetch_redirect_response=False)
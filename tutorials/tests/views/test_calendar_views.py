@@ -0,0 +1,254 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.lessons import sync_lessons
+from tutorials.models import User, Tutor, Booking, Language, Term, Lesson, BlackoutDate
+
+class CalendarBookingsApiTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com",
+            first_name="Alice", last_name="Wonder", account_type="student"
+        )
+        self.tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="John", last_name="Doe", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=self.tutor_user)
+        self.booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            language=self.language,
+            term=self.term,
+            day_of_week="Monday",
+            start_time=time(10, 0),
+            duration=timedelta(hours=1),
+            frequency=Booking.WEEKLY,
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+        self.url = reverse('calendar_bookings_api')
+
+    def test_returns_whole_term_without_window(self):
+        """Test that all occurrences of the term are returned when no window is given."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 13)
+
+    def test_returns_only_occurrences_in_window(self):
+        """Test that only occurrences in [start, end) are returned."""
+        self.client.login(username="@tutor", password="Password123")
+        response = self.client.get(self.url, {'start': '2024-06-01', 'end': '2024-07-01'})
+        self.assertEqual(response.status_code, 200)
+        dates = [event['date'] for event in response.json()]
+        self.assertEqual(dates, ['2024-06-03', '2024-06-10', '2024-06-17', '2024-06-24'])
+        self.assertEqual(response.json()[0]['title'], "Python with John Doe")
+
+    def test_window_outside_term_is_empty(self):
+        """Test that a window outside the term returns no events."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url, {'start': '2024-09-01', 'end': '2024-10-01'})
+        self.assertEqual(response.json(), [])
+
+    def test_invalid_window_is_rejected(self):
+        """Test that malformed or inverted windows are rejected."""
+        self.client.login(username="@student", password="Password123")
+        self.assertEqual(self.client.get(self.url, {'start': 'not-a-date'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '2024-07-01', 'end': '2024-06-01'}).status_code, 400)
+
+    def test_lesson_source_reads_materialized_lessons(self):
+        """Test that the lesson feed mode only returns stored lessons in the window."""
+        for day in (3, 10, 17):
+            Lesson.objects.create(booking=self.booking, date=date(2024, 6, day), start_time=time(10, 0), duration=timedelta(hours=1))
+        self.client.login(username="@student", password="Password123")
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'source': 'lessons', 'start': '2024-06-05', 'end': '2024-07-01'})
+        dates = [event['date'] for event in response.json()]
+        self.assertEqual(dates, ['2024-06-10', '2024-06-17'])
+
+    def test_lesson_source_hides_lessons_of_unaccepted_bookings(self):
+        """Test that lessons are not shown once their booking is no longer accepted."""
+        Lesson.objects.create(booking=self.booking, date=date(2024, 6, 3), start_time=time(10, 0), duration=timedelta(hours=1))
+        self.booking.student_approval = Booking.STUDENT_REJECTED
+        self.booking.save()
+        self.client.login(username="@tutor", password="Password123")
+        response = self.client.get(self.url, {'source': 'lessons'})
+        self.assertEqual(response.json(), [])
+
+    def test_unchanged_schedule_answers_not_modified(self):
+        """Test that a revalidation with a current ETag is answered without touching bookings."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_window(self):
+        """Test that different windows get different ETags."""
+        self.client.login(username="@student", password="Password123")
+        june = self.client.get(self.url, {'start': '2024-06-01', 'end': '2024-07-01'})
+        july = self.client.get(self.url, {'start': '2024-07-01', 'end': '2024-08-01'})
+        self.assertNotEqual(june['ETag'], july['ETag'])
+
+    def test_booking_change_invalidates_etag(self):
+        """Test that changing a booking bumps the schedule version of its student and tutor."""
+        self.client.login(username="@student", password="Password123")
+        etag = self.client.get(self.url)['ETag']
+        self.booking.start_time = time(11, 0)
+        self.booking.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.tutor_user.refresh_from_db()
+        self.assertEqual(self.tutor_user.schedule_version, 2)
+
+    def test_lesson_sync_invalidates_etag(self):
+        """Test that materializing lessons bumps the schedule version once."""
+        self.student.refresh_from_db()
+        version = self.student.schedule_version
+        sync_lessons(self.booking)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.schedule_version, version + 1)
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com",
+            first_name="Alice", last_name="Wonder", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="John", last_name="Doe", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.booking = Booking.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            language=self.language,
+            term=self.term,
+            day_of_week="Monday",
+            start_time=time(10, 0),
+            duration=timedelta(hours=1),
+            frequency=Booking.FORTNIGHTLY,
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+        self.student.refresh_from_db()
+        self.url = reverse('calendar_feed', args=[self.student.calendar_token])
+
+    def get_feed(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content).decode() if response.status_code == 200 else ''
+        return response, body
+
+    def test_feed_has_one_event_per_booking(self):
+        """Test that each booking is emitted once with a fortnightly RRULE."""
+        response, body = self.get_feed()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn('DTSTART:20240506T100000\r\n', body)
+        self.assertIn('DTEND:20240506T110000\r\n', body)
+        self.assertIn('RRULE:FREQ=WEEKLY;INTERVAL=2;UNTIL=20240731T235959\r\n', body)
+        self.assertIn('SUMMARY:Python with John Doe\r\n', body)
+        self.assertNotIn('EXDATE', body)
+
+    def test_cancelled_lessons_are_exdates(self):
+        """Test that scheduled dates without a lesson are emitted as EXDATEs."""
+        sync_lessons(self.booking)
+        Lesson.objects.filter(date=date(2024, 6, 3)).delete()
+        _, body = self.get_feed()
+        self.assertIn('EXDATE:20240603T100000\r\n', body)
+
+    def test_blackout_dates_resync_lessons_and_exdates(self):
+        """Test that adding or removing a blackout date updates the lessons and the feed's EXDATEs."""
+        sync_lessons(self.booking)
+        blackout = BlackoutDate.objects.create(term=self.term, date=date(2024, 6, 3))
+        self.assertFalse(Lesson.objects.filter(booking=self.booking, date=date(2024, 6, 3)).exists())
+        _, body = self.get_feed()
+        self.assertIn('EXDATE:20240603T100000\r\n', body)
+
+        blackout.delete()
+        self.assertTrue(Lesson.objects.filter(booking=self.booking, date=date(2024, 6, 3)).exists())
+        _, body = self.get_feed()
+        self.assertNotIn('EXDATE', body)
+
+    def test_term_dates_resync_lessons(self):
+        """Test that shortening a term drops the lessons after its new end, without EXDATEs for them."""
+        sync_lessons(self.booking)
+        self.term.end_date = date(2024, 6, 30)
+        self.term.save()
+        self.assertEqual(Lesson.objects.filter(booking=self.booking).latest('date').date, date(2024, 6, 17))
+        _, body = self.get_feed()
+        self.assertIn('UNTIL=20240630T235959', body)
+        self.assertNotIn('EXDATE', body)
+
+    def test_unknown_token(self):
+        """Test that an unknown token is not found."""
+        response = self.client.get(reverse('calendar_feed', args=['unknown']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_feed_answers_not_modified(self):
+        """Test that the feed can be revalidated by token without rebuilding it."""
+        response, _ = self.get_feed()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class BookingCalendarDataTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com",
+            first_name="Alice", last_name="Wonder", account_type="student"
+        )
+        self.tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="John", last_name="Doe", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=self.tutor_user)
+        self.url = reverse('booking_calendar_data')
+
+    def create_booking(self, day_of_week="Monday", start_time=time(10, 0)):
+        return Booking.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            language=self.language,
+            term=self.term,
+            day_of_week=day_of_week,
+            start_time=start_time,
+            duration=timedelta(minutes=90),
+            student_approval=Booking.STUDENT_APPROVED,
+            tutor_approval=Booking.TUTOR_APPROVED,
+        )
+
+    def test_returns_timed_events_in_range(self):
+        """Test that events honour FullCalendar's range and carry start and end times."""
+        booking = self.create_booking()
+        self.client.login(username="@tutor", password="Password123")
+        response = self.client.get(self.url, {'start': '2024-05-27T00:00:00+01:00', 'end': '2024-06-10T00:00:00+01:00'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'id': f'{booking.id}-2024-05-27', 'title': 'Python with John Doe', 'start': '2024-05-27T10:00:00',
+             'end': '2024-05-27T11:30:00', 'description': 'Subject: General'},
+            {'id': f'{booking.id}-2024-06-03', 'title': 'Python with John Doe', 'start': '2024-06-03T10:00:00',
+             'end': '2024-06-03T11:30:00', 'description': 'Subject: General'},
+        ])
+
+    def test_query_count_does_not_grow_with_events(self):
+        """Test that the number of queries is bounded regardless of the number of events."""
+        for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'):
+            self.create_booking(day_of_week=day)
+        self.client.login(username="@student", password="Password123")
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'start': '2024-05-01', 'end': '2024-08-01'})
+        self.assertEqual(len(response.json()), 66)
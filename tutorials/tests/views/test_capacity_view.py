@@ -0,0 +1,54 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.calendar_cache import calendar_cache
+from tutorials.models import User, Tutor, Booking, Language, Term, TutorAvalibility
+
+
+class CapacityReportViewTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May", start_date=date(2024, 5, 1), end_date=date(2024, 5, 28))
+        self.admin = User.objects.create_user(
+            username="@admin", password="Password123", email="admin@example.com", is_staff=True
+        )
+        student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        tutor = Tutor.objects.create(user=tutor_user)
+        tutor.languages.add(self.language)
+        TutorAvalibility.objects.create(
+            tutor=tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(10, 0)
+        )
+        Booking.objects.create(
+            student=student, language=self.language, term=self.term, day_of_week="Monday",
+            start_time=time(9, 0), duration=timedelta(hours=2),
+        )
+        self.url = reverse('capacity_report')
+
+    def test_report_names_languages(self):
+        """Test that the report lists supply and demand with language names."""
+        self.client.login(username="@admin", password="Password123")
+        response = self.client.get(self.url, {'term': self.term.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['terms'], [{
+            'id': self.term.id,
+            'name': str(self.term),
+            'rows': [{
+                'language': "Python", 'specialization': None, 'tutors': 1, 'bookings': 1,
+                'supply_hours': 4.0, 'demand_hours': 8.0, 'shortfall_hours': 4.0,
+            }],
+        }])
+
+    def test_invalid_term(self):
+        self.client.login(username="@admin", password="Password123")
+        self.assertEqual(self.client.get(self.url, {'term': 'x'}).status_code, 400)
+
+    def test_staff_only(self):
+        """Test that non-staff users are sent to the admin login."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
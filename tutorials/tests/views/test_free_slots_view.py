@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time
+from tutorials.calendar_cache import calendar_cache
+from tutorials.models import User, Tutor, Language, Term, TutorAvalibility
+
+
+class FreeSlotsApiTests(TestCase):
+    def setUp(self):
+        calendar_cache().clear()
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        self.tutors = []
+        for name, end_time in (("Ada", time(10, 0)), ("Bob", time(12, 0))):
+            user = User.objects.create_user(
+                username=f"@{name.lower()}", password="Password123", email=f"{name.lower()}@example.com",
+                first_name=name, last_name="Tutor", account_type="tutor",
+            )
+            tutor = Tutor.objects.create(user=user)
+            tutor.languages.add(self.language)
+            TutorAvalibility.objects.create(
+                tutor=tutor, term=self.term, day_of_week=['monday'], start_time=time(9, 0), end_time=end_time
+            )
+            self.tutors.append(tutor)
+        self.url = reverse('free_slots_api')
+        self.client.login(username="@student", password="Password123")
+
+    def test_free_slots_of_language_tutors(self):
+        """Test that every tutor teaching the language is listed, filtered by duration."""
+        response = self.client.get(self.url, {'term': self.term.id, 'language': self.language.id, 'duration': 90})
+        self.assertEqual(response.status_code, 200)
+        tutors = response.json()['tutors']
+        self.assertEqual([tutor['name'] for tutor in tutors], ["Ada Tutor", "Bob Tutor"])
+        self.assertEqual(tutors[0]['days']['Monday']['weekly'], [])
+        self.assertEqual(tutors[1]['days']['Monday']['weekly'], [["09:00", "12:00"]])
+
+    def test_free_slots_of_one_tutor(self):
+        """Test that a single tutor can be queried."""
+        response = self.client.get(self.url, {'term': self.term.id, 'tutor': self.tutors[0].id})
+        self.assertEqual(response.json()['tutors'][0]['days'], {
+            'Monday': {'weekly': [["09:00", "10:00"]], 'first_week': [["09:00", "10:00"]], 'second_week': [["09:00", "10:00"]]},
+        })
+
+    def test_requires_term_and_tutor_or_language(self):
+        """Test that incomplete queries are rejected."""
+        self.assertEqual(self.client.get(self.url, {'term': self.term.id}).status_code, 400)
@@ -0,0 +1,44 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Term, TutorAvalibility
+
+
+class BookingTutorMatchesViewTests(TestCase):
+    def setUp(self):
+        language = Language.objects.create(name="Python")
+        term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        User.objects.create_user(username="@admin", password="Password123", email="admin@example.com", is_staff=True)
+        student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com",
+            first_name="Jane", last_name="Doe", account_type="tutor",
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.tutor.languages.add(language)
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=term, day_of_week=['monday'], start_time=time(9, 0), end_time=time(12, 0)
+        )
+        self.booking = Booking.objects.create(
+            student=student, language=language, term=term,
+            day_of_week="Monday", start_time=time(10, 0), duration=timedelta(hours=1),
+        )
+        self.url = reverse('booking_tutor_matches', args=[self.booking.id])
+
+    def test_returns_ranked_tutors(self):
+        """Test that staff receive the matching tutors as JSON."""
+        self.client.login(username="@admin", password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'booking': self.booking.id,
+            'tutors': [{'id': self.tutor.id, 'name': 'Jane Doe', 'load': 0, 'window': '09:00-12:00'}],
+        })
+
+    def test_requires_staff(self):
+        """Test that students cannot query tutor matches."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Term, TutorAvalibility
+
+class OccupancyHeatmapViewTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.term = Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31))
+        self.admin = User.objects.create_user(
+            username="@admin", password="Password123", email="admin@example.com", is_staff=True
+        )
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday', 'tuesday'],
+            start_time=time(9, 0), end_time=time(12, 0)
+        )
+        for day_of_week, frequency in (("Monday", Booking.WEEKLY), ("Tuesday", Booking.FORTNIGHTLY)):
+            Booking.objects.create(
+                tutor=self.tutor,
+                student=self.student,
+                language=self.language,
+                term=self.term,
+                day_of_week=day_of_week,
+                start_time=time(10, 10),
+                duration=timedelta(minutes=45),
+                frequency=frequency,
+                student_approval=Booking.STUDENT_APPROVED,
+                tutor_approval=Booking.TUTOR_APPROVED,
+            )
+        self.url = reverse('occupancy_heatmap')
+
+    def test_occupancy_grids(self):
+        """Test that bookings and availability are summed into 15-minute slots."""
+        self.client.login(username="@admin", password="Password123")
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['slot_minutes'], 15)
+        term = data['terms'][0]
+        monday_booked = term['booked'][0]
+        self.assertEqual(monday_booked[40:44], [1.0, 1.0, 1.0, 1.0])
+        self.assertEqual(sum(monday_booked), 4.0)
+        self.assertEqual(sum(term['booked'][1]), 2.0)
+        self.assertEqual(term['available'][0][36:48], [1.0] * 12)
+        self.assertEqual(sum(term['available'][2]), 0)
+
+    def test_filter_by_term(self):
+        """Test that the heatmap can be limited to one term."""
+        Term.objects.create(name="January-Easter", start_date=date(2025, 1, 10), end_date=date(2025, 4, 10))
+        self.client.login(username="@admin", password="Password123")
+        response = self.client.get(self.url, {'term': self.term.id})
+        self.assertEqual([term['id'] for term in response.json()['terms']], [self.term.id])
+        self.assertEqual(self.client.get(self.url, {'term': 'x'}).status_code, 400)
+
+    def test_non_staff_cannot_access(self):
+        """Test that students are redirected away from the heatmap."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Specialization, Term, TutorAvalibility
+from tutorials.pagination import PAGE_SIZE
+
+
+class PendingBookingsQueueTests(TestCase):
+    def setUp(self):
+        self.python = Language.objects.create(name="Python")
+        self.java = Language.objects.create(name="Java")
+        self.web = Specialization.objects.create(name="Web Development")
+        self.term = Term.objects.create(name="May", start_date=date(2024, 5, 1), end_date=date(2024, 5, 31))
+        self.admin = User.objects.create_user(
+            username="@admin", password="Password123", email="admin@example.com", is_staff=True
+        )
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.tutor.languages.add(self.python, self.java)
+        TutorAvalibility.objects.create(
+            tutor=self.tutor, term=self.term, day_of_week=['monday', 'tuesday'],
+            start_time=time(8, 0), end_time=time(20, 0)
+        )
+        Booking.objects.bulk_create([
+            Booking(
+                student=self.student, tutor=self.tutor if index % 3 == 0 else None,
+                language=self.java if index % 2 else self.python,
+                specialization=self.web if index % 5 == 0 else None, term=self.term,
+                day_of_week="Monday", start_time=time(8 + index // 4, index % 4 * 15), duration=timedelta(minutes=15),
+            )
+            for index in range(PAGE_SIZE + 10)
+        ])
+        self.url = reverse('admin_pending_bookings')
+        self.client.login(username="@admin", password="Password123")
+
+    def ids(self, response):
+        return [booking.id for booking in response.context['bookings']]
+
+    def test_pages_cost_a_fixed_number_of_queries(self):
+        """Test that every page is one joined query, however many bookings are pending."""
+        with self.assertNumQueries(6):
+            first = self.client.get(self.url)
+        self.assertEqual(len(first.context['bookings']), PAGE_SIZE)
+        with self.assertNumQueries(6):
+            second = self.client.get(self.url, {'after': first.context['page'].next_cursor})
+        self.assertEqual(
+            self.ids(first) + self.ids(second),
+            list(Booking.objects.order_by('start_time', 'id').values_list('id', flat=True)),
+        )
+
+    def test_filters(self):
+        """Test that the queue is filtered by language, specialization and tutor assignment."""
+        response = self.client.get(self.url, {'language': self.java.id, 'has_tutor': 'yes'})
+        self.assertEqual(
+            sorted(self.ids(response)),
+            list(Booking.objects.filter(language=self.java, tutor__isnull=False).order_by('id').values_list('id', flat=True)),
+        )
+        response = self.client.get(self.url, {'specialization': self.web.id, 'has_tutor': 'no'})
+        self.assertEqual(
+            sorted(self.ids(response)),
+            list(Booking.objects.filter(specialization=self.web, tutor__isnull=True).order_by('id').values_list('id', flat=True)),
+        )
+        self.assertEqual(self.client.get(self.url, {'has_tutor': 'maybe'}).status_code, 400)
+
+    def test_bulk_approve(self):
+        """Test that the selected bookings are decided in one request and skipped ones are reported."""
+        with_tutor, without_tutor = (
+            Booking.objects.filter(tutor__isnull=False, specialization__isnull=True).order_by('id').first(),
+            Booking.objects.filter(tutor__isnull=True).order_by('id').first(),
+        )
+        next_url = f"{self.url}?language={self.python.id}"
+        response = self.client.post(reverse('decide_pending_bookings'), {
+            'decision': 'approve', 'booking_ids': [with_tutor.id, without_tutor.id], 'next': next_url,
+        }, follow=True)
+        self.assertRedirects(response, next_url)
+        self.assertEqual(Booking.objects.get(pk=with_tutor.pk).status, Booking.ACCEPTED)
+        self.assertEqual(Booking.objects.get(pk=without_tutor.pk).status, Booking.PENDING)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertIn("1 booking(s) approved.", messages)
+        self.assertIn(f"Booking {without_tutor.id} was not approved: No tutor is assigned.", messages)
+
+    def test_bulk_decline(self):
+        booking_ids = list(Booking.objects.order_by('id').values_list('id', flat=True)[:3])
+        response = self.client.post(reverse('decide_pending_bookings'), {
+            'decision': 'decline', 'booking_ids': booking_ids, 'next': 'https://example.com/',
+        })
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertEqual(Booking.objects.filter(status=Booking.DECLINED).count(), 3)
+
+    def test_invalid_decision(self):
+        response = self.client.post(reverse('decide_pending_bookings'), {'decision': 'maybe'})
+        self.assertEqual(response.status_code, 400)
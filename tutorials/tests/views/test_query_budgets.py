@@ -0,0 +1,239 @@
+"""Query-count and wall-clock budgets for every route, as every role, on a large dataset."""
+
+from datetime import date, time, timedelta
+from time import perf_counter
+from django.contrib import admin
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from tutorials.calendar_cache import calendar_cache
+from tutorials.capabilities import capabilities
+from tutorials.lessons import sync_many_lessons
+from tutorials.models import (
+    User, Tutor, Booking, Language, Specialization, Term, TutorAvalibility, BlackoutDate
+)
+
+TUTORS = 100
+STUDENTS = 300
+BOOKINGS_PER_USER = 120
+OTHER_BOOKINGS = 1200
+
+# Wall-clock ceiling of any request, in seconds.
+SECONDS = 1.0
+
+ROLES = ('anonymous', 'student', 'tutor', 'staff')
+
+# Most queries a route may run, as each of ROLES. Roles a route is not for
+# are still budgeted, since they must be turned away just as cheaply.
+BUDGETS = {
+    'home': (0, 2, 2, 2),
+    'log_in': (0, 2, 2, 2),
+    'sign_up': (0, 2, 2, 2),
+    'log_out': (0, 4, 4, 4),
+    'dashboard': (0, 2, 2, 2),
+    'password': (0, 2, 2, 2),
+    'profile': (0, 2, 2, 2),
+    'create_booking': (0, 5, 5, 5),
+    'view_bookings': (0, 4, 5, 4),
+    'tutor_profile': (0, 2, 7, 2),
+    'tutor_availability': (0, 3, 4, 3),
+    'tutor_availability_grid': (0, 3, 5, 3),
+    'accept_booking': (0, 6, 6, 5),
+    'reject_booking': (0, 5, 9, 5),
+    'booking_calendar_data': (0, 4, 4, 3),
+    'calendar_bookings_api': (0, 4, 4, 3),
+    'calendar_feed': (4, 4, 4, 4),
+    'free_slots_api': (0, 7, 7, 7),
+    'admin_pending_bookings': (0, 2, 2, 6),
+    'decide_pending_bookings': (0, 2, 2, 7),
+    'approve_booking': (0, 2, 2, 5),
+    'decline_booking': (0, 2, 2, 5),
+    'admin_create_booking': (0, 2, 2, 8),
+    'occupancy_heatmap': (0, 2, 2, 5),
+    'capacity_report': (0, 2, 2, 10),
+    'user_autocomplete': (0, 2, 2, 3),
+    'booking_tutor_matches': (0, 2, 2, 7),
+}
+
+# Most queries of the changelist and add form of every registered admin model, as staff.
+ADMIN_BUDGETS = {
+    'group': (5, 4),
+    'user': (5, 5),
+    'booking': (7, 6),
+    'language': (5, 3),
+    'tutor': (6, 5),
+    'term': (5, 3),
+    'lesson': (5, 3),
+    'specialization': (5, 4),
+    'tutoravalibility': (6, 4),
+}
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Request every route as every role and fail on query or time regressions.
+
+    Caches are cleared before each request, so budgets hold for cold
+    requests. Counts must not grow with the size of the dataset, which is
+    large enough for any per-row query to blow the budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        cls.terms = Term.objects.bulk_create([
+            Term(name=name, start_date=today + timedelta(days=offset), end_date=today + timedelta(days=offset + 90))
+            for name, offset in (('September-Christmas', -60), ('January-Easter', 40), ('May-July', 140))
+        ])
+        BlackoutDate.objects.create(term=cls.terms[0], date=cls.terms[0].start_date + timedelta(days=14))
+        cls.languages = Language.objects.bulk_create([Language(name=f"Language {index}") for index in range(10)])
+        cls.specializations = Specialization.objects.bulk_create([
+            Specialization(name=f"Specialization {index}") for index in range(5)
+        ])
+
+        cls.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        cls.staff = User.objects.create_superuser(username="@staff", password="Password123", email="staff@example.com")
+        tutor_users = User.objects.bulk_create([
+            User(username=f"@tutor{index}", email=f"tutor{index}@example.com", first_name="Tutor",
+                 last_name=f"Number{index}", account_type="tutor", password="!", calendar_token=f"tutor-{index}")
+            for index in range(TUTORS)
+        ])
+        students = User.objects.bulk_create([
+            User(username=f"@student{index}", email=f"student{index}@example.com", first_name="Student",
+                 last_name=f"Number{index}", account_type="student", password="!", calendar_token=f"student-{index}")
+            for index in range(STUDENTS)
+        ])
+        tutors = Tutor.objects.bulk_create([Tutor(user=user) for user in tutor_users])
+        cls.tutor = tutors[0]
+        Tutor.languages.through.objects.bulk_create([
+            Tutor.languages.through(tutor=tutor, language=cls.languages[(index + offset) % len(cls.languages)])
+            for index, tutor in enumerate(tutors)
+            for offset in range(3)
+        ])
+        Tutor.specializations.through.objects.bulk_create([
+            Tutor.specializations.through(tutor=tutor, specialization=cls.specializations[index % len(cls.specializations)])
+            for index, tutor in enumerate(tutors)
+        ])
+        TutorAvalibility.objects.bulk_create([
+            TutorAvalibility(
+                tutor=tutor, term=term, day_of_week=['monday', 'tuesday', 'wednesday', 'thursday', 'friday'],
+                start_time=time(8, 0), end_time=time(20, 0),
+            )
+            for tutor in tutors
+            for term in cls.terms
+        ])
+
+        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+        def booking(index, student, tutor, accepted):
+            approval = {'student_approval': Booking.STUDENT_APPROVED, 'tutor_approval': Booking.TUTOR_APPROVED}
+            return Booking(
+                student=student, tutor=tutor, language=cls.languages[index % len(cls.languages)],
+                term=cls.terms[index % len(cls.terms)], day_of_week=days[index % len(days)],
+                start_time=time(8 + index // 15 % 12, 0), duration=timedelta(hours=1),
+                frequency=Booking.FORTNIGHTLY if index % 4 == 0 else Booking.WEEKLY,
+                status=Booking.ACCEPTED if accepted else Booking.PENDING,
+                **(approval if accepted else {}),
+            )
+
+        bookings = Booking.objects.bulk_create(
+            [booking(index, cls.student, tutors[1 + index % (TUTORS - 1)], index % 2 == 0) for index in range(BOOKINGS_PER_USER)]
+            + [booking(index, students[index % STUDENTS], cls.tutor, index % 2 == 0) for index in range(BOOKINGS_PER_USER)]
+            + [booking(index, students[index % STUDENTS], None, False) for index in range(OTHER_BOOKINGS)]
+        )
+        sync_many_lessons(Booking.objects.filter(status=Booking.ACCEPTED).select_related('term'))
+        cls.pending = [booking for booking in bookings if booking.status == Booking.PENDING]
+
+    def requests(self, role):
+        """Yield (name, query budget, method, url, data) for every request made as the role."""
+        student_pending = next(booking for booking in self.pending if booking.student_id == self.student.id)
+        tutor_pending = next(booking for booking in self.pending if booking.tutor_id == self.tutor.id)
+        tutored_pending = next(booking for booking in self.pending if booking.tutor_id and booking is not tutor_pending)
+        tutorless = [booking for booking in self.pending if booking.tutor_id is None]
+        calendar_window = {'start': self.terms[0].start_date.isoformat(), 'end': self.terms[1].end_date.isoformat()}
+        routes = {
+            'home': ('get', [], {}),
+            'log_in': ('get', [], {}),
+            'sign_up': ('get', [], {}),
+            'dashboard': ('get', [], {}),
+            'password': ('get', [], {}),
+            'profile': ('get', [], {}),
+            'create_booking': ('get', [], {}),
+            'view_bookings': ('get', [], {}),
+            'tutor_profile': ('get', [], {}),
+            'tutor_availability': ('get', [], {}),
+            'tutor_availability_grid': ('get', [], {}),
+            'accept_booking': ('get', [student_pending.id], {}),
+            'reject_booking': ('get', [tutor_pending.id], {}),
+            'booking_calendar_data': ('get', [], calendar_window),
+            'calendar_bookings_api': ('get', [], calendar_window),
+            'calendar_feed': ('get', [self.student.calendar_token], {}),
+            'free_slots_api': ('get', [], {'term': self.terms[0].id, 'language': self.languages[0].id}),
+            'admin_pending_bookings': ('get', [], {}),
+            'decide_pending_bookings': ('post', [], {
+                'decision': 'decline', 'booking_ids': [booking.id for booking in tutorless[:50]],
+            }),
+            'approve_booking': ('post', [tutorless[50].id], {}),
+            'decline_booking': ('post', [tutorless[51].id], {}),
+            'admin_create_booking': ('get', [], {'booking_id': tutored_pending.id}),
+            'occupancy_heatmap': ('get', [], {}),
+            'capacity_report': ('get', [], {}),
+            'user_autocomplete': ('get', [], {'q': '@student1'}),
+            'booking_tutor_matches': ('get', [tutored_pending.id], {}),
+        }
+        column = ROLES.index(role)
+        for name, (method, args, data) in routes.items():
+            yield name, BUDGETS[name][column], method, reverse(name, args=args), data
+        if role == 'staff':
+            for model in admin.site._registry:
+                info = (model._meta.app_label, model._meta.model_name)
+                changelist, add = ADMIN_BUDGETS[info[1]]
+                yield f'{info[1]} changelist', changelist, 'get', reverse('admin:%s_%s_changelist' % info), {}
+                yield f'{info[1]} add form', add, 'get', reverse('admin:%s_%s_add' % info), {}
+        # Last, as it ends the session the other requests rely on.
+        yield 'log_out', BUDGETS['log_out'][column], 'get', reverse('log_out'), {}
+
+    def measure(self, method, url, data):
+        calendar_cache().clear()
+        capabilities.invalidate()
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = getattr(self.client, method)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = perf_counter() - started
+        return response, len(queries), elapsed
+
+    def assertWithinBudgets(self, role, user=None):
+        if user is not None:
+            self.client.force_login(user)
+        for name, budget, method, url, data in self.requests(role):
+            with self.subTest(role=role, route=name):
+                response, queries, elapsed = self.measure(method, url, data)
+                self.assertLess(response.status_code, 500)
+                self.assertLessEqual(queries, budget, f"{name} ran {queries} queries as {role}")
+                self.assertLessEqual(elapsed, SECONDS, f"{name} took {elapsed:.2f}s as {role}")
+
+    def test_every_route_has_a_budget(self):
+        """Test that new routes and admin models cannot be added without a budget."""
+        names = {
+            pattern.name for pattern in get_resolver().url_patterns
+            if isinstance(pattern, URLPattern) and pattern.name
+        }
+        self.assertEqual(names - set(BUDGETS), set())
+        self.assertEqual({model._meta.model_name for model in admin.site._registry} - set(ADMIN_BUDGETS), set())
+
+    def test_anonymous(self):
+        self.assertWithinBudgets('anonymous')
+
+    def test_student(self):
+        self.assertWithinBudgets('student', self.student)
+
+    def test_tutor(self):
+        self.assertWithinBudgets('tutor', self.tutor.user)
+
+    def test_staff(self):
+        self.assertWithinBudgets('staff', self.staff)
@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.urls import reverse
+from datetime import date, time, timedelta
+from tutorials.models import User, Tutor, Booking, Language, Term
+from tutorials.pagination import PAGE_SIZE, encode_cursor
+from tutorials.views import BOOKING_PAGE_ORDERING, BOOKING_WEEKDAY
+
+
+class ViewBookingsTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(name="Python")
+        self.terms = [
+            Term.objects.create(name="May-July", start_date=date(2024, 5, 1), end_date=date(2024, 7, 31)),
+            Term.objects.create(name="September-Christmas", start_date=date(2024, 9, 1), end_date=date(2024, 12, 20)),
+        ]
+        self.student = User.objects.create_user(
+            username="@student", password="Password123", email="student@example.com", account_type="student"
+        )
+        tutor_user = User.objects.create_user(
+            username="@tutor", password="Password123", email="tutor@example.com", account_type="tutor"
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        days = ["Monday", "Friday", "Sunday"]
+        Booking.objects.bulk_create([
+            Booking(
+                student=self.student, tutor=self.tutor if index % 2 else None, language=self.language,
+                term=self.terms[index % 2], day_of_week=days[index % 3], start_time=time(9 + index % 3, index % 2 * index),
+                duration=timedelta(hours=1), status=Booking.ACCEPTED if index % 2 else Booking.PENDING,
+            )
+            for index in range(2 * PAGE_SIZE + 5)
+        ])
+        self.url = reverse('view_bookings')
+
+    def page_ids(self, response):
+        return [booking.id for booking in response.context['page']]
+
+    def expected_ids(self, bookings):
+        return list(
+            bookings.annotate(weekday_index=BOOKING_WEEKDAY).order_by(*BOOKING_PAGE_ORDERING).values_list('id', flat=True)
+        )
+
+    def test_pages_follow_the_keyset(self):
+        """Test that following the next links walks every booking once, in order, at a fixed query cost."""
+        self.client.login(username="@student", password="Password123")
+        seen = []
+        params = {}
+        while True:
+            with self.assertNumQueries(4):
+                response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.context['page']), PAGE_SIZE)
+            seen += self.page_ids(response)
+            if not response.context['page'].has_next:
+                break
+            params = {'after': response.context['page'].next_cursor}
+        self.assertEqual(seen, self.expected_ids(Booking.objects.filter(student=self.student)))
+
+        previous = self.client.get(self.url, {'before': response.context['page'].previous_cursor})
+        self.assertEqual(self.page_ids(previous), seen[PAGE_SIZE:2 * PAGE_SIZE])
+        self.assertTrue(previous.context['page'].has_next)
+
+    def test_filters(self):
+        """Test that bookings can be filtered by status and term, and the filters carry over to page links."""
+        self.client.login(username="@tutor", password="Password123")
+        response = self.client.get(self.url, {'status': Booking.ACCEPTED, 'term': self.terms[1].id})
+        self.assertEqual(
+            self.page_ids(response),
+            self.expected_ids(Booking.objects.filter(tutor=self.tutor, term=self.terms[1]))[:PAGE_SIZE],
+        )
+        self.assertContains(response, f"status={Booking.ACCEPTED}&amp;term={self.terms[1].id}&amp;after=")
+
+    def test_days_run_monday_to_sunday(self):
+        """Test that bookings are listed by weekday rather than by the day's name."""
+        self.client.login(username="@student", password="Password123")
+        response = self.client.get(self.url, {'term': self.terms[0].id})
+        days = [booking.day_of_week for booking in response.context['page']]
+        self.assertEqual(days, sorted(days, key=["Monday", "Friday", "Sunday"].index))
+
+    def test_invalid_parameters(self):
+        self.client.login(username="@student", password="Password123")
+        self.assertEqual(self.client.get(self.url, {'status': 'Lost'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'term': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'after': 'not-a-cursor'}).status_code, 400)
+
+    def test_tampered_cursor(self):
+        """Test that a cursor which decodes but holds values of the wrong types is rejected."""
+        self.client.login(username="@student", password="Password123")
+        for values in (
+            ['not-a-date', 0, '09:00', 1],
+            ['2024-05-01', 'Monday', '09:00', 1],
+            ['2024-05-01', 0, ['09:00'], 1],
+            ['2024-05-01', 0, '09:00', 'x'],
+            ['2024-05-01', 0, '09:00', None],
+        ):
+            with self.subTest(values=values):
+                self.assertEqual(self.client.get(self.url, {'after': encode_cursor(values)}).status_code, 400)
+                self.assertEqual(self.client.get(self.url, {'before': encode_cursor(values)}).status_code, 400)
@@ -0,0 +1,96 @@
+"""Validation of many bookings against availabilities and accepted bookings at once."""
+
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from .capabilities import capabilities
+from .intervals import IntervalIndex, Slot, to_minutes
+
+
+class BookingValidator:
+    """
+    Check bookings the way Booking.clean does, with data loaded up front.
+
+    The tutors' availability windows and accepted bookings for every
+    (tutor, term, weekday) in the batch are read in two queries;
+    specializations come from the capability index. With as_accepted=True
+    the bookings are also checked against each other, as when a batch is
+    being accepted together.
+    """
+
+    def __init__(self, bookings, as_accepted=False):
+        from .models import Booking, TutorAvalibility
+
+        self.bookings = list(bookings)
+        self.as_accepted = as_accepted
+        assigned = [booking for booking in self.bookings if booking.tutor_id and booking.term_id]
+        tutor_ids = {booking.tutor_id for booking in assigned}
+        term_ids = {booking.term_id for booking in assigned}
+        days = {booking.day_of_week for booking in assigned}
+
+        self.windows = defaultdict(list)
+        self.accepted = IntervalIndex()
+        if not assigned:
+            return
+        for tutor_id, term_id, window_days, start_time, end_time in TutorAvalibility.objects.filter(
+            tutor_id__in=tutor_ids, term_id__in=term_ids
+        ).order_by('id').values_list('tutor_id', 'term_id', 'day_of_week', 'start_time', 'end_time'):
+            for day in window_days:
+                self.windows[tutor_id, term_id, day.capitalize()].append((start_time, end_time))
+        for booking_id, tutor_id, term_id, day, start_time, duration, frequency, week_parity in Booking.objects.filter(
+            status=Booking.ACCEPTED, tutor_id__in=tutor_ids, term_id__in=term_ids, day_of_week__in=days
+        ).order_by().values_list(
+            'id', 'tutor_id', 'term_id', 'day_of_week', 'start_time', 'duration', 'frequency', 'week_parity'
+        ):
+            self.accepted.add((tutor_id, term_id, day), Slot.build(start_time, duration, frequency, week_parity, booking_id))
+
+    def validate(self, booking):
+        """Raise a ValidationError for the first problem with the booking."""
+        if not booking.term_id:
+            raise ValidationError({'term': 'Please select a term.'})
+
+        if booking.specialization_id and booking.tutor_id:
+            if not capabilities.offers(booking.tutor_id, booking.specialization_id):
+                raise ValidationError({'specialization': f"The selected tutor does not offer specialization in {booking.specialization}."})
+
+        if not booking.tutor_id:
+            return
+        key = (booking.tutor_id, booking.term_id, booking.day_of_week)
+        windows = self.windows.get(key)
+        if not windows:
+            raise ValidationError(f"Tutor is not available on {booking.day_of_week} for the selected term.")
+
+        slot = Slot.of(booking)
+        if not any(to_minutes(start) <= slot.start and slot.end <= to_minutes(end) for start, end in windows):
+            available_slots = ", ".join(
+                f"{start.strftime('%H:%M')} to {end.strftime('%H:%M')}" for start, end in windows
+            )
+            raise ValidationError(
+                f"Tutor is not available at the selected time. Available times for {booking.day_of_week}: {available_slots}."
+            )
+
+        if self.accepted.conflicts(key, slot):
+            raise ValidationError(f"Tutor is already booked at this time: {booking.day_of_week} at {booking.start_time}.")
+
+    def errors(self):
+        """
+        Return one entry per booking, in order: None if it is valid, else its ValidationError.
+
+        With as_accepted=True, each valid booking is added to the accepted
+        slots, so later bookings in the batch clashing with it are rejected.
+        """
+        errors = []
+        for booking in self.bookings:
+            try:
+                self.validate(booking)
+            except ValidationError as error:
+                errors.append(error)
+                continue
+            errors.append(None)
+            if self.as_accepted and booking.tutor_id:
+                self.accepted.add((booking.tutor_id, booking.term_id, booking.day_of_week), Slot.of(booking))
+        return errors
+
+
+def validate_bookings(bookings, as_accepted=False):
+    """Return None or the ValidationError of each booking, in order."""
+    return BookingValidator(bookings, as_accepted).errors()
@@ -6,33 +6,60 @@ from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Case, IntegerField, Value, When
 from django.shortcuts import redirect, render, get_object_or_404
 from django.views import View
 from django.views.generic.edit import FormView, UpdateView
 from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from tutorials.forms import (
     LogInForm, PasswordForm, UserForm, SignUpForm,
     TutorProfileForm, BookingForm, AdminBookingForm
 )
+from tutorials.approvals import approve_bookings, decline_bookings
+from tutorials.availability import (
+    availability_grid, get_free_slots, save_availability_grid, serialize_free_slots
+)
+from tutorials.calendar_cache import get_or_build
+from tutorials.capabilities import capabilities
+from tutorials.capacity import get_capacity
 from tutorials.helpers import login_prohibited
-from django.http import HttpResponseForbidden, HttpResponseBadRequest
+from tutorials.ical import iter_calendar
+from tutorials.lessons import sync_lessons, delete_lessons
+from tutorials.matching import rank_tutors
+from tutorials.occupancy import occupancy
+from tutorials.pagination import InvalidCursor, keyset_page
+from tutorials.search import starts_with
+from django.http import HttpResponseForbidden, HttpResponseBadRequest, HttpResponseNotFound
 from .models import User, Booking, Tutor, Language, Term, Lesson, Specialization
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from .models import Booking
 from django.contrib.auth.decorators import login_required
 from django.utils.timezone import now
 import datetime
+import hashlib
 import logging
-from .forms import TutorAvailablityForm
+from .forms import TutorAvailablityForm, AvailabilityGridForm, autocomplete_label
+from .recurrence import WEEKDAYS
 
 
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_http_methods, condition
 
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Position of a booking's day in the week, so booking lists run Monday to Sunday.
+BOOKING_WEEKDAY = Case(
+    *[When(day_of_week=day, then=Value(index)) for index, day in enumerate(WEEKDAYS)],
+    output_field=IntegerField(),
+)
+# Keyset of the booking lists, over querysets annotated with weekday_index; the id makes every position unique.
+BOOKING_PAGE_ORDERING = ['term__start_date', 'weekday_index', 'start_time', 'id']
+
+
 @login_required
 def dashboard(request):
     """Display the current user's dashboard."""
@@ -190,11 +217,166 @@ def create_booking(request):
     return render(request, 'create_booking.html', {'form': form})
 
 # Pending booking views
+# Query parameters of the pending bookings queue, and the fields they filter on.
+PENDING_BOOKING_FILTERS = {'term': 'term_id', 'language': 'language_id', 'specialization': 'specialization_id'}
+
+
 @staff_member_required
 def pending_bookings(request):
-    """Display all pending bookings for admin users."""
-    bookings = Booking.objects.filter(status=Booking.PENDING).order_by('term__start_date')
-    return render(request, 'admin_pending_bookings.html', {'bookings': bookings})
+    """
+    Display the pending bookings for admin users, a page at a time.
+
+    Bookings can be filtered by term, language, specialization and whether
+    a tutor is assigned, and selected for a bulk decision.
+    """
+    bookings = Booking.objects.filter(status=Booking.PENDING)
+    for parameter, field in PENDING_BOOKING_FILTERS.items():
+        value = request.GET.get(parameter)
+        if value:
+            if not value.isdigit():
+                return HttpResponseBadRequest(f"Invalid {parameter}.")
+            bookings = bookings.filter(**{field: value})
+    has_tutor = request.GET.get('has_tutor')
+    if has_tutor:
+        if has_tutor not in ('yes', 'no'):
+            return HttpResponseBadRequest("Invalid has_tutor.")
+        bookings = bookings.filter(tutor__isnull=has_tutor == 'no')
+
+    bookings = bookings.select_related('student', 'tutor__user', 'language', 'specialization', 'term').annotate(
+        weekday_index=BOOKING_WEEKDAY
+    )
+    try:
+        page = keyset_page(request, bookings, BOOKING_PAGE_ORDERING)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid page.")
+    return render(request, 'admin_pending_bookings.html', {
+        'bookings': page,
+        'page': page,
+        'terms': Term.objects.order_by('start_date'),
+        'languages': Language.objects.order_by('name'),
+        'specializations': Specialization.objects.order_by('name'),
+        'selected': {parameter: request.GET.get(parameter, '') for parameter in [*PENDING_BOOKING_FILTERS, 'has_tutor']},
+    })
+
+
+@require_http_methods(['POST'])
+@staff_member_required
+def decide_pending_bookings(request):
+    """Approve or decline the selected pending bookings in one transaction."""
+    decision = request.POST.get('decision')
+    booking_ids = request.POST.getlist('booking_ids')
+    if decision not in ('approve', 'decline') or not all(booking_id.isdigit() for booking_id in booking_ids):
+        return HttpResponseBadRequest("Invalid decision.")
+
+    booking_ids = [int(booking_id) for booking_id in booking_ids]
+    if decision == 'approve':
+        applied, skipped = approve_bookings(booking_ids)
+        verb = "approved"
+    else:
+        applied, skipped = decline_bookings(booking_ids)
+        verb = "declined"
+    if applied:
+        messages.success(request, f"{len(applied)} booking(s) {verb}.")
+    for booking_id, reason in skipped.items():
+        messages.error(request, f"Booking {booking_id} was not {verb}: {reason}")
+
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse('admin_pending_bookings')
+    return redirect(next_url)
+
+
+@staff_member_required
+def occupancy_heatmap(request):
+    """Return booked and available tutor counts per term, weekday and 15-minute slot."""
+    terms = Term.objects.all()
+    term_id = request.GET.get('term')
+    if term_id:
+        if not term_id.isdigit():
+            return HttpResponseBadRequest("Invalid term.")
+        terms = terms.filter(pk=term_id)
+    return JsonResponse(occupancy(terms))
+
+
+# Most matches returned by the user autocomplete.
+AUTOCOMPLETE_LIMIT = 20
+
+
+@staff_member_required
+def user_autocomplete(request):
+    """
+    Return the students (or tutors, with role=tutor) whose username or last name starts with ?q.
+
+    The search seeks the lowercase indexes on both columns, so it stays fast
+    however many users there are. Tutors are returned with their tutor id.
+    """
+    query = request.GET.get('q', '').strip()
+    role = request.GET.get('role', 'student')
+    if role not in ('student', 'tutor'):
+        return HttpResponseBadRequest("Invalid role.")
+    if not query:
+        return JsonResponse({'results': []})
+
+    if role == 'tutor':
+        choices = Tutor.objects.select_related('user')
+        prefix = 'user__'
+    else:
+        choices = User.objects.filter(account_type='student')
+        prefix = ''
+    choices = starts_with(choices, [f'{prefix}username', f'{prefix}last_name'], query).order_by(
+        f'{prefix}last_name', f'{prefix}first_name', 'pk'
+    )
+    return JsonResponse({'results': [
+        {'id': choice.pk, 'text': autocomplete_label(choice)} for choice in choices[:AUTOCOMPLETE_LIMIT]
+    ]})
+
+
+@staff_member_required
+def capacity_report(request):
+    """Return tutor hours available against lesson hours booked per term, language and specialization."""
+    terms = Term.objects.order_by('start_date')
+    term_id = request.GET.get('term')
+    if term_id:
+        if not term_id.isdigit():
+            return HttpResponseBadRequest("Invalid term.")
+        terms = terms.filter(pk=term_id)
+    terms = list(terms)
+    report = get_capacity(terms)
+
+    rows = [row for term in terms for row in report[term.pk]]
+    languages = Language.objects.in_bulk({row['language'] for row in rows})
+    specializations = Specialization.objects.in_bulk({row['specialization'] for row in rows} - {None})
+    return JsonResponse({'terms': [
+        {
+            'id': term.pk,
+            'name': str(term),
+            'rows': [
+                {
+                    **row,
+                    'language': str(languages[row['language']]),
+                    'specialization': str(specializations[row['specialization']]) if row['specialization'] else None,
+                }
+                for row in report[term.pk]
+            ],
+        }
+        for term in terms
+    ]})
+
+
+@staff_member_required
+def booking_tutor_matches(request, booking_id):
+    """Return the tutors able to take a pending booking, best fit first."""
+    booking = get_object_or_404(Booking, id=booking_id, status=Booking.PENDING)
+    matches = [
+        {
+            'id': match.tutor.pk,
+            'name': str(match.tutor),
+            'load': match.load,
+            'window': f"{match.window.start_time.strftime('%H:%M')}-{match.window.end_time.strftime('%H:%M')}",
+        }
+        for match in rank_tutors(booking)
+    ]
+    return JsonResponse({'booking': booking.id, 'tutors': matches})
 
 
 # Approve booking (Admin)
@@ -276,12 +458,15 @@ def admin_create_booking(request):
     if booking_id:
         booking = get_object_or_404(Booking, id=booking_id)
         if request.method == 'POST':
+            was_accepted = booking.status == Booking.ACCEPTED
             form = AdminBookingForm(request.POST, instance=booking)
             if form.is_valid():
                 booking = form.save(commit=False)
                 booking.student_approval = Booking.STUDENT_APPROVAL_PENDING
                 booking.tutor_approval = Booking.TUTOR_APPROVAL_PENDING
                 booking.save()
+                if was_accepted:
+                    sync_lessons(booking)
                 messages.success(request, f"Booking ID {booking.id} has been updated successfully and approvals reset.")
                 return redirect('admin_pending_bookings')
             else:
@@ -312,19 +497,23 @@ def admin_create_booking(request):
 
 @login_required
 def view_bookings(request):
-    """Display bookings relevant to the logged-in user based on their account type."""
+    """
+    Display bookings relevant to the logged-in user based on their account type.
+
+    Bookings are shown a page at a time using keyset pagination, optionally
+    filtered by status and term, so each page costs the same few queries
+    however many bookings the user has.
+    """
     user = request.user
     context = {}
 
     if user.account_type == 'student':
-        student_bookings = Booking.objects.filter(student=user).order_by('term__start_date', 'day_of_week', 'start_time')
-        context['student_bookings'] = student_bookings
+        bookings = Booking.objects.filter(student=user)
         context['role'] = 'Student'
     elif user.is_tutor:
         try:
             tutor = user.tutor 
-            tutor_bookings = Booking.objects.filter(tutor=tutor).order_by('term__start_date', 'day_of_week', 'start_time')
-            context['tutor_bookings'] = tutor_bookings
+            bookings = Booking.objects.filter(tutor=tutor)
             context['role'] = 'Tutor'
         except Tutor.DoesNotExist:
             messages.error(request, "Tutor profile does not exist. Please complete your tutor profile.")
@@ -333,6 +522,28 @@ def view_bookings(request):
         messages.error(request, "You do not have access to this page.")
         return redirect('dashboard')
 
+    status = request.GET.get('status')
+    if status:
+        if status not in dict(Booking.STATUS_CHOICES):
+            return HttpResponseBadRequest("Invalid status.")
+        bookings = bookings.filter(status=status)
+    term_id = request.GET.get('term')
+    if term_id:
+        if not term_id.isdigit():
+            return HttpResponseBadRequest("Invalid term.")
+        bookings = bookings.filter(term_id=term_id)
+
+    bookings = bookings.select_related('tutor__user', 'student', 'language', 'term').annotate(weekday_index=BOOKING_WEEKDAY)
+    try:
+        page = keyset_page(request, bookings, BOOKING_PAGE_ORDERING)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid page.")
+    context['page'] = page
+    context['student_bookings' if context['role'] == 'Student' else 'tutor_bookings'] = page
+    context['statuses'] = Booking.STATUS_CHOICES
+    context['terms'] = Term.objects.order_by('start_date')
+    context['selected_status'] = status or ''
+    context['selected_term'] = term_id or ''
     return render(request, 'view_bookings.html', context)
 
 
@@ -350,7 +561,7 @@ def accept_booking(request, booking_id):
             messages.success(request, "You have accepted the booking.")
             
             if booking.tutor_approval == Booking.TUTOR_APPROVED:
-                generate_lessons_for_booking(booking)
+                sync_lessons(booking)
                 messages.success(request, "Lessons have been generated based on the approvals.")
         else:
             messages.info(request, "You have already accepted this booking.")
@@ -361,7 +572,7 @@ def accept_booking(request, booking_id):
             messages.success(request, "You have accepted the booking.")
             
             if booking.student_approval == Booking.STUDENT_APPROVED:
-                generate_lessons_for_booking(booking)
+                sync_lessons(booking)
                 messages.success(request, "Lessons have been generated based on the approvals.")
         else:
             messages.info(request, "You have already accepted this booking.")
@@ -370,39 +581,6 @@ def accept_booking(request, booking_id):
 
     return redirect('view_bookings')
 
-def generate_lessons_for_booking(booking):
-    """Generate lessons based on the booking's frequency and term dates."""
-    from datetime import timedelta
-
-    start_date = booking.term.start_date
-    end_date = booking.term.end_date
-    frequency_days = 7 if booking.frequency == 'Weekly' else 14
-    current_date = start_date
-
-    day_of_week_mapping = {
-        'Monday': 0,
-        'Tuesday': 1,
-        'Wednesday': 2,
-        'Thursday': 3,
-        'Friday': 4,
-        'Saturday': 5,
-        'Sunday': 6,
-    }
-    booking_weekday = day_of_week_mapping.get(booking.day_of_week, 0)
-
-    while current_date.weekday() != booking_weekday:
-        current_date += timedelta(days=1)
-
-    while current_date <= end_date:
-        Lesson.objects.create(
-            booking=booking,
-            date=current_date,
-            start_time=booking.start_time,
-            duration=booking.duration
-        )
-        current_date += timedelta(days=frequency_days)
-
-
 @login_required
 def reject_booking(request, booking_id):
     """Allow students or tutors to reject a booking."""
@@ -415,7 +593,7 @@ def reject_booking(request, booking_id):
             booking.save()
             messages.success(request, "You have rejected the booking.")
             
-            Lesson.objects.filter(booking=booking).delete()
+            delete_lessons(booking)
             messages.info(request, "All associated lessons have been canceled.")
         else:
             messages.info(request, "You have already rejected this booking.")
@@ -425,7 +603,7 @@ def reject_booking(request, booking_id):
             booking.save()
             messages.success(request, "You have rejected the booking.")
             
-            Lesson.objects.filter(booking=booking).delete()
+            delete_lessons(booking)
             messages.info(request, "All associated lessons have been canceled.")
         else:
             messages.info(request, "You have already rejected this booking.")
@@ -434,28 +612,105 @@ def reject_booking(request, booking_id):
 
     return redirect('view_bookings')
 
+
+def parse_calendar_window(request):
+    """
+    Return the (start, end) dates requested through the query string.
+
+    Both parameters are optional ISO dates; datetimes such as those sent by
+    FullCalendar are truncated to their date. Raises ValueError on bad input.
+    """
+    window = []
+    for name in ('start', 'end'):
+        value = request.GET.get(name)
+        window.append(datetime.date.fromisoformat(value[:10]) if value else None)
+    start, end = window
+    if start and end and start >= end:
+        raise ValueError("The end date must be after the start date.")
+    return start, end
+
+
+def schedule_etag(request, *args, **kwargs):
+    """Return an ETag derived from the user's schedule version and the query string."""
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()[:12]
+    return f"{request.user.pk}-{request.user.schedule_version}-{query}"
+
+
+def schedule_last_modified(request, *args, **kwargs):
+    """Return when the user's schedule last changed."""
+    return request.user.schedule_updated_at
+
+
+schedule_condition = condition(etag_func=schedule_etag, last_modified_func=schedule_last_modified)
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@schedule_condition
 def booking_calendar_data(request):
-    user = request.user
-    if user.account_type == 'student':
-        bookings = Booking.objects.filter(student=user)
-    elif user.account_type == 'tutor':
-        bookings = Booking.objects.filter(tutor=user)
-    else:
-        bookings = Booking.objects.none()
-
-    events = []
-    for booking in bookings:
-        events.append({
-            'title': f"{booking.student} - {booking.tutor}",
-            'start': booking.date.isoformat(),
-            'end': (booking.date + booking.duration).isoformat(),  
-            'description': booking.description,
-        })
-    
+    """
+    FullCalendar event source with one timed event per lesson of the user's accepted bookings.
+
+    FullCalendar's start/end range parameters limit the expansion, and the
+    number of queries does not depend on how many events fall in the range.
+    """
+    try:
+        start, end = parse_calendar_window(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid start or end date.")
+
+    def build():
+        events = []
+        for booking, dates in Booking.calendar_occurrences(request.user, start, end):
+            title = booking.calendar_title()
+            description = booking.calendar_description()
+            for date in dates:
+                lesson_start = datetime.datetime.combine(date, booking.start_time)
+                events.append({
+                    'id': f"{booking.id}-{date.isoformat()}",
+                    'title': title,
+                    'start': lesson_start.isoformat(),
+                    'end': (lesson_start + booking.duration).isoformat(),
+                    'description': description,
+                })
+        return events
+
+    events = get_or_build(request.user, 'events', start, end, build)
     return JsonResponse(events, safe=False)
 
 
+CALENDAR_FEED_MAX_AGE = 15 * 60
+
+
+def calendar_feed_user(request, token):
+    """Return the owner of the calendar feed token (or None), loading it once per request."""
+    if not hasattr(request, 'calendar_feed_user'):
+        request.calendar_feed_user = User.objects.filter(calendar_token=token).first()
+    return request.calendar_feed_user
+
+
+def calendar_feed_etag(request, token):
+    user = calendar_feed_user(request, token)
+    return f"feed-{user.schedule_version}" if user else None
+
+
+def calendar_feed_last_modified(request, token):
+    user = calendar_feed_user(request, token)
+    return user.schedule_updated_at if user else None
+
+
+@cache_control(private=True, max_age=CALENDAR_FEED_MAX_AGE)
+@condition(etag_func=calendar_feed_etag, last_modified_func=calendar_feed_last_modified)
+def calendar_feed(request, token):
+    """Stream the token owner's accepted bookings as an iCalendar feed with one RRULE per booking."""
+    user = calendar_feed_user(request, token)
+    if user is None:
+        return HttpResponseNotFound("Unknown calendar feed.")
+    response = StreamingHttpResponse(iter_calendar(user), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="lessons.ics"'
+    return response
+
+
 # Custom error handlers
 def custom_404_view(request, exception):
     return render(request, '404.html', status=404)
@@ -466,35 +721,63 @@ def custom_500_view(request):
 logger = logging.getLogger(__name__)
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@schedule_condition
 def calendar_bookings_api(request):
+    """
+    Return the user's accepted lesson dates, optionally limited to [start, end).
+
+    With ?source=lessons the feed is read from the materialized Lesson table
+    instead of expanding each booking's recurrence.
+    """
     user = request.user
     logger.debug(f"Fetching calendar data for user: {user}")
 
-    if user.account_type == 'student':
-        bookings = Booking.objects.filter(student=user, status=Booking.ACCEPTED)
-    elif user.account_type == 'tutor':
-        bookings = Booking.objects.filter(tutor=user.tutor, status=Booking.ACCEPTED)
-    else:
-        bookings = Booking.objects.none()
-
-    events = []
+    try:
+        start, end = parse_calendar_window(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid start or end date.")
 
-    for booking in bookings:
-        recurring_days = [booking.day_of_week]
-        start_date = booking.term.start_date
-        end_date = booking.term.end_date
+    if request.GET.get('source') == 'lessons':
+        events = Lesson.fetch_calendar_data(user, start, end)
+    else:
+        events = Booking.fetch_calendar_data(user, start, end)
+    return JsonResponse(events, safe=False)
 
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.strftime('%A') in recurring_days:
-                events.append({
-                    'title': f"{booking.language.name} with {booking.tutor.user.full_name() if booking.tutor else 'No Tutor'}",
-                    'date': current_date.isoformat(),  
-                    'description': f"Subject: {booking.specialization.name if booking.specialization else 'General'}",
-                })
-            current_date += datetime.timedelta(days=1)
+@login_required
+def free_slots_api(request):
+    """
+    Return the free time in a term of one tutor (?tutor=) or of every tutor
+    teaching a language (?language=), optionally only intervals of at least
+    ?duration= minutes.
+    """
+    term_id = request.GET.get('term', '')
+    tutor_id = request.GET.get('tutor', '')
+    language_id = request.GET.get('language', '')
+    duration = request.GET.get('duration', '0')
+    if not term_id.isdigit() or not duration.isdigit() or not (tutor_id.isdigit() or language_id.isdigit()):
+        return HttpResponseBadRequest("Provide a term and a tutor or language.")
+
+    term_id = int(term_id)
+    tutors = Tutor.objects.select_related('user').order_by('user__last_name', 'user__first_name', 'id')
+    if tutor_id.isdigit():
+        tutors = tutors.filter(pk=tutor_id)
+    else:
+        tutors = tutors.filter(pk__in=capabilities.tutors_for(int(language_id)))
+    tutors = list(tutors)
+    free = get_free_slots([(tutor.pk, term_id) for tutor in tutors])
+    return JsonResponse({
+        'term': term_id,
+        'tutors': [
+            {
+                'id': tutor.pk,
+                'name': str(tutor),
+                'days': serialize_free_slots(free[tutor.pk, term_id], int(duration)),
+            }
+            for tutor in tutors
+        ],
+    })
 
-    return JsonResponse(events, safe=False)
 
 @require_http_methods(['GET', 'POST'])
 @login_required
@@ -519,3 +802,28 @@ def tutor_availability(request):
         form = TutorAvailablityForm()
 
     return render(request, 'tutor_profile_availability.html', {'form': form})
+
+
+@require_http_methods(['GET', 'POST'])
+@login_required
+def tutor_availability_grid(request):
+    """Let tutors edit their weekly availability for every term in one submission."""
+    user = request.user
+    if not hasattr(user, 'tutor'):
+        messages.error(request, "Only tutors can set availability.")
+        return redirect('dashboard')
+
+    terms = list(Term.objects.order_by('start_date'))
+    if request.method == 'POST':
+        form = AvailabilityGridForm(request.POST)
+        if form.is_valid():
+            created, updated, deleted = save_availability_grid(user.tutor, form.cleaned_data['grid'])
+            messages.success(
+                request, f"Your availability has been updated ({created} added, {updated} changed, {deleted} removed)."
+            )
+            return redirect('tutor_availability_grid')
+        messages.error(request, "Please correct the errors below.")
+    else:
+        form = AvailabilityGridForm(initial={'grid': availability_grid(user.tutor, terms)})
+
+    return render(request, 'tutor_availability_grid.html', {'form': form, 'terms': terms, 'weekdays': WEEKDAYS})